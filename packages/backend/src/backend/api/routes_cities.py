@@ -7,8 +7,10 @@ from typing import Optional
 from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from backend.db.mongo import get_mongo_db
 from backend.db.postgres import get_db
 from backend.models import CityDetail, CityListResponse, CityScores
+from backend.repositories.mongo_repo import MongoRepository
 from backend.repositories.postgres_repo import PostgresRepository
 from backend.services.city_service import CityService
 
@@ -16,7 +18,9 @@ router = APIRouter(prefix="/cities", tags=["cities"])
 
 
 def _get_service(session: AsyncSession = Depends(get_db)) -> CityService:
-    return CityService(repo=PostgresRepository(session))
+    return CityService(
+        repo=PostgresRepository(session), review_repo=MongoRepository(get_mongo_db())
+    )
 
 
 @router.get("", response_model=CityListResponse)
@@ -25,23 +29,42 @@ async def list_cities(
     region: Optional[str] = Query(None, description="Filtrer par région"),
     department: Optional[str] = Query(None, description="Filtrer par département"),
     min_population: Optional[int] = Query(None, ge=0, description="Population minimum"),
-    sort_by: str = Query("overall_score", description="Champ de tri"),
+    sort_by: str = Query(
+        "overall_score", description="Champ de tri (ou 'relevance' avec search)"
+    ),
     sort_order: str = Query("desc", pattern="^(asc|desc)$"),
     page: int = Query(1, ge=1),
     page_size: int = Query(20, ge=1, le=100),
+    cursor: Optional[str] = Query(
+        None, description="Curseur keyset (next_cursor de la page précédente)"
+    ),
+    include_total: bool = Query(True, description="Calculer le nombre total de résultats"),
+    estimate_total: bool = Query(
+        False, description="Total estimé (statistiques PostgreSQL) quand aucun filtre n'est actif"
+    ),
+    include_ratings: bool = Query(
+        False, description="Ajouter la note moyenne des avis (avg_rating) à chaque ville"
+    ),
     service: CityService = Depends(_get_service),
 ):
-    """Recherche de villes avec filtres, tri et pagination."""
-    return await service.search_cities(
-        search=search,
-        region=region,
-        department=department,
-        min_population=min_population,
-        sort_by=sort_by,
-        sort_order=sort_order,
-        page=page,
-        page_size=page_size,
-    )
+    """Recherche de villes avec filtres, tri et pagination (page ou curseur)."""
+    try:
+        return await service.search_cities(
+            search=search,
+            region=region,
+            department=department,
+            min_population=min_population,
+            sort_by=sort_by,
+            sort_order=sort_order,
+            page=page,
+            page_size=page_size,
+            cursor=cursor,
+            include_total=include_total,
+            estimate_total=estimate_total,
+            include_ratings=include_ratings,
+        )
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc)) from exc
 
 
 @router.get("/{city_id}", response_model=CityDetail)
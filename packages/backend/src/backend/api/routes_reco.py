@@ -5,11 +5,19 @@ from __future__ import annotations
 from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from backend.core.config import get_settings
 from backend.db.neo4j import get_neo4j_driver
 from backend.db.postgres import get_db
-from backend.models import RecommendationsResponse
+from backend.graph.snapshot import get_graph_snapshot, reload_graph_snapshot
+from backend.models import (
+    GraphSnapshotResponse,
+    RecommendationsBatchRequest,
+    RecommendationsBatchResponse,
+    RecommendationsResponse,
+)
 from backend.repositories.neo4j_repo import Neo4jRepository
 from backend.repositories.postgres_repo import PostgresRepository
+from backend.services.recommendation_cache import get_recommendation_cache
 from backend.services.recommendation_service import RecommendationService
 
 router = APIRouter(tags=["recommendations"])
@@ -17,9 +25,14 @@ router = APIRouter(tags=["recommendations"])
 
 def _get_service(session: AsyncSession = Depends(get_db)) -> RecommendationService:
     driver = get_neo4j_driver()
+    settings = get_settings()
     return RecommendationService(
         neo4j_repo=Neo4jRepository(driver),
         postgres_repo=PostgresRepository(session),
+        snapshot=get_graph_snapshot(),
+        cache=get_recommendation_cache(),
+        explore_fan_out=settings.reco_explore_fan_out,
+        explore_timeout=settings.reco_explore_timeout,
     )
 
 
@@ -27,10 +40,44 @@ def _get_service(session: AsyncSession = Depends(get_db)) -> RecommendationServi
 async def get_recommendations(
     city_id: int = Query(..., description="ID de la ville source"),
     k: int = Query(5, ge=1, le=20, description="Nombre de recommandations"),
+    mode: str = Query(
+        "similar",
+        pattern="^(similar|explore)$",
+        description="similar : voisins directs ; explore : découverte à deux sauts",
+    ),
     service: RecommendationService = Depends(_get_service),
 ):
     """Recommandations de villes similaires basées sur le graphe Neo4j."""
-    result = await service.get_recommendations(city_id, k=k)
+    try:
+        result = await service.get_recommendations(city_id, k=k, mode=mode)
+    except TimeoutError as exc:
+        raise HTTPException(status_code=503, detail=str(exc)) from exc
     if result is None:
         raise HTTPException(status_code=404, detail="Ville non trouvée")
     return result
+
+
+@router.post("/recommendations/batch", response_model=RecommendationsBatchResponse)
+async def get_recommendations_batch(
+    body: RecommendationsBatchRequest,
+    service: RecommendationService = Depends(_get_service),
+):
+    """Recommandations pour plusieurs villes sources (une requête graphe, un enrichissement)."""
+    return await service.get_recommendations_batch(body.city_ids, k=body.k)
+
+
+@router.post("/recommendations/snapshot/reload", response_model=GraphSnapshotResponse)
+async def reload_snapshot(
+    force: bool = Query(False, description="Recharger même si la version n'a pas changé"),
+):
+    """Recharge l'instantané mémoire du graphe (après un nouveau seed)."""
+    if not get_settings().reco_snapshot_enabled:
+        raise HTTPException(status_code=409, detail="Instantané du graphe désactivé")
+    reloaded = await reload_graph_snapshot(get_neo4j_driver(), force=force)
+    snapshot = get_graph_snapshot()
+    return GraphSnapshotResponse(
+        reloaded=reloaded,
+        version=snapshot.version,
+        cities=snapshot.city_count,
+        edges=snapshot.edge_count,
+    )
@@ -2,19 +2,27 @@
 
 from __future__ import annotations
 
-from fastapi import APIRouter, Depends, Query
+import json
+from typing import Optional
 
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+
+from backend.core.config import get_settings
 from backend.db.mongo import get_mongo_db
-from backend.models import Review, ReviewCreate, ReviewsResponse
+from backend.models import Review, ReviewCreate, ReviewImportResponse, ReviewsResponse
 from backend.repositories.mongo_repo import MongoRepository
+from backend.repositories.review_buffer import get_review_write_buffer
 from backend.services.review_service import ReviewService
 
 router = APIRouter(tags=["reviews"])
 
+# Types de contenu lus comme un avis JSON par ligne
+NDJSON_CONTENT_TYPES = {"application/x-ndjson", "application/ndjson", "application/jsonl"}
+
 
 def _get_service() -> ReviewService:
     db = get_mongo_db()
-    return ReviewService(repo=MongoRepository(db))
+    return ReviewService(repo=MongoRepository(db, write_buffer=get_review_write_buffer()))
 
 
 @router.get("/cities/{city_id}/reviews", response_model=ReviewsResponse)
@@ -22,10 +30,23 @@ async def get_reviews(
     city_id: int,
     page: int = Query(1, ge=1),
     page_size: int = Query(10, ge=1, le=50),
+    cursor: Optional[str] = Query(
+        None, description="Curseur keyset (next_cursor de la page précédente)"
+    ),
+    include_total: bool = Query(True, description="Compter le nombre total d'avis"),
     service: ReviewService = Depends(_get_service),
 ):
-    """Récupère les avis d'une ville."""
-    return await service.get_reviews(city_id, page=page, page_size=page_size)
+    """Récupère les avis d'une ville (page ou curseur)."""
+    try:
+        return await service.get_reviews(
+            city_id,
+            page=page,
+            page_size=page_size,
+            cursor=cursor,
+            include_total=include_total,
+        )
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc)) from exc
 
 
 @router.post("/cities/{city_id}/reviews", response_model=Review, status_code=201)
@@ -36,3 +57,35 @@ async def create_review(
 ):
     """Ajoute un nouvel avis pour une ville."""
     return await service.create_review(city_id, review)
+
+
+@router.post("/reviews/bulk", response_model=ReviewImportResponse)
+async def import_reviews(
+    request: Request,
+    service: ReviewService = Depends(_get_service),
+):
+    """Import en masse d'avis, toutes villes confondues.
+
+    Corps : tableau JSON d'avis, ou NDJSON (un avis par ligne) avec
+    Content-Type application/x-ndjson. Chaque avis porte son city_id. Les
+    avis invalides sont rapportés dans `errors` sans bloquer les autres.
+    """
+    body = await request.body()
+    limit = get_settings().reviews_import_max_items
+    content_type = request.headers.get("content-type", "").split(";")[0].strip().lower()
+
+    if content_type in NDJSON_CONTENT_TYPES:
+        lines = [line for line in body.splitlines() if line.strip()]
+        if len(lines) > limit:
+            raise HTTPException(status_code=413, detail=f"Au plus {limit} avis par requête")
+        return await service.import_reviews_ndjson(lines)
+
+    try:
+        items = json.loads(body)
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail="Corps JSON invalide") from exc
+    if not isinstance(items, list):
+        raise HTTPException(status_code=400, detail="Tableau JSON d'avis attendu")
+    if len(items) > limit:
+        raise HTTPException(status_code=413, detail=f"Au plus {limit} avis par requête")
+    return await service.import_reviews(items)
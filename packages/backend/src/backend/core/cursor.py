@@ -0,0 +1,34 @@
+"""Curseurs de pagination opaques (keyset / seek).
+
+Un curseur encode la position de la dernière ligne servie (valeurs de tri
++ identifiant) en base64 URL-safe. Le client le renvoie tel quel pour
+obtenir la page suivante, sans OFFSET.
+"""
+
+from __future__ import annotations
+
+import base64
+import binascii
+import json
+from typing import Any
+
+
+def encode_cursor(payload: dict[str, Any]) -> str:
+    """Encode un dict JSON-sérialisable en curseur opaque."""
+    raw = json.dumps(payload, separators=(",", ":"), default=str).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_cursor(token: str) -> dict[str, Any]:
+    """Décode un curseur produit par encode_cursor.
+
+    Lève ValueError si le curseur est illisible (tronqué, modifié…).
+    """
+    padded = token + "=" * (-len(token) % 4)
+    try:
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+    except (binascii.Error, UnicodeError, json.JSONDecodeError) as exc:
+        raise ValueError("Curseur de pagination invalide") from exc
+    if not isinstance(payload, dict):
+        raise ValueError("Curseur de pagination invalide")
+    return payload
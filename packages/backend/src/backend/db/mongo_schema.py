@@ -0,0 +1,32 @@
+"""Schéma MongoDB géré par l'application (index).
+
+Les avis sont toujours lus par ville, du plus récent au plus ancien :
+l'index composé (city_id, created_at desc, _id desc) sert à la fois le
+filtre, le tri (sans tri en mémoire), le comptage par ville et le seek de
+la pagination par curseur. `create_indexes` est idempotent.
+
+Les statistiques d'avis par ville (city_review_stats) sont indexées par leur
+_id, qui est le city_id : aucun index supplémentaire. Leur recalcul complet
+est écrit dans city_review_stats_rebuild puis renommé sur la collection.
+"""
+
+from __future__ import annotations
+
+from motor.motor_asyncio import AsyncIOMotorDatabase
+from pymongo import ASCENDING, DESCENDING, IndexModel
+
+REVIEWS_COLLECTION = "reviews"
+REVIEW_STATS_COLLECTION = "city_review_stats"
+REVIEW_STATS_REBUILD_COLLECTION = "city_review_stats_rebuild"
+
+# Ordre de lecture des avis ; _id départage les avis créés au même instant
+REVIEW_SORT = [("created_at", DESCENDING), ("_id", DESCENDING)]
+
+REVIEW_INDEXES = [
+    IndexModel([("city_id", ASCENDING), *REVIEW_SORT], name="reviews_city_created_id"),
+]
+
+
+async def apply_mongo_schema(db: AsyncIOMotorDatabase) -> list[str]:
+    """Crée les index manquants ; retourne leurs noms."""
+    return await db[REVIEWS_COLLECTION].create_indexes(REVIEW_INDEXES)
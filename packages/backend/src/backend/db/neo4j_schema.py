@@ -0,0 +1,65 @@
+"""Schéma Neo4j géré par l'application (contraintes d'unicité, index).
+
+Les contraintes d'unicité créent l'index qui sert les recherches
+`MATCH (:City {city_id: ...})` et les `MERGE` du seed. Toutes les
+instructions sont idempotentes (IF NOT EXISTS).
+"""
+
+from __future__ import annotations
+
+from neo4j import AsyncDriver
+
+CONSTRAINTS = [
+    "CREATE CONSTRAINT city_id_unique IF NOT EXISTS "
+    "FOR (c:City) REQUIRE c.city_id IS UNIQUE",
+    "CREATE CONSTRAINT criterion_name_unique IF NOT EXISTS "
+    "FOR (c:Criterion) REQUIRE c.name IS UNIQUE",
+]
+
+# Délai maximal (s) d'attente de la construction des index après création
+INDEX_WAIT_SECONDS = 60
+
+# Recherches à vérifier : elles doivent être servies par un index seek
+LOOKUP_QUERIES = {
+    "City.city_id": ("MATCH (c:City {city_id: $value}) RETURN c", 1),
+    "Criterion.name": ("MATCH (c:Criterion {name: $value}) RETURN c", "Culture"),
+}
+
+_INDEX_SEEK_OPERATORS = ("NodeUniqueIndexSeek", "NodeIndexSeek")
+
+
+async def apply_graph_schema(driver: AsyncDriver) -> None:
+    """Crée les contraintes manquantes puis attend que leurs index soient en ligne."""
+    async with driver.session() as session:
+        for statement in CONSTRAINTS:
+            result = await session.run(statement)
+            await result.consume()
+        result = await session.run(f"CALL db.awaitIndexes({INDEX_WAIT_SECONDS})")
+        await result.consume()
+
+
+def _plan_operators(plan: dict | None) -> list[str]:
+    """Liste (en profondeur) des opérateurs d'un plan EXPLAIN."""
+    if not plan:
+        return []
+    operators = [plan.get("operatorType", "")]
+    for child in plan.get("children", []):
+        operators.extend(_plan_operators(child))
+    return operators
+
+
+async def verify_graph_schema(driver: AsyncDriver) -> list[str]:
+    """Vérifie par EXPLAIN que les recherches par clé utilisent un index.
+
+    Retourne les recherches dont le plan ne contient pas d'index seek
+    (liste vide si tout est indexé).
+    """
+    missing = []
+    async with driver.session() as session:
+        for lookup, (query, value) in LOOKUP_QUERIES.items():
+            result = await session.run(f"EXPLAIN {query}", value=value)
+            summary = await result.consume()
+            operators = _plan_operators(summary.plan)
+            if not any(op.startswith(_INDEX_SEEK_OPERATORS) for op in operators):
+                missing.append(lookup)
+    return missing
@@ -2,7 +2,12 @@
 
 from __future__ import annotations
 
+import threading
+import time
+
+from sqlalchemy import exc
 from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.pool import AsyncAdaptedQueuePool
 
 from backend.core.config import get_settings
 
@@ -10,6 +15,50 @@ _engine = None
 _session_factory = None
 
 
+class PoolWaitStats:
+    """Cumul des temps d'obtention d'une connexion du pool."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self) -> None:
+        self.checkouts = 0
+        self.timeouts = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+
+    def record(self, seconds: float, *, timed_out: bool = False) -> None:
+        with self._lock:
+            if timed_out:
+                self.timeouts += 1
+                return
+            self.checkouts += 1
+            self.total_wait += seconds
+            self.max_wait = max(self.max_wait, seconds)
+
+
+pool_wait_stats = PoolWaitStats()
+
+
+class InstrumentedPool(AsyncAdaptedQueuePool):
+    """Pool async standard qui mesure l'attente de chaque checkout.
+
+    Le temps mesuré couvre la file d'attente du pool, l'ouverture d'une
+    nouvelle connexion et le pre-ping éventuel.
+    """
+
+    def connect(self):
+        start = time.perf_counter()
+        try:
+            conn = super().connect()
+        except exc.TimeoutError:
+            pool_wait_stats.record(time.perf_counter() - start, timed_out=True)
+            raise
+        pool_wait_stats.record(time.perf_counter() - start)
+        return conn
+
+
 def get_engine():
     """Crée le moteur SQLAlchemy async (singleton). À compléter : créer l'engine depuis settings.postgres_url."""
     global _engine
@@ -17,11 +66,42 @@ def get_engine():
         # TODO: Créer l'engine async avec create_async_engine(settings.postgres_url, echo=settings.debug)
         # ✂️ SOLUTION START
         settings = get_settings()
-        _engine = create_async_engine(settings.postgres_url, echo=settings.debug)
+        _engine = create_async_engine(
+            settings.postgres_url,
+            echo=settings.debug,
+            poolclass=InstrumentedPool,
+            pool_size=settings.postgres_pool_size,
+            max_overflow=settings.postgres_max_overflow,
+            pool_timeout=settings.postgres_pool_timeout,
+            pool_recycle=settings.postgres_pool_recycle,
+            pool_pre_ping=settings.postgres_pool_pre_ping,
+            connect_args={
+                "prepared_statement_cache_size": settings.postgres_statement_cache_size,
+            },
+        )
         # ✂️ SOLUTION END
     return _engine
 
 
+def get_pool_stats() -> dict:
+    """Instantané du pool de connexions (exposé sur /health/pool)."""
+    pool = get_engine().pool
+    waits = pool_wait_stats
+    return {
+        "size": pool.size(),
+        "checked_in": pool.checkedin(),
+        "checked_out": pool.checkedout(),
+        # pool.overflow() vaut -size au repos : seules les connexions au-delà de size comptent
+        "overflow": max(pool.overflow(), 0),
+        "checkouts": waits.checkouts,
+        "timeouts": waits.timeouts,
+        "wait_avg_ms": round(waits.total_wait / waits.checkouts * 1000, 3)
+        if waits.checkouts
+        else 0.0,
+        "wait_max_ms": round(waits.max_wait * 1000, 3),
+    }
+
+
 def get_session_factory() -> async_sessionmaker[AsyncSession]:
     """Crée la factory de sessions async (singleton). À compléter : sessionmaker avec get_engine()."""
     global _session_factory
@@ -0,0 +1,126 @@
+"""Schéma PostgreSQL géré par l'application (tables, extensions, index).
+
+Toutes les instructions sont idempotentes : elles peuvent être rejouées à
+chaque seed ou démarrage sans effet de bord.
+"""
+
+from __future__ import annotations
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncConnection, AsyncEngine
+
+# Colonnes de cities proposées au tri par l'API (chacune est indexée avec id)
+CITY_SORT_COLUMNS = ("overall_score", "population", "name", "department", "region")
+
+# Colonnes triables pouvant être NULL (triées NULLS LAST) ; name est NOT NULL
+CITY_NULLABLE_SORT_COLUMNS = ("overall_score", "population", "department", "region")
+
+# Verrou consultatif : évite que deux processus appliquent le schéma en même temps
+_SCHEMA_LOCK_ID = 727_001
+
+TABLES = [
+    """
+    CREATE TABLE IF NOT EXISTS cities (
+        id INTEGER PRIMARY KEY,
+        name TEXT NOT NULL,
+        department TEXT,
+        region TEXT,
+        population INTEGER DEFAULT 0,
+        description TEXT,
+        latitude DOUBLE PRECISION,
+        longitude DOUBLE PRECISION,
+        overall_score DOUBLE PRECISION DEFAULT 0
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS scores (
+        city_id INTEGER NOT NULL,
+        category TEXT NOT NULL,
+        label TEXT,
+        score DOUBLE PRECISION NOT NULL,
+        PRIMARY KEY (city_id, category)
+    )
+    """,
+    # Tables scores créées avant l'ajout de la clé primaire
+    """
+    DO $$
+    BEGIN
+        IF NOT EXISTS (
+            SELECT 1 FROM pg_constraint
+            WHERE conrelid = 'scores'::regclass AND contype = 'p'
+        ) THEN
+            ALTER TABLE scores ADD PRIMARY KEY (city_id, category);
+        END IF;
+    END
+    $$
+    """,
+]
+
+# Tri : (colonne, id) sert ORDER BY ... , id LIMIT et le seek keyset. Parcouru à
+# l'envers, il donne DESC NULLS FIRST : les colonnes nullables (triées NULLS LAST
+# dans les deux sens) ont donc aussi un index (colonne DESC NULLS LAST, id DESC).
+# Filtres : region / department avec le tri par défaut (overall_score DESC NULLS LAST).
+CITY_INDEXES = [
+    *(
+        f"CREATE INDEX IF NOT EXISTS idx_cities_{col}_id ON cities ({col}, id)"
+        for col in CITY_SORT_COLUMNS
+    ),
+    *(
+        f"CREATE INDEX IF NOT EXISTS idx_cities_{col}_desc_id "
+        f"ON cities ({col} DESC NULLS LAST, id DESC)"
+        for col in CITY_NULLABLE_SORT_COLUMNS
+    ),
+    "CREATE INDEX IF NOT EXISTS idx_cities_region_score_desc "
+    "ON cities (region, overall_score DESC NULLS LAST, id DESC)",
+    "CREATE INDEX IF NOT EXISTS idx_cities_department_score_desc "
+    "ON cities (department, overall_score DESC NULLS LAST, id DESC)",
+]
+
+# Anciens index (region|department, overall_score, id) ascendants, inutilisables
+# pour le tri par défaut : remplacés par les versions _desc ci-dessus
+CITY_INDEX_MIGRATIONS = [
+    "DROP INDEX IF EXISTS idx_cities_region_score",
+    "DROP INDEX IF EXISTS idx_cities_department_score",
+]
+
+# Forme normalisée du nom utilisée pour la recherche (minuscules, sans accents).
+# Doit rester identique entre l'index et les requêtes pour que l'index serve.
+NAME_SEARCH_EXPR = "immutable_unaccent(lower(name))"
+
+# Recherche insensible aux accents : unaccent() n'est que STABLE, on
+# l'enveloppe dans une fonction IMMUTABLE pour pouvoir l'indexer.
+SEARCH_FUNCTIONS = [
+    "CREATE EXTENSION IF NOT EXISTS pg_trgm",
+    "CREATE EXTENSION IF NOT EXISTS unaccent",
+    """
+    CREATE OR REPLACE FUNCTION immutable_unaccent(value text) RETURNS text
+    LANGUAGE sql IMMUTABLE PARALLEL SAFE STRICT
+    AS $$ SELECT public.unaccent('public.unaccent'::regdictionary, value) $$
+    """,
+]
+
+
+def name_search_index(table: str = "cities") -> str:
+    """DDL de l'index GIN trigramme sur le nom normalisé de `table`."""
+    return f"""
+    CREATE INDEX IF NOT EXISTS idx_{table}_name_trgm
+    ON {table} USING gin ({NAME_SEARCH_EXPR} gin_trgm_ops)
+    """
+
+
+SEARCH_SCHEMA = [*SEARCH_FUNCTIONS, name_search_index()]
+
+SCHEMA = [*TABLES, *CITY_INDEX_MIGRATIONS, *CITY_INDEXES, *SEARCH_SCHEMA]
+
+
+async def apply_schema(conn: AsyncConnection) -> None:
+    """Applique le schéma géré (à appeler dans une transaction)."""
+    await conn.execute(text(f"SELECT pg_advisory_xact_lock({_SCHEMA_LOCK_ID})"))
+    for statement in SCHEMA:
+        await conn.execute(text(statement))
+
+
+async def ensure_schema(engine: AsyncEngine) -> None:
+    """Applique le schéma dans sa propre transaction (démarrage de l'API)."""
+    async with engine.begin() as conn:
+        await apply_schema(conn)
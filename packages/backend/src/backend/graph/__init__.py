@@ -0,0 +1 @@
+"""Calculs sur le graphe de villes hors Neo4j (similarité, etc.)."""
@@ -0,0 +1,281 @@
+"""Similarité entre villes calculée en mémoire (NumPy).
+
+Deux mesures, calculées par blocs de lignes pour borner la mémoire
+(block_size x n scores au lieu de la matrice n x n) :
+- `top_k_cosine` : cosinus pondéré entre vecteurs de notes par catégorie
+  (centrées-réduites), voir `score_vectors` ;
+- `top_k_similar` : nombre de critères forts communs (relations STRONG_IN),
+  obtenu par produit matriciel de vecteurs booléens, ce qui évite le motif
+  Cypher quadratique (a)-[:STRONG_IN]->(c)<-[:STRONG_IN]-(b).
+
+Seuls les K meilleurs voisins de chaque ville sont conservés. Les arêtes
+sont ensuite stockées une seule fois par paire (SIMILAR_TO parcouru sans
+orientation).
+"""
+
+from __future__ import annotations
+
+from collections.abc import Callable, Iterable, Mapping, Sequence
+
+import numpy as np
+
+# Formule de score : matrice des critères communs -> matrice de scores
+ScoreFormula = Callable[[np.ndarray], np.ndarray]
+
+# Lignes de similarité calculées à la fois : ~36 Mo par tableau float32 pour 35 000 villes
+SIMILARITY_BLOCK_SIZE = 256
+
+
+def linear_common_score(common: np.ndarray) -> np.ndarray:
+    """Score historique : 0.5 + 0.1 * critères communs, plafonné à 1."""
+    return np.minimum(0.5 + 0.1 * common, 1.0)
+
+
+def strength_matrix(
+    city_ids: Sequence[int],
+    criteria: Sequence[str],
+    strong_pairs: Iterable[tuple[int, str]],
+) -> np.ndarray:
+    """Matrice booléenne (villes x critères) des relations STRONG_IN.
+
+    Les paires dont la ville ou le critère est inconnu sont ignorées.
+    """
+    city_index = {city_id: i for i, city_id in enumerate(city_ids)}
+    criterion_index = {name: j for j, name in enumerate(criteria)}
+    strengths = np.zeros((len(city_ids), len(criteria)), dtype=bool)
+    for city_id, name in strong_pairs:
+        i = city_index.get(city_id)
+        j = criterion_index.get(name)
+        if i is not None and j is not None:
+            strengths[i, j] = True
+    return strengths
+
+
+def score_vectors(
+    city_ids: Sequence[int],
+    categories: Sequence[str],
+    scores: Iterable[tuple[int, str, float]],
+    *,
+    weights: Mapping[str, float] | None = None,
+) -> np.ndarray:
+    """Matrice normalisée (villes x catégories) pour le cosinus pondéré.
+
+    Chaque catégorie est centrée-réduite : ce sont les écarts à la moyenne
+    qui rapprochent deux villes, pas le niveau général des notes. Une note
+    manquante vaut la moyenne. Le poids w d'une catégorie multiplie sa
+    contribution au produit scalaire (facteur sqrt(w) sur chaque vecteur).
+    Les lignes sont normées : le produit scalaire de deux lignes est leur
+    cosinus pondéré.
+    """
+    city_index = {city_id: i for i, city_id in enumerate(city_ids)}
+    category_index = {name: j for j, name in enumerate(categories)}
+    values = np.zeros((len(city_ids), len(categories)), dtype=np.float32)
+    present = np.zeros(values.shape, dtype=bool)
+    for city_id, category, score in scores:
+        i = city_index.get(city_id)
+        j = category_index.get(category)
+        if i is not None and j is not None:
+            values[i, j] = score
+            present[i, j] = True
+
+    counts = np.maximum(present.sum(axis=0), 1)
+    mean = values.sum(axis=0) / counts
+    centered = np.where(present, values - mean, 0.0).astype(np.float32)
+    std = np.sqrt((centered**2).sum(axis=0) / counts)
+    vectors = centered / np.where(std > 0, std, 1.0)
+
+    if weights:
+        w = np.array([weights.get(name, 1.0) for name in categories], dtype=np.float32)
+        if (w < 0).any():
+            raise ValueError("Les poids de catégories doivent être positifs")
+        vectors *= np.sqrt(w)
+
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    return (vectors / np.where(norms > 0, norms, 1.0)).astype(np.float32)
+
+
+def _top_k_block(
+    block: np.ndarray, k: int, *, floor: float = -np.inf
+) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Top-k de chaque ligne d'un bloc de scores dont les colonnes sont triées par city_id.
+
+    Retourne (lignes, colonnes, scores) triés par ligne puis score
+    décroissant ; à score égal la plus petite colonne (donc le plus petit
+    city_id) l'emporte, y compris à la frontière du top-K. Les scores
+    <= floor sont exclus.
+    """
+    n = block.shape[1]
+    k = min(k, n)
+    top = np.argpartition(block, n - k, axis=1)[:, n - k :]
+    selected = np.take_along_axis(block, top, axis=1)
+    threshold = selected.min(axis=1, keepdims=True)
+
+    # Égalités à la frontière : argpartition choisit arbitrairement parmi les
+    # ex aequo, on retient alors les premières colonnes à égalité.
+    equal = block == threshold
+    ties = np.flatnonzero(equal.sum(axis=1) > (selected == threshold).sum(axis=1))
+    if ties.size:
+        greater = block[ties] > threshold[ties]
+        room = k - greater.sum(axis=1, keepdims=True)
+        equal = equal[ties]
+        pick = greater | (equal & (np.cumsum(equal, axis=1, dtype=np.int32) <= room))
+        top[ties] = np.nonzero(pick)[1].reshape(len(ties), k)
+
+    values = np.take_along_axis(block, top, axis=1)
+    # Tri de chaque ligne : score décroissant puis colonne (lexsort : dernière clé prioritaire)
+    order = np.lexsort((top, -values))
+    top = np.take_along_axis(top, order, axis=1)
+    values = np.take_along_axis(values, order, axis=1)
+    rows, ranks = np.nonzero(values > floor)
+    return rows, top[rows, ranks], values[rows, ranks]
+
+
+def _sorted_by_id(city_ids: Sequence[int], matrix: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """Réordonne les lignes par city_id croissant (départage des égalités par colonne)."""
+    ids = np.asarray(city_ids)
+    order = np.argsort(ids, kind="stable")
+    return ids[order], matrix[order]
+
+
+def _row_blocks(positions: np.ndarray, block_size: int):
+    """Découpe les lignes à calculer en blocs (positions, indices locaux)."""
+    for start in range(0, len(positions), block_size):
+        chunk = positions[start : start + block_size]
+        yield chunk, np.arange(len(chunk))
+
+
+def top_k_cosine(
+    city_ids: Sequence[int],
+    vectors: np.ndarray,
+    *,
+    k: int,
+    sources: Iterable[int] | None = None,
+    block_size: int = SIMILARITY_BLOCK_SIZE,
+) -> list[dict]:
+    """Top-K exact des voisins par cosinus (vecteurs issus de `score_vectors`).
+
+    Seuls les voisins de cosinus strictement positif sont retenus ; le score
+    de l'arête est ce cosinus (dans ]0, 1]). Retourne des arêtes orientées
+    {source, target, score}, triées par source puis score décroissant.
+    `sources` restreint le calcul aux voisinages de ces villes (ids inconnus
+    ignorés), les voisins étant toujours cherchés parmi toutes les villes.
+    """
+    n = len(city_ids)
+    if n < 2 or k <= 0:
+        return []
+
+    ids, vectors = _sorted_by_id(city_ids, vectors)
+    positions = np.arange(n)
+    if sources is not None:
+        wanted = np.unique(np.fromiter(sources, dtype=ids.dtype))
+        positions = np.searchsorted(ids, wanted)
+        positions = positions[(positions < n) & (ids[np.minimum(positions, n - 1)] == wanted)]
+    edges = []
+    for chunk, rows in _row_blocks(positions, block_size):
+        block = vectors[chunk] @ vectors.T
+        block[rows, chunk] = -np.inf
+        r, c, values = _top_k_block(block, k, floor=0.0)
+        edges.extend(
+            {"source": source, "target": target, "score": score}
+            for source, target, score in zip(
+                ids[chunk[r]].tolist(),
+                ids[c].tolist(),
+                np.minimum(values, 1.0).astype(np.float64).round(6).tolist(),
+            )
+        )
+    return edges
+
+
+def top_k_similar(
+    city_ids: Sequence[int],
+    strengths: np.ndarray,
+    *,
+    k: int,
+    score: ScoreFormula = linear_common_score,
+    criteria: Sequence[str] | None = None,
+    block_size: int = SIMILARITY_BLOCK_SIZE,
+) -> list[dict]:
+    """Calcule les K villes les plus similaires à chaque ville.
+
+    Seules les paires partageant au moins un critère fort sont candidates.
+    Retourne des arêtes orientées {source, target, score, common}, triées par
+    source puis score décroissant (égalités départagées par city_id).
+    Si `criteria` (colonnes de `strengths`) est fourni, chaque arête porte
+    aussi `common_strengths`, la liste triée des critères communs.
+    """
+    n = len(city_ids)
+    if n < 2 or k <= 0:
+        return []
+
+    # float32 : produit matriciel BLAS, exact pour des comptes de critères
+    ids, matrix = _sorted_by_id(city_ids, strengths.astype(np.float32))
+    # Le score ne dépend que du nombre de critères communs : on classe les
+    # niveaux une fois, puis une clé entière unique (rang du score, puis
+    # colonne) évite toute égalité lors de la sélection du top-K. Les paires
+    # sans critère commun ont une clé négative, exclue.
+    levels = np.arange(matrix.shape[1] + 1)
+    level_scores = np.asarray(score(levels), dtype=np.float64)
+    rank = np.unique(level_scores, return_inverse=True)[1].reshape(-1)
+    level_keys = rank.astype(np.int64) * n
+    level_keys[0] = -n - 1
+    tie_break = n - 1 - np.arange(n, dtype=np.int64)
+
+    edges = []
+    for chunk, rows in _row_blocks(np.arange(n), block_size):
+        common = (matrix[chunk] @ matrix.T).astype(np.intp)
+        common[rows, chunk] = 0
+        keys = np.take(level_keys, common)
+        keys += tie_break
+        r, c, _ = _top_k_block(keys, k, floor=-1)
+        shared = common[r, c]
+        edges.extend(
+            {"source": source, "target": target, "score": value, "common": count}
+            for source, target, value, count in zip(
+                ids[chunk[r]].tolist(),
+                ids[c].tolist(),
+                level_scores[shared].tolist(),
+                shared.tolist(),
+            )
+        )
+    if criteria is not None:
+        edges = with_common_strengths(edges, city_ids, strengths, criteria)
+    return edges
+
+
+def with_common_strengths(
+    edges: Iterable[dict],
+    city_ids: Sequence[int],
+    strengths: np.ndarray,
+    criteria: Sequence[str],
+) -> list[dict]:
+    """Ajoute à chaque arête `common_strengths`, la liste triée des critères forts communs."""
+    edges = list(edges)
+    index = {city_id: i for i, city_id in enumerate(city_ids)}
+    sources = [index[edge["source"]] for edge in edges]
+    targets = [index[edge["target"]] for edge in edges]
+    # Critères communs par arête, clés en bits empaquetés (sans limite de nombre
+    # de critères, contrairement à un masque uint64) ; les noms sont calculés
+    # une fois par combinaison
+    common = strengths[sources] & strengths[targets]
+    keys = np.packbits(common, axis=1)
+    names: dict[bytes, list[str]] = {}
+    result = []
+    for edge, row, key in zip(edges, common, keys):
+        key = key.tobytes()
+        if key not in names:
+            names[key] = sorted(criteria[j] for j in np.flatnonzero(row))
+        result.append({**edge, "common_strengths": list(names[key])})
+    return result
+
+
+def to_undirected(edges: Iterable[dict]) -> list[dict]:
+    """Une arête par paire de villes (source < target), pour SIMILAR_TO non orienté.
+
+    Les scores étant symétriques, une paire retenue dans le top-K de l'une
+    ou l'autre ville n'est stockée qu'une fois.
+    """
+    pairs: dict[tuple[int, int], dict] = {}
+    for edge in edges:
+        a, b = sorted((edge["source"], edge["target"]))
+        pairs.setdefault((a, b), {**edge, "source": a, "target": b})
+    return [pairs[key] for key in sorted(pairs)]
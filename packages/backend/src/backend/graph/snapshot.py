@@ -0,0 +1,227 @@
+"""Instantané en mémoire du graphe de similarité (CSR).
+
+Le graphe SIMILAR_TO / STRONG_IN ne change qu'au seed : il est chargé une
+fois depuis Neo4j dans des tableaux NumPy compacts, puis les
+recommandations sont servies sans aller-retour Bolt.
+
+Représentation :
+- voisins SIMILAR_TO en CSR (relation non orientée, indexée dans les deux
+  sens) : les voisins de la ville i sont indices[indptr[i]:indptr[i + 1]],
+  triés par score décroissant ;
+- scores en float32 ;
+- critères forts (STRONG_IN) en masque de bits par ville : les critères
+  communs à deux villes valent masks[i] & masks[j].
+
+L'instantané porte la version du graphe (nœud :GraphMeta écrit par le seed)
+pour pouvoir être rechargé après un nouveau seed.
+"""
+
+from __future__ import annotations
+
+from collections.abc import Iterable, Sequence
+from typing import Optional
+
+import numpy as np
+from neo4j import AsyncDriver
+
+from backend.repositories.neo4j_repo import Neo4jRepository
+
+# Un masque uint64 par ville : au plus 64 critères
+MAX_CRITERIA = 64
+
+CITIES_QUERY = """
+MATCH (c:City)
+RETURN c {
+    .city_id, .name, .department, .region,
+    .population, .overall_score
+} AS city
+ORDER BY c.city_id
+"""
+
+STRENGTHS_QUERY = """
+MATCH (c:City)-[:STRONG_IN]->(cr:Criterion)
+RETURN c.city_id AS city_id, cr.name AS name
+"""
+
+EDGES_QUERY = """
+MATCH (a:City)-[r:SIMILAR_TO]->(b:City)
+RETURN a.city_id AS source, b.city_id AS target, r.score AS score
+"""
+
+VERSION_QUERY = """
+MATCH (m:GraphMeta)
+RETURN m.version AS version
+LIMIT 1
+"""
+
+
+class GraphSnapshot:
+    """Graphe de similarité figé, interrogeable comme Neo4jRepository."""
+
+    def __init__(
+        self,
+        *,
+        version: Optional[str],
+        cities: list[dict],
+        criteria: list[str],
+        masks: np.ndarray,
+        indptr: np.ndarray,
+        indices: np.ndarray,
+        scores: np.ndarray,
+    ):
+        self.version = version
+        self._cities = cities
+        self._index = {city["city_id"]: i for i, city in enumerate(cities)}
+        self._criteria = criteria
+        self._masks = masks
+        self._indptr = indptr
+        self._indices = indices
+        self._scores = scores
+
+    @property
+    def city_count(self) -> int:
+        return len(self._cities)
+
+    @property
+    def edge_count(self) -> int:
+        return int(self._indices.size)
+
+    @classmethod
+    def build(
+        cls,
+        *,
+        version: Optional[str],
+        cities: Sequence[dict],
+        strengths: Iterable[tuple[int, str]],
+        edges: Iterable[tuple[int, int, float]],
+    ) -> GraphSnapshot:
+        """Construit l'instantané à partir des nœuds, STRONG_IN et SIMILAR_TO.
+
+        Les relations vers ou depuis une ville inconnue sont ignorées.
+        """
+        cities = [dict(city) for city in cities]
+        index = {city["city_id"]: i for i, city in enumerate(cities)}
+
+        strengths = [(index[c], name) for c, name in strengths if c in index]
+        criteria = sorted({name for _, name in strengths})
+        if len(criteria) > MAX_CRITERIA:
+            raise ValueError(f"Au plus {MAX_CRITERIA} critères par instantané")
+        bit = {name: np.uint64(1) << np.uint64(b) for b, name in enumerate(criteria)}
+        masks = np.zeros(len(cities), dtype=np.uint64)
+        for i, name in strengths:
+            masks[i] |= bit[name]
+
+        # SIMILAR_TO est stocké une fois par paire : on indexe les deux sens
+        # (dédoublonné, au cas où le graphe contiendrait encore des paires en miroir)
+        directed: dict[tuple[int, int], float] = {}
+        for s, t, score in edges:
+            if s in index and t in index:
+                directed.setdefault((index[s], index[t]), score)
+                directed.setdefault((index[t], index[s]), score)
+        edges = [(s, t, score) for (s, t), score in directed.items()]
+        src = np.fromiter((e[0] for e in edges), dtype=np.int32, count=len(edges))
+        dst = np.fromiter((e[1] for e in edges), dtype=np.int32, count=len(edges))
+        weight = np.fromiter((e[2] for e in edges), dtype=np.float32, count=len(edges))
+        target_ids = np.fromiter(
+            (cities[j]["city_id"] for j in dst), dtype=np.int64, count=len(edges)
+        )
+
+        # Tri par source, puis score décroissant, puis city_id (lexsort : dernière clé prioritaire)
+        order = np.lexsort((target_ids, -weight, src))
+        indptr = np.zeros(len(cities) + 1, dtype=np.int64)
+        np.cumsum(np.bincount(src, minlength=len(cities)), out=indptr[1:])
+
+        return cls(
+            version=version,
+            cities=cities,
+            criteria=criteria,
+            masks=masks,
+            indptr=indptr,
+            indices=dst[order],
+            scores=weight[order],
+        )
+
+    @classmethod
+    async def load(cls, driver: AsyncDriver) -> GraphSnapshot:
+        """Charge le graphe depuis Neo4j dans une seule transaction de lecture."""
+
+        async def _read(tx):
+            version = await (await tx.run(VERSION_QUERY)).data()
+            cities = await (await tx.run(CITIES_QUERY)).data()
+            strengths = await (await tx.run(STRENGTHS_QUERY)).data()
+            edges = await (await tx.run(EDGES_QUERY)).data()
+            return version, cities, strengths, edges
+
+        async with driver.session() as session:
+            version, cities, strengths, edges = await session.execute_read(_read)
+
+        return cls.build(
+            version=version[0]["version"] if version else None,
+            cities=[record["city"] for record in cities],
+            strengths=((record["city_id"], record["name"]) for record in strengths),
+            edges=((record["source"], record["target"], record["score"]) for record in edges),
+        )
+
+    def _mask_names(self, mask: np.uint64) -> list[str]:
+        mask = int(mask)
+        return [name for b, name in enumerate(self._criteria) if mask >> b & 1]
+
+    async def get_similar_cities(self, city_id: int, k: int = 5) -> list[dict]:
+        """Mêmes résultats que Neo4jRepository.get_similar_cities, sans requête."""
+        i = self._index.get(city_id)
+        if i is None:
+            return []
+        start = self._indptr[i]
+        end = min(start + k, self._indptr[i + 1])
+        source_mask = self._masks[i]
+        return [
+            {
+                "city": dict(self._cities[j]),
+                "similarity_score": round(float(score), 6),
+                "common_strengths": self._mask_names(source_mask & self._masks[j]),
+            }
+            for j, score in zip(self._indices[start:end], self._scores[start:end])
+        ]
+
+    async def get_similar_cities_batch(
+        self, city_ids: list[int], k: int = 5
+    ) -> dict[int, list[dict]]:
+        """Mêmes résultats que Neo4jRepository.get_similar_cities_batch."""
+        return {city_id: await self.get_similar_cities(city_id, k=k) for city_id in city_ids}
+
+    async def get_city_strengths(self, city_id: int) -> list[str]:
+        """Mêmes résultats que Neo4jRepository.get_city_strengths, sans requête."""
+        i = self._index.get(city_id)
+        if i is None:
+            return []
+        return self._mask_names(self._masks[i])
+
+
+# ── Instantané courant (singleton) ─────────────────────────────
+
+_snapshot: GraphSnapshot | None = None
+
+
+def get_graph_snapshot() -> GraphSnapshot | None:
+    """Retourne l'instantané chargé, ou None (recommandations servies par Neo4j)."""
+    return _snapshot
+
+
+async def reload_graph_snapshot(driver: AsyncDriver, *, force: bool = False) -> bool:
+    """(Re)charge l'instantané si la version du graphe a changé.
+
+    Retourne True si un nouvel instantané a été chargé. Le remplacement est
+    atomique : les requêtes en cours gardent l'ancien instantané.
+    """
+    global _snapshot
+    if _snapshot is not None and not force:
+        version = await Neo4jRepository(driver).get_graph_version()
+        if version is not None and version == _snapshot.version:
+            return False
+    _snapshot = await GraphSnapshot.load(driver)
+    return True
+
+
+def clear_graph_snapshot() -> None:
+    global _snapshot
+    _snapshot = None
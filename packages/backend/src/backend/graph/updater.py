@@ -0,0 +1,393 @@
+"""Mise à jour incrémentale du graphe de similarité.
+
+Quand les notes de quelques villes changent, seules leurs relations
+STRONG_IN et les voisinages SIMILAR_TO concernés sont recalculés ; le diff
+est appliqué dans une seule transaction d'écriture, qui restampe la version
+du graphe. Le graphe reste servi pendant la mise à jour.
+
+Sans instantané mémoire, le cache des recommandations relit cette version
+(au plus tous les reco_graph_version_ttl) et s'invalide seul. L'instantané
+(reco_snapshot_enabled), lui, n'est rechargé qu'au démarrage de l'API ou
+par POST /recommendations/snapshot/reload : à appeler après une mise à
+jour, sinon l'ancien graphe reste servi.
+
+SIMILAR_TO est l'union des top-K de chaque ville, une relation par paire.
+Le top-K actuel d'une ville se déduit donc des relations stockées : ce sont
+les K meilleures de ses relations. Pour un ensemble C de villes modifiées :
+- les villes de C, et celles dont le top-K contient une ville de C (un
+  voisin sortant doit être remplacé), ont leur voisinage recalculé en entier ;
+- pour les autres, seules les villes de C peuvent entrer dans leur top-K.
+
+Les scores des paires sans ville modifiée restent ceux déjà stockés, alors
+que le centrage des notes (`score_vectors`) est recalculé sur toutes les
+villes : l'écart reste négligeable tant que peu de villes changent, et un
+seed complet réaligne l'ensemble.
+"""
+
+from __future__ import annotations
+
+from collections.abc import Iterable, Mapping, Sequence
+from datetime import datetime, timezone
+from typing import Optional
+
+import numpy as np
+from neo4j import AsyncDriver
+
+from backend.graph.similarity import (
+    SIMILARITY_BLOCK_SIZE,
+    score_vectors,
+    strength_matrix,
+    top_k_cosine,
+    with_common_strengths,
+)
+from backend.repositories.postgres_repo import PostgresRepository
+
+# Critère « fort » (relation STRONG_IN) à partir de cette note
+STRONG_IN_THRESHOLD = 7
+
+# Voisins SIMILAR_TO conservés par ville (couvre le k maximal de /recommendations)
+SIMILAR_TOP_K = 20
+
+# Poids par catégorie (label) du cosinus de similarité ; absent = 1, 0 = ignorée
+CATEGORY_WEIGHTS: dict[str, float] = {}
+
+# Écart de score en deçà duquel une relation existante n'est pas réécrite
+SCORE_TOLERANCE = 1e-6
+
+CRITERION_NODES_QUERY = """
+UNWIND $rows AS cat
+MERGE (c:Criterion {name: cat})
+"""
+
+CITY_NODES_QUERY = """
+UNWIND $rows AS row
+MERGE (c:City {city_id: row.city_id})
+SET c.name = row.name, c.department = row.department, c.region = row.region,
+    c.population = row.population, c.overall_score = row.overall_score
+"""
+
+REMOVE_CITIES_QUERY = """
+UNWIND $rows AS city_id
+MATCH (c:City {city_id: city_id})
+DETACH DELETE c
+"""
+
+PRUNE_CITIES_QUERY = """
+MATCH (c:City)
+WHERE NOT c.city_id IN $city_ids
+DETACH DELETE c
+"""
+
+# Supprime les STRONG_IN qui ne sont plus dans row.labels
+PRUNE_STRONG_IN_QUERY = """
+UNWIND $rows AS row
+MATCH (:City {city_id: row.city_id})-[r:STRONG_IN]->(cr:Criterion)
+WHERE NOT cr.name IN row.labels
+DELETE r
+"""
+
+STRONG_IN_QUERY = """
+UNWIND $rows AS row
+MATCH (city:City {city_id: row.city_id})
+MATCH (cr:Criterion {name: row.label})
+MERGE (city)-[:STRONG_IN]->(cr)
+"""
+
+SIMILAR_EDGES_QUERY = """
+MATCH (a:City)-[r:SIMILAR_TO]->(b:City)
+RETURN a.city_id AS source, b.city_id AS target,
+       r.score AS score, r.common_strengths AS common_strengths
+"""
+
+# MERGE non orienté : réutilise la relation existante, quel que soit son sens
+UPSERT_SIMILAR_TO_QUERY = """
+UNWIND $rows AS row
+MATCH (a:City {city_id: row.source})
+MATCH (b:City {city_id: row.target})
+MERGE (a)-[r:SIMILAR_TO]-(b)
+SET r.score = row.score, r.common_strengths = row.common_strengths
+"""
+
+DELETE_SIMILAR_TO_QUERY = """
+UNWIND $rows AS row
+MATCH (:City {city_id: row.source})-[r:SIMILAR_TO]-(:City {city_id: row.target})
+DELETE r
+"""
+
+# Version du graphe : permet aux caches et instantanés mémoire de détecter un changement
+GRAPH_VERSION_QUERY = """
+MERGE (m:GraphMeta {name: 'similarity'})
+SET m.version = $version
+"""
+
+
+def new_graph_version() -> str:
+    return datetime.now(timezone.utc).isoformat(timespec="milliseconds")
+
+
+def city_node(row: Mapping) -> dict:
+    """Propriétés d'un nœud :City à partir d'une ligne de la table cities."""
+    return {
+        "city_id": int(row["id"]),
+        "name": row["name"],
+        "department": row["department"],
+        "region": row["region"],
+        "population": int(row["population"] or 0),
+        "overall_score": float(row.get("overall_score") or 0),
+    }
+
+
+def similarity_inputs(
+    city_ids: Sequence[int],
+    score_rows: Iterable[Mapping],
+    *,
+    weights: Mapping[str, float] | None = None,
+    threshold: float = STRONG_IN_THRESHOLD,
+) -> tuple[list[str], np.ndarray, np.ndarray]:
+    """Critères, vecteurs de notes et matrice STRONG_IN des lignes {city_id, label, score}."""
+    rows = [(int(r["city_id"]), r["label"], float(r["score"])) for r in score_rows]
+    criteria = sorted({label for _, label, _ in rows})
+    vectors = score_vectors(
+        city_ids,
+        criteria,
+        rows,
+        weights=CATEGORY_WEIGHTS if weights is None else weights,
+    )
+    strengths = strength_matrix(
+        city_ids, criteria, ((c, label) for c, label, score in rows if score >= threshold)
+    )
+    return criteria, vectors, strengths
+
+
+def strong_labels(
+    city_ids: Iterable[int],
+    score_rows: Iterable[Mapping],
+    *,
+    threshold: float = STRONG_IN_THRESHOLD,
+) -> dict[int, list[str]]:
+    """Critères forts (relations STRONG_IN) de chaque ville de `city_ids`."""
+    labels: dict[int, list[str]] = {city_id: [] for city_id in city_ids}
+    for row in score_rows:
+        city_id = int(row["city_id"])
+        if city_id in labels and float(row["score"]) >= threshold:
+            labels[city_id].append(row["label"])
+    return labels
+
+
+def _best(scores: Mapping[int, float], k: int) -> dict[int, float]:
+    """Les k meilleurs voisins (score décroissant, puis city_id)."""
+    return dict(sorted(scores.items(), key=lambda item: (-item[1], item[0]))[:k])
+
+
+def _pair(a: int, b: int) -> tuple[int, int]:
+    return (a, b) if a < b else (b, a)
+
+
+def _entering(
+    city_ids: Sequence[int],
+    vectors: np.ndarray,
+    changed: Sequence[int],
+    others: Sequence[int],
+    top: Mapping[int, dict[int, float]],
+    *,
+    k: int,
+    block_size: int,
+) -> dict[int, dict[int, float]]:
+    """Villes modifiées qui entrent dans le top-K actuel des villes `others`."""
+    if not changed or not others:
+        return {}
+    index = {city_id: i for i, city_id in enumerate(city_ids)}
+    other_vectors = vectors[[index[j] for j in others]]
+    # Seuil d'entrée : K-ième voisin actuel (score, city_id) ; tout cosinus > 0 s'il en manque
+    last_ids = np.full(len(others), -1, dtype=np.int64)
+    last_scores = np.zeros(len(others))
+    for i, j in enumerate(others):
+        best = top.get(j, {})
+        if len(best) >= k:
+            last_ids[i], last_scores[i] = list(best.items())[k - 1]
+
+    gains: dict[int, dict[int, float]] = {}
+    for start in range(0, len(changed), block_size):
+        sources = np.array(changed[start : start + block_size])
+        sims = vectors[[index[c] for c in sources]] @ other_vectors.T
+        # Même arrondi que top_k_cosine
+        sims = np.minimum(sims, 1.0).astype(np.float64).round(6)
+        enters = (sims > 0) & (
+            (sims > last_scores) | ((sims == last_scores) & (sources[:, None] < last_ids))
+        )
+        for r, c in zip(*np.nonzero(enters)):
+            gains.setdefault(others[c], {})[int(sources[r])] = float(sims[r, c])
+    return gains
+
+
+def plan_similarity_update(
+    city_ids: Sequence[int],
+    vectors: np.ndarray,
+    strengths: np.ndarray,
+    criteria: Sequence[str],
+    stored: Iterable[Mapping],
+    changed: Iterable[int],
+    *,
+    k: int = SIMILAR_TOP_K,
+    block_size: int = SIMILARITY_BLOCK_SIZE,
+) -> tuple[list[dict], list[dict]]:
+    """Diff SIMILAR_TO après modification des villes `changed`.
+
+    `stored` contient les relations actuelles {source, target, score,
+    common_strengths}. Les ids de `changed` absents de `city_ids` sont des
+    villes supprimées. Retourne (upserts, deletes) : les relations
+    {source, target, score, common_strengths} à créer ou dont les valeurs
+    changent, et les paires {source, target} à supprimer (source < target).
+
+    Une paire stockée deux fois (ancien format miroir A->B et B->A) figure
+    dans les suppressions et, si elle reste voulue, dans les upserts : les
+    suppressions étant appliquées d'abord, il n'en reste qu'une relation.
+    """
+    index = {city_id: i for i, city_id in enumerate(city_ids)}
+    changed = set(changed)
+
+    stored_pairs: dict[tuple[int, int], Mapping] = {}
+    duplicates: set[tuple[int, int]] = set()
+    neighbours: dict[int, dict[int, float]] = {}
+    for edge in stored:
+        a, b = _pair(edge["source"], edge["target"])
+        if (a, b) in stored_pairs:
+            duplicates.add((a, b))
+        stored_pairs[(a, b)] = edge
+        neighbours.setdefault(a, {})[b] = edge["score"]
+        neighbours.setdefault(b, {})[a] = edge["score"]
+    top = {city_id: _best(scores, k) for city_id, scores in neighbours.items()}
+    # Villes du graphe sans notes : traitées comme supprimées
+    changed |= {city_id for city_id in neighbours if city_id not in index}
+
+    recompute = {c for c in changed if c in index}
+    recompute |= {j for j, best in top.items() if j in index and not changed.isdisjoint(best)}
+
+    # Nouveau top-K des villes touchées ; les autres gardent leur top-K actuel
+    new_top: dict[int, dict[int, float]] = {c: {} for c in changed | recompute}
+    for edge in top_k_cosine(city_ids, vectors, k=k, sources=recompute, block_size=block_size):
+        new_top[edge["source"]][edge["target"]] = edge["score"]
+    gains = _entering(
+        city_ids,
+        vectors,
+        sorted(c for c in changed if c in index),
+        [j for j in city_ids if j not in recompute],
+        top,
+        k=k,
+        block_size=block_size,
+    )
+    for j, entering in gains.items():
+        new_top[j] = _best({**top.get(j, {}), **entering}, k)
+
+    # Paires dont l'appartenance peut changer : celles qui touchent une ville recalculée
+    wanted: dict[tuple[int, int], float] = {}
+    for a, best in new_top.items():
+        for b, score in best.items():
+            wanted[_pair(a, b)] = score
+    for a in new_top:
+        for b in neighbours.get(a, {}):
+            pair = _pair(a, b)
+            if pair not in wanted and b not in new_top and a in top.get(b, {}):
+                wanted[pair] = top[b][a]
+
+    dropped = {_pair(a, b) for a in new_top for b in neighbours.get(a, {})} - wanted.keys()
+    # Paires en double hors du voisinage recalculé : recréées telles que stockées
+    for pair in duplicates - dropped - wanted.keys():
+        wanted[pair] = stored_pairs[pair]["score"]
+    deletes = sorted(dropped | duplicates)
+    candidates = [
+        {"source": a, "target": b, "score": score} for (a, b), score in sorted(wanted.items())
+    ]
+    upserts = []
+    for edge in with_common_strengths(candidates, city_ids, strengths, criteria):
+        pair = (edge["source"], edge["target"])
+        old = stored_pairs.get(pair)
+        if (
+            old is None
+            or pair in duplicates
+            or abs(old["score"] - edge["score"]) > SCORE_TOLERANCE
+            or list(old.get("common_strengths") or []) != edge["common_strengths"]
+        ):
+            upserts.append(edge)
+    return upserts, [{"source": a, "target": b} for a, b in deletes]
+
+
+async def load_similar_edges(driver: AsyncDriver) -> list[dict]:
+    """Relations SIMILAR_TO actuelles {source, target, score, common_strengths}."""
+    async with driver.session() as session:
+        result = await session.run(SIMILAR_EDGES_QUERY)
+        return await result.data()
+
+
+async def _run(tx, query: str, rows: list) -> None:
+    if rows:
+        result = await tx.run(query, rows=rows)
+        await result.consume()
+
+
+async def update_graph(
+    driver: AsyncDriver,
+    postgres_repo: PostgresRepository,
+    changed_ids: Iterable[int],
+    *,
+    k: int = SIMILAR_TOP_K,
+    weights: Mapping[str, float] | None = None,
+    version: Optional[str] = None,
+) -> dict:
+    """Répercute dans Neo4j les notes modifiées des villes `changed_ids`.
+
+    Les notes et villes sont relues dans PostgreSQL ; une ville absente de
+    la table cities est retirée du graphe. Le diff (nœuds City, STRONG_IN,
+    SIMILAR_TO, version) est écrit dans une seule transaction. L'instantané
+    mémoire de l'API n'est pas rechargé (cf. docstring du module).
+    Retourne un résumé {version, cities, removed, upserts, deletes}.
+    """
+    changed = sorted(set(changed_ids))
+    cities = [city_node(row) for row in await postgres_repo.get_cities_by_ids(changed)]
+    present = {city["city_id"] for city in cities}
+    removed = [c for c in changed if c not in present]
+
+    score_rows = await postgres_repo.get_all_scores()
+    city_ids = sorted({int(row["city_id"]) for row in score_rows} | present)
+    criteria, vectors, strengths = similarity_inputs(city_ids, score_rows, weights=weights)
+    upserts, deletes = plan_similarity_update(
+        city_ids,
+        vectors,
+        strengths,
+        criteria,
+        await load_similar_edges(driver),
+        changed,
+        k=k,
+    )
+
+    strong = [
+        {"city_id": c, "labels": names}
+        for c, names in strong_labels(sorted(present), score_rows).items()
+    ]
+    version = version or new_graph_version()
+
+    async def _apply(tx):
+        await _run(tx, CRITERION_NODES_QUERY, sorted({n for row in strong for n in row["labels"]}))
+        await _run(tx, CITY_NODES_QUERY, cities)
+        await _run(tx, REMOVE_CITIES_QUERY, removed)
+        await _run(tx, PRUNE_STRONG_IN_QUERY, strong)
+        await _run(
+            tx,
+            STRONG_IN_QUERY,
+            [{"city_id": row["city_id"], "label": n} for row in strong for n in row["labels"]],
+        )
+        await _run(tx, DELETE_SIMILAR_TO_QUERY, deletes)
+        await _run(tx, UPSERT_SIMILAR_TO_QUERY, upserts)
+        result = await tx.run(GRAPH_VERSION_QUERY, version=version)
+        await result.consume()
+
+    async with driver.session() as session:
+        await session.execute_write(_apply)
+
+    return {
+        "version": version,
+        "cities": len(cities),
+        "removed": len(removed),
+        "upserts": len(upserts),
+        "deletes": len(deletes),
+    }
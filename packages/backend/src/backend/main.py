@@ -2,6 +2,8 @@
 
 from __future__ import annotations
 
+import asyncio
+import logging
 from contextlib import asynccontextmanager
 
 from fastapi import FastAPI, Request
@@ -13,14 +15,74 @@ from backend.api.routes_reviews import router as reviews_router
 from backend.api.routes_reco import router as reco_router
 from backend.core.config import get_settings
 from backend.core.logging import setup_logging
-from backend.db.neo4j import close_neo4j
-from backend.models import HealthResponse
+from backend.db.mongo import get_mongo_db
+from backend.db.mongo_schema import apply_mongo_schema
+from backend.db.neo4j import close_neo4j, get_neo4j_driver
+from backend.db.neo4j_schema import apply_graph_schema, verify_graph_schema
+from backend.db.postgres import get_engine, get_pool_stats
+from backend.db.postgres_schema import ensure_schema
+from backend.graph.snapshot import clear_graph_snapshot, reload_graph_snapshot
+from backend.models import HealthResponse, PoolStatsResponse
+from backend.repositories.mongo_repo import MongoRepository
+from backend.repositories.review_buffer import (
+    close_review_write_buffer,
+    start_review_write_buffer,
+)
+
+
+logger = logging.getLogger("backend")
+
+
+async def apply_schemas() -> None:
+    """Applique les schémas gérés (idempotent).
+
+    Une base indisponible n'empêche pas le démarrage.
+    """
+    try:
+        await ensure_schema(get_engine())
+    except Exception as exc:
+        logger.warning("Schéma PostgreSQL non appliqué : %s", exc)
+    try:
+        # Sans MongoDB, la sélection du serveur bloquerait ~30 s le démarrage
+        await asyncio.wait_for(
+            apply_mongo_schema(get_mongo_db()), timeout=settings.mongo_schema_timeout
+        )
+    except TimeoutError:
+        logger.warning(
+            "Index MongoDB non appliqués : pas de réponse en %.0f s", settings.mongo_schema_timeout
+        )
+    except Exception as exc:
+        logger.warning("Index MongoDB non appliqués : %s", exc)
+    try:
+        driver = get_neo4j_driver()
+        await apply_graph_schema(driver)
+        if missing := await verify_graph_schema(driver):
+            logger.warning("Recherches Neo4j sans index seek : %s", ", ".join(missing))
+    except Exception as exc:
+        logger.warning("Schéma Neo4j non appliqué : %s", exc)
+
+
+async def load_graph_snapshot() -> None:
+    """Charge l'instantané du graphe ; en cas d'échec, les recommandations passent par Neo4j."""
+    try:
+        await reload_graph_snapshot(get_neo4j_driver(), force=True)
+    except Exception as exc:
+        logger.warning("Instantané du graphe non chargé : %s", exc)
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     setup_logging()
+    if settings.apply_schema_on_startup:
+        await apply_schemas()
+    if settings.reco_snapshot_enabled:
+        await load_graph_snapshot()
+    if settings.reviews_write_buffer_enabled:
+        start_review_write_buffer(MongoRepository(get_mongo_db()).insert_reviews)
     yield
+    # Avis en attente écrits avant de rendre la main
+    await close_review_write_buffer()
+    clear_graph_snapshot()
     await close_neo4j()
 
 
@@ -54,9 +116,7 @@ async def not_implemented_handler(request: Request, exc: NotImplementedError):
 @app.exception_handler(Exception)
 async def generic_error_handler(request: Request, exc: Exception):
     """Catch-all : erreurs non gérées → 500 propre (ex. DB indisponible)."""
-    import logging
-
-    logging.getLogger("backend").error("Unhandled error: %s", exc)
+    logger.error("Unhandled error: %s", exc)
     return JSONResponse(
         status_code=500,
         content={"detail": "Internal server error"},
@@ -73,3 +133,9 @@ app.include_router(reco_router)
 async def health():
     """Health check."""
     return HealthResponse(status="ok", version=settings.app_version)
+
+
+@app.get("/health/pool", response_model=PoolStatsResponse, tags=["system"])
+async def pool_stats():
+    """État du pool PostgreSQL (connexions occupées, overflow, attente)."""
+    return get_pool_stats()
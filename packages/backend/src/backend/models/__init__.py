@@ -4,26 +4,42 @@ from shared.schemas import (  # noqa: F401
     City,
     CityDetail,
     CityListResponse,
+    CityRecommendations,
     CityScores,
     HealthResponse,
     RecommendationItem,
+    RecommendationsBatchRequest,
+    RecommendationsBatchResponse,
     RecommendationsResponse,
     Review,
     ReviewCreate,
+    ReviewImport,
+    ReviewImportError,
+    ReviewImportResponse,
     ReviewsResponse,
     ScoreCategory,
 )
 
+from backend.models.system import GraphSnapshotResponse, PoolStatsResponse
+
 __all__ = [
     "City",
     "CityDetail",
     "CityListResponse",
+    "CityRecommendations",
     "CityScores",
+    "GraphSnapshotResponse",
     "HealthResponse",
+    "PoolStatsResponse",
     "RecommendationItem",
+    "RecommendationsBatchRequest",
+    "RecommendationsBatchResponse",
     "RecommendationsResponse",
     "Review",
     "ReviewCreate",
+    "ReviewImport",
+    "ReviewImportError",
+    "ReviewImportResponse",
     "ReviewsResponse",
     "ScoreCategory",
 ]
@@ -0,0 +1,29 @@
+"""Modèles spécifiques backend — supervision."""
+
+from __future__ import annotations
+
+from typing import Optional
+
+from pydantic import BaseModel, Field
+
+
+class PoolStatsResponse(BaseModel):
+    """État du pool de connexions PostgreSQL."""
+
+    size: int = Field(..., description="Taille nominale du pool")
+    checked_in: int = Field(..., description="Connexions disponibles")
+    checked_out: int = Field(..., description="Connexions en cours d'utilisation")
+    overflow: int = Field(..., description="Connexions ouvertes au-delà de size")
+    checkouts: int = Field(0, description="Checkouts réussis depuis le démarrage")
+    timeouts: int = Field(0, description="Checkouts abandonnés (pool_timeout)")
+    wait_avg_ms: float = Field(0.0, description="Attente moyenne d'une connexion")
+    wait_max_ms: float = Field(0.0, description="Attente maximale d'une connexion")
+
+
+class GraphSnapshotResponse(BaseModel):
+    """État de l'instantané mémoire du graphe de similarité."""
+
+    reloaded: bool = Field(..., description="Un nouvel instantané a été chargé")
+    version: Optional[str] = Field(None, description="Version du graphe (nœud :GraphMeta)")
+    cities: int = Field(0, description="Villes chargées")
+    edges: int = Field(0, description="Voisinages indexés (deux par relation SIMILAR_TO)")
@@ -6,16 +6,100 @@ via Motor (async).
 
 from __future__ import annotations
 
+from collections import Counter, defaultdict
+from collections.abc import Iterable
 from datetime import datetime, timezone
-from typing import Optional
+from typing import Any, Optional
 
-from motor.motor_asyncio import AsyncIOMotorDatabase
+from bson import ObjectId
+from motor.motor_asyncio import AsyncIOMotorCollection, AsyncIOMotorDatabase
+from pymongo import UpdateOne
+from pymongo.errors import BulkWriteError
+
+from backend.core.cursor import decode_cursor, encode_cursor
+from backend.db.mongo_schema import (
+    REVIEW_SORT,
+    REVIEW_STATS_COLLECTION,
+    REVIEW_STATS_REBUILD_COLLECTION,
+    REVIEWS_COLLECTION,
+)
+from backend.repositories.review_buffer import ReviewWriteBuffer
+
+# Avis par insert_many lors d'un import en masse
+REVIEW_INSERT_CHUNK_SIZE = 1000
+
+# Niveaux de l'histogramme des notes (ReviewCreate.rating)
+RATING_LEVELS = range(1, 6)
+
+# Les clés MongoDB ne peuvent contenir ni "." ni "$" initial : ces caractères
+# d'un tag sont remplacés par leurs équivalents pleine chasse.
+_TAG_KEY = str.maketrans({".": "\uff0e", "$": "\uff04"})
+_TAG_NAME = str.maketrans({"\uff0e": ".", "\uff04": "$"})
+
+
+def review_cursor(doc: dict) -> str:
+    """Curseur keyset pointant juste après l'avis `doc` (tel que retourné par get_reviews)."""
+    created_at = doc.get("created_at")
+    return encode_cursor(
+        {"c": created_at.isoformat() if created_at is not None else None, "id": doc["id"]}
+    )
+
+
+def _object_id(value: str) -> Any:
+    return ObjectId(value) if ObjectId.is_valid(value) else value
+
+
+def _seek_filter(cursor: str) -> dict:
+    """Filtre `(created_at, _id) < (c, id)` correspondant au curseur (tri décroissant).
+
+    Les avis sans date sont triés en dernier : ils restent à servir tant que
+    le curseur n'y est pas encore arrivé.
+    """
+    payload = decode_cursor(cursor)
+    if "id" not in payload or "c" not in payload:
+        raise ValueError("Curseur incompatible avec les avis")
+    last_id = _object_id(str(payload["id"]))
+    if payload["c"] is None:
+        return {"created_at": None, "_id": {"$lt": last_id}}
+    try:
+        created_at = datetime.fromisoformat(payload["c"])
+    except (TypeError, ValueError) as exc:
+        raise ValueError("Curseur de pagination invalide") from exc
+    return {
+        "$or": [
+            {"created_at": {"$lt": created_at}},
+            {"created_at": created_at, "_id": {"$lt": last_id}},
+            {"created_at": None},
+        ]
+    }
+
+
+def review_stats_increments(reviews: Iterable[dict]) -> Counter:
+    """Incréments `$inc` des statistiques d'une ville pour ces avis.
+
+    Document city_review_stats : {_id: city_id, count, rating_sum,
+    ratings: {"1".."5": n}, tags: {tag: n}}. Les tags vides, acceptés par
+    l'API, sont ignorés : "tags." n'est pas un chemin valide.
+    """
+    inc: Counter = Counter()
+    for review in reviews:
+        inc["count"] += 1
+        inc["rating_sum"] += review["rating"]
+        inc[f"ratings.{review['rating']}"] += 1
+        for tag in filter(None, review.get("tags") or []):
+            inc[f"tags.{tag.translate(_TAG_KEY)}"] += 1
+    return inc
 
 
 class MongoRepository:
-    def __init__(self, db: AsyncIOMotorDatabase):
+    def __init__(
+        self, db: AsyncIOMotorDatabase, *, write_buffer: Optional[ReviewWriteBuffer] = None
+    ):
         self.db = db
-        self.collection = db["reviews"]
+        self.collection = db[REVIEWS_COLLECTION]
+        self.stats = db[REVIEW_STATS_COLLECTION]
+        # Si fourni, create_review passe par le tampon (insert_many groupés)
+        self.write_buffer = write_buffer
 
     async def get_reviews(
         self,
@@ -23,9 +107,24 @@ class MongoRepository:
         *,
         page: int = 1,
         page_size: int = 10,
-    ) -> tuple[list[dict], int]:
+        cursor: Optional[str] = None,
+        include_total: bool = True,
+        lookahead: bool = False,
+    ) -> tuple[list[dict], Optional[int]]:
         """Récupère les avis pour une ville avec pagination.
 
+        Tri par created_at puis _id décroissants, servi par l'index
+        (city_id, created_at, _id) de backend.db.mongo_schema. Deux modes :
+        - page/page_size (skip/limit), historique ;
+        - keyset : si `cursor` (cf. review_cursor) est fourni, la page démarre
+          juste après l'avis qu'il désigne et `page` est ignoré ; le coût ne
+          dépend plus de la profondeur.
+        Le total est lu dans city_review_stats ; count_documents seulement si
+        la ville n'y figure pas. Avec include_total=False, il vaut None.
+        lookahead=True lit jusqu'à page_size + 1 avis (le skip reste celui de
+        la page) : l'avis en trop, à retirer par l'appelant, indique qu'une
+        page suivante existe.
+
         TODO: Implémenter avec Motor :
         - Filtrer par city_id
         - Trier par created_at décroissant
@@ -36,19 +135,20 @@ class MongoRepository:
         # TODO: Implémenter find + pagination + conversion _id -> id
         # ✂️ SOLUTION START
         query = {"city_id": city_id}
+        # Curseur décodé avant toute requête : un curseur invalide lève ValueError
+        seek = _seek_filter(cursor) if cursor else None
 
-        total = await self.collection.count_documents(query)
+        total = await self._count(city_id) if include_total else None
 
-        skip = (page - 1) * page_size
-        cursor = (
-            self.collection.find(query)
-            .sort("created_at", -1)
-            .skip(skip)
-            .limit(page_size)
-        )
+        if seek is not None:
+            find = self.collection.find({**query, **seek}).sort(REVIEW_SORT)
+        else:
+            skip = (page - 1) * page_size
+            find = self.collection.find(query).sort(REVIEW_SORT).skip(skip)
+        find = find.limit(page_size + 1 if lookahead else page_size)
 
         docs = []
-        async for doc in cursor:
+        async for doc in find:
             doc["id"] = str(doc.pop("_id"))
             docs.append(doc)
 
@@ -62,7 +162,21 @@ class MongoRepository:
         - Ajouter city_id et created_at au document
         - Insérer dans la collection reviews
         - Retourner le document créé (avec id converti en str)
+
+        Les statistiques de la ville sont mises à jour par un `$inc` atomique
+        si elles existent ; sinon (ville dont les avis précèdent la
+        collection city_review_stats), elles sont construites à partir de
+        tous ses avis. MongoDB autonome : pas de transaction entre les deux
+        écritures, rebuild_review_stats() resynchronise en cas d'écart.
+        Avec un tampon d'écriture, l'avis est écrit dans un lot (via
+        insert_reviews) avec les créations concurrentes.
         """
+        if self.write_buffer is not None:
+            doc = {**review_data, "city_id": city_id, "created_at": datetime.now(timezone.utc)}
+            doc["id"] = str(await self.write_buffer.submit(doc))
+            doc.pop("_id", None)
+            return doc
+
         # TODO: Implémenter insert_one + city_id/created_at, retourner doc avec id (str)
         # ✂️ SOLUTION START
         doc = {
@@ -74,8 +188,47 @@ class MongoRepository:
         result = await self.collection.insert_one(doc)
         doc["id"] = str(result.inserted_id)
         doc.pop("_id", None)
-        return doc
         # ✂️ SOLUTION END
+        result = await self.stats.update_one(
+            {"_id": city_id}, {"$inc": review_stats_increments([doc])}
+        )
+        if result.matched_count == 0:
+            await self._build_stats([city_id])
+        return doc
+
+    async def insert_reviews(
+        self, reviews: list[dict], *, chunk_size: int = REVIEW_INSERT_CHUNK_SIZE
+    ) -> dict[int, str]:
+        """Insère des avis (city_id inclus) par lots `insert_many` non ordonnés.
+
+        created_at vaut l'heure d'écriture s'il n'est pas fourni ; un `_id`
+        fourni est conservé. Un avis refusé par MongoDB n'empêche pas
+        l'écriture des autres.
+        Retourne les erreurs d'écriture {position dans `reviews`: message}.
+        Les statistiques des villes sont incrémentées lot par lot pour les
+        seuls avis insérés (construites depuis les avis si elles manquent).
+        """
+        errors: dict[int, str] = {}
+        created_at = datetime.now(timezone.utc)
+        for start in range(0, len(reviews), chunk_size):
+            chunk = [
+                {"created_at": created_at, **review}
+                for review in reviews[start : start + chunk_size]
+            ]
+            failed: set[int] = set()
+            try:
+                await self.collection.insert_many(chunk, ordered=False)
+            except BulkWriteError as exc:
+                for error in exc.details.get("writeErrors", []):
+                    failed.add(error["index"])
+                    errors[start + error["index"]] = error.get("errmsg", "Erreur d'écriture")
+
+            increments: dict[int, Counter] = defaultdict(Counter)
+            for i, doc in enumerate(chunk):
+                if i not in failed:
+                    increments[doc["city_id"]] += review_stats_increments([doc])
+            await self._apply_increments(increments)
+        return errors
 
     async def get_average_rating(self, city_id: int) -> Optional[float]:
         """Calcule la note moyenne pour une ville.
@@ -83,7 +236,14 @@ class MongoRepository:
         TODO: Implémenter un pipeline d'agrégation MongoDB :
         - $match par city_id
         - $group avec $avg sur rating
+
+        Lecture ponctuelle de city_review_stats ; l'agrégation ne sert que si
+        la ville n'y figure pas encore.
         """
+        stats = await self.get_review_stats(city_id)
+        if stats is not None:
+            return round(stats["rating_sum"] / stats["count"], 2) if stats["count"] else None
+
         # TODO: Implémenter pipeline d'agrégation $match + $group $avg
         # ✂️ SOLUTION START
         pipeline = [
@@ -96,3 +256,153 @@ class MongoRepository:
             return round(results[0]["avg_rating"], 2)
         return None
         # ✂️ SOLUTION END
+
+    async def get_average_ratings(self, city_ids: Iterable[int]) -> dict[int, float]:
+        """Notes moyennes de plusieurs villes ; les villes sans avis sont absentes.
+
+        Une lecture `$in` de city_review_stats ; les villes qui n'y figurent
+        pas passent par une seule agrégation $match `$in` + $group.
+        """
+        ids = list(dict.fromkeys(city_ids))
+        if not ids:
+            return {}
+
+        ratings: dict[int, float] = {}
+        found: set[int] = set()
+        async for doc in self.stats.find({"_id": {"$in": ids}}, {"count": 1, "rating_sum": 1}):
+            found.add(doc["_id"])
+            if doc.get("count"):
+                ratings[doc["_id"]] = round(doc["rating_sum"] / doc["count"], 2)
+
+        missing = [city_id for city_id in ids if city_id not in found]
+        if missing:
+            pipeline = [
+                {"$match": {"city_id": {"$in": missing}}},
+                {"$group": {"_id": "$city_id", "avg_rating": {"$avg": "$rating"}}},
+            ]
+            for row in await self.collection.aggregate(pipeline).to_list(length=None):
+                ratings[row["_id"]] = round(row["avg_rating"], 2)
+        return ratings
+
+    async def get_review_stats(self, city_id: int) -> Optional[dict]:
+        """Statistiques d'avis d'une ville, ou None si elles n'existent pas.
+
+        Retourne {count, rating_sum, ratings: {1..5: n}, tags: {tag: n}}.
+        """
+        doc = await self.stats.find_one({"_id": city_id})
+        if doc is None:
+            return None
+        ratings = doc.get("ratings") or {}
+        return {
+            "count": doc.get("count", 0),
+            "rating_sum": doc.get("rating_sum", 0),
+            "ratings": {level: ratings.get(str(level), 0) for level in RATING_LEVELS},
+            "tags": {
+                key.translate(_TAG_NAME): n for key, n in (doc.get("tags") or {}).items()
+            },
+        }
+
+    async def rebuild_review_stats(self) -> int:
+        """Recalcule city_review_stats depuis la collection reviews ; retourne le nombre de villes.
+
+        Deux agrégations (notes par ville, tags par ville) écrites dans
+        city_review_stats_rebuild, puis renommée sur city_review_stats : les
+        lectures voient les anciennes ou les nouvelles statistiques, jamais un
+        mélange. Les avis écrits entre l'agrégation et le renommage sont
+        incrémentés dans l'ancienne collection et donc perdus : à lancer
+        écritures d'avis arrêtées (seed, maintenance).
+        """
+        stats = await self._aggregate_stats()
+        rebuild = self.db[REVIEW_STATS_REBUILD_COLLECTION]
+        await rebuild.drop()
+        if not stats:
+            await self.stats.drop()
+            return 0
+        await self._write_stats(stats, "$set", collection=rebuild)
+        await rebuild.rename(REVIEW_STATS_COLLECTION, dropTarget=True)
+        return len(stats)
+
+    async def _aggregate_stats(self, city_ids: Optional[list[int]] = None) -> dict[int, Counter]:
+        """Statistiques {city_id: champs} recalculées depuis les avis (toutes villes par défaut).
+
+        Deux agrégations : notes par ville, tags par ville.
+        """
+        match = [{"$match": {"city_id": {"$in": city_ids}}}] if city_ids is not None else []
+        ratings = await self.collection.aggregate(
+            [
+                *match,
+                {"$group": {"_id": {"city_id": "$city_id", "rating": "$rating"}, "n": {"$sum": 1}}},
+            ]
+        ).to_list(length=None)
+        tags = await self.collection.aggregate(
+            [
+                *match,
+                {"$unwind": "$tags"},
+                {"$group": {"_id": {"city_id": "$city_id", "tag": "$tags"}, "n": {"$sum": 1}}},
+            ]
+        ).to_list(length=None)
+
+        stats: dict[int, Counter] = defaultdict(Counter)
+        for row in ratings:
+            city_id, rating, n = row["_id"]["city_id"], row["_id"]["rating"], row["n"]
+            stats[city_id]["count"] += n
+            stats[city_id]["rating_sum"] += rating * n
+            stats[city_id][f"ratings.{rating}"] += n
+        for row in tags:
+            if not row["_id"]["tag"]:
+                continue
+            tag = row["_id"]["tag"].translate(_TAG_KEY)
+            stats[row["_id"]["city_id"]][f"tags.{tag}"] += row["n"]
+        return stats
+
+    async def _apply_increments(self, increments: dict[int, Counter]) -> None:
+        """`$inc` des statistiques existantes ; construction complète pour les autres villes."""
+        if not increments:
+            return
+        cursor = self.stats.find({"_id": {"$in": list(increments)}}, {"_id": 1})
+        existing = {doc["_id"] async for doc in cursor}
+        await self._write_stats(
+            {city_id: inc for city_id, inc in increments.items() if city_id in existing}, "$inc"
+        )
+        missing = [city_id for city_id in increments if city_id not in existing]
+        if missing:
+            await self._build_stats(missing)
+
+    async def _build_stats(self, city_ids: list[int]) -> None:
+        """Construit les statistiques de villes qui n'en ont pas, depuis tous leurs avis.
+
+        Les avis déjà insérés (dont ceux qui déclenchent la construction)
+        sont comptés par l'agrégation, pas par un `$inc`. L'écriture se fait
+        en `$setOnInsert` : si une construction concurrente a déjà créé le
+        document, elle et les `$inc` qui l'ont suivie sont conservés.
+        """
+        await self._write_stats(await self._aggregate_stats(city_ids), "$setOnInsert")
+
+    async def _write_stats(
+        self,
+        stats: dict[int, Counter],
+        operator: str,
+        *,
+        collection: Optional[AsyncIOMotorCollection] = None,
+    ) -> None:
+        """Écrit {city_id: champs} avec `operator`, un upsert par ville.
+
+        `$inc` n'est appliqué qu'aux villes dont les statistiques existent
+        (cf. _apply_increments), `$setOnInsert` aux autres ; `$set` sert au
+        recalcul dans `collection` (city_review_stats par défaut).
+        """
+        if stats:
+            await (collection if collection is not None else self.stats).bulk_write(
+                [
+                    UpdateOne({"_id": city_id}, {operator: dict(fields)}, upsert=True)
+                    for city_id, fields in stats.items()
+                ],
+                ordered=False,
+            )
+
+    async def _count(self, city_id: int) -> int:
+        """Nombre d'avis d'une ville (city_review_stats, sinon count_documents)."""
+        doc = await self.stats.find_one({"_id": city_id}, {"count": 1})
+        if doc is not None:
+            return doc.get("count", 0)
+        return await self.collection.count_documents({"city_id": city_id})
@@ -6,7 +6,14 @@ via le driver Neo4j async.
 
 from __future__ import annotations
 
-from neo4j import AsyncDriver
+from typing import Optional
+
+from neo4j import AsyncDriver, Query
+from neo4j.exceptions import ClientError
+
+# Exploration à deux sauts : voisins retenus par saut et durée maximale (s)
+DISCOVERY_FAN_OUT = 10
+DISCOVERY_TIMEOUT = 2.0
 
 
 class Neo4jRepository:
@@ -35,19 +42,25 @@ class Neo4jRepository:
         """
         # TODO: Implémenter requête Cypher MATCH SIMILAR_TO, retourner city + similarity_score + common_strengths
         # ✂️ SOLUTION START
+        # Une relation SIMILAR_TO par paire : parcours sans orientation.
+        # Critères communs précalculés sur la relation (seed) ; repli sur la
+        # traversée STRONG_IN pour un graphe chargé avant leur ajout.
         query = """
-        MATCH (source:City {city_id: $city_id})-[r:SIMILAR_TO]->(target:City)
-        OPTIONAL MATCH (source)-[:STRONG_IN]->(c:Criterion)<-[:STRONG_IN]-(target)
-        WITH target, r.score AS similarity_score,
-             COLLECT(DISTINCT c.name) AS common_strengths
+        MATCH (source:City {city_id: $city_id})-[r:SIMILAR_TO]-(target:City)
+        WITH source, r, target
+        ORDER BY r.score DESC, target.city_id
+        LIMIT $k
         RETURN target {
             .city_id, .name, .department, .region,
             .population, .overall_score
         } AS city,
-        similarity_score,
-        common_strengths
-        ORDER BY similarity_score DESC
-        LIMIT $k
+        r.score AS similarity_score,
+        CASE
+            WHEN r.common_strengths IS NULL
+            THEN [(source)-[:STRONG_IN]->(c:Criterion)<-[:STRONG_IN]-(target) | c.name]
+            ELSE r.common_strengths
+        END AS common_strengths
+        ORDER BY similarity_score DESC, city.city_id
         """
 
         async with self.driver.session() as session:
@@ -64,6 +77,127 @@ class Neo4jRepository:
         ]
         # ✂️ SOLUTION END
 
+    async def get_similar_cities_batch(
+        self,
+        city_ids: list[int],
+        k: int = 5,
+    ) -> dict[int, list[dict]]:
+        """Villes similaires pour plusieurs villes sources, en une requête.
+
+        Même résultat que get_similar_cities pour chaque ville, indexé par
+        city_id source (liste vide si la ville est absente du graphe).
+        """
+        # ✂️ SOLUTION START
+        query = """
+        UNWIND $city_ids AS city_id
+        MATCH (source:City {city_id: city_id})
+        CALL {
+            WITH source
+            MATCH (source)-[r:SIMILAR_TO]-(target:City)
+            RETURN r, target
+            ORDER BY r.score DESC, target.city_id
+            LIMIT $k
+        }
+        RETURN source.city_id AS source_id,
+        target {
+            .city_id, .name, .department, .region,
+            .population, .overall_score
+        } AS city,
+        r.score AS similarity_score,
+        CASE
+            WHEN r.common_strengths IS NULL
+            THEN [(source)-[:STRONG_IN]->(c:Criterion)<-[:STRONG_IN]-(target) | c.name]
+            ELSE r.common_strengths
+        END AS common_strengths
+        ORDER BY source_id, similarity_score DESC, city.city_id
+        """
+
+        async with self.driver.session() as session:
+            result = await session.run(query, city_ids=city_ids, k=k)
+            records = await result.data()
+
+        results: dict[int, list[dict]] = {city_id: [] for city_id in city_ids}
+        for record in records:
+            results.setdefault(record["source_id"], []).append(
+                {
+                    "city": record["city"],
+                    "similarity_score": record["similarity_score"],
+                    "common_strengths": record["common_strengths"],
+                }
+            )
+        return results
+        # ✂️ SOLUTION END
+
+    async def get_discovery_cities(
+        self,
+        city_id: int,
+        k: int = 5,
+        *,
+        fan_out: int = DISCOVERY_FAN_OUT,
+        timeout: float = DISCOVERY_TIMEOUT,
+    ) -> list[dict]:
+        """Découverte : villes à deux sauts SIMILAR_TO, hors source et voisins directs.
+
+        Chaque saut ne garde que les `fan_out` relations les plus fortes, ce
+        qui borne le travail à fan_out² chemins quel que soit le degré des
+        nœuds. Le score agrège les chemins source → intermédiaire → cible
+        (poids w1 * w2) en « ou bruité » : 1 - Π(1 - w), dans [0, 1].
+        La requête est interrompue au-delà de `timeout` secondes
+        (TimeoutError).
+        """
+        # ✂️ SOLUTION START
+        query = """
+        MATCH (source:City {city_id: $city_id})
+        CALL {
+            WITH source
+            MATCH (source)-[r1:SIMILAR_TO]-(mid:City)
+            RETURN mid, r1.score AS w1
+            ORDER BY w1 DESC, mid.city_id
+            LIMIT $fan_out
+        }
+        CALL {
+            WITH source, mid
+            MATCH (mid)-[r2:SIMILAR_TO]-(target:City)
+            WHERE target <> source AND NOT (source)-[:SIMILAR_TO]-(target)
+            RETURN target, r2.score AS w2
+            ORDER BY w2 DESC, target.city_id
+            LIMIT $fan_out
+        }
+        WITH source, target, collect(w1 * w2) AS weights
+        WITH source, target,
+             1.0 - reduce(p = 1.0, w IN weights | p * (1.0 - w)) AS similarity_score
+        ORDER BY similarity_score DESC, target.city_id
+        LIMIT $k
+        RETURN target {
+            .city_id, .name, .department, .region,
+            .population, .overall_score
+        } AS city,
+        similarity_score,
+        [(source)-[:STRONG_IN]->(c:Criterion)<-[:STRONG_IN]-(target) | c.name] AS common_strengths
+        ORDER BY similarity_score DESC, city.city_id
+        """
+
+        try:
+            async with self.driver.session() as session:
+                result = await session.run(
+                    Query(query, timeout=timeout), city_id=city_id, k=k, fan_out=fan_out
+                )
+                records = await result.data()
+        except ClientError as exc:
+            if "TransactionTimedOut" in (exc.code or ""):
+                raise TimeoutError("Exploration du graphe trop coûteuse") from exc
+            raise
+
+        return [
+            {
+                "city": record["city"],
+                "similarity_score": record["similarity_score"],
+                "common_strengths": sorted(record["common_strengths"]),
+            }
+            for record in records
+        ]
+        # ✂️ SOLUTION END
+
     async def get_city_strengths(self, city_id: int) -> list[str]:
         """Récupère les points forts d'une ville (relations STRONG_IN).
 
@@ -84,3 +218,19 @@ class Neo4jRepository:
 
         return [record["name"] for record in records]
         # ✂️ SOLUTION END
+
+    async def get_graph_version(self) -> Optional[str]:
+        """Version du graphe stampée par le seed (nœud :GraphMeta), None si absente."""
+        # ✂️ SOLUTION START
+        query = """
+        MATCH (m:GraphMeta)
+        RETURN m.version AS version
+        LIMIT 1
+        """
+
+        async with self.driver.session() as session:
+            result = await session.run(query)
+            records = await result.data()
+
+        return records[0]["version"] if records else None
+        # ✂️ SOLUTION END
@@ -6,13 +6,129 @@ via SQLAlchemy async (ou raw SQL avec asyncpg).
 
 from __future__ import annotations
 
+import json
 from typing import Optional
 
 from sqlalchemy import text
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from backend.core.cursor import decode_cursor, encode_cursor
+from backend.db.postgres_schema import (
+    CITY_NULLABLE_SORT_COLUMNS,
+    CITY_SORT_COLUMNS,
+    NAME_SEARCH_EXPR,
+)
+
 # Colonnes autorisées pour le tri (protection contre l'injection SQL)
-_ALLOWED_SORT = {"overall_score", "population", "name", "department", "region"}
+_ALLOWED_SORT = set(CITY_SORT_COLUMNS)
+
+# Tri par pertinence (similarité trigramme), disponible seulement avec `search`
+_RELEVANCE_SORT = "relevance"
+_RELEVANCE_EXPR = f"similarity({NAME_SEARCH_EXPR}, immutable_unaccent(lower(:search_term)))"
+
+# Types JSON acceptés pour la valeur de tri d'un curseur (None : ligne à valeur NULL)
+_CURSOR_VALUE_TYPES: dict[str, tuple[type, ...]] = {
+    "overall_score": (int, float),
+    "population": (int,),
+    "name": (str,),
+    "department": (str,),
+    "region": (str,),
+    _RELEVANCE_SORT: (int, float),
+}
+
+
+# Estimation du nombre de lignes (statistiques du planner, -1 si jamais analysée)
+_ESTIMATED_TOTAL_SQL = (
+    "SELECT CASE WHEN reltuples < 0 THEN (SELECT COUNT(*) FROM cities) "
+    "ELSE reltuples::bigint END AS total_count "
+    "FROM pg_class WHERE oid = 'cities'::regclass"
+)
+
+
+def _resolve_sort(
+    sort_by: str, sort_order: str, search: Optional[str] = None
+) -> tuple[str, str]:
+    """Normalise (clé, direction) de tri à partir des paramètres utilisateur."""
+    if sort_by == _RELEVANCE_SORT and search:
+        col = _RELEVANCE_SORT
+    else:
+        col = sort_by if sort_by in _ALLOWED_SORT else "overall_score"
+    direction = "ASC" if sort_order == "asc" else "DESC"
+    return col, direction
+
+
+def _sort_expression(col: str) -> str:
+    """Expression SQL correspondant à une clé de tri résolue."""
+    return _RELEVANCE_EXPR if col == _RELEVANCE_SORT else col
+
+
+def _order_clause(col: str, direction: str, prefix: str = "") -> str:
+    """ORDER BY de la clé de tri puis id.
+
+    NULLS LAST seulement pour les colonnes nullables : pour name ou la
+    pertinence (jamais NULL), l'ordre reste celui d'un parcours de l'index
+    (col, id) dans un sens ou dans l'autre.
+    """
+    nulls = " NULLS LAST" if col in CITY_NULLABLE_SORT_COLUMNS else ""
+    expr = f"{prefix}{col}" if prefix else _sort_expression(col)
+    return f" ORDER BY {expr} {direction}{nulls}, {prefix}id {direction}"
+
+
+def _escape_like(value: str) -> str:
+    """Échappe les jokers LIKE saisis par l'utilisateur."""
+    return value.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+
+def city_cursor(
+    row: dict,
+    *,
+    sort_by: str = "overall_score",
+    sort_order: str = "desc",
+    search: Optional[str] = None,
+) -> str:
+    """Curseur keyset pointant juste après `row` pour le tri demandé."""
+    col, direction = _resolve_sort(sort_by, sort_order, search)
+    return encode_cursor({"s": col, "o": direction, "v": row.get(col), "id": row["id"]})
+
+
+def _is_json_instance(value: object, types: tuple[type, ...]) -> bool:
+    """isinstance sans les booléens JSON (bool est un int en Python)."""
+    return isinstance(value, types) and not isinstance(value, bool)
+
+
+def _keyset_conditions(cursor: str, col: str, direction: str, params: dict) -> list[str]:
+    """Prédicats de seek correspondant au curseur, un par branche de requête.
+
+    - `(col, id) > / < (v, id)` : borne d'index sur les valeurs non NULL ;
+    - pour une colonne nullable, les NULL (triés en dernier) forment une
+      seconde branche `col IS NULL`, à réunir par UNION ALL. Un OR entre
+      les deux empêcherait le planner d'utiliser la comparaison de lignes
+      comme borne d'index ;
+    - curseur déjà parmi les NULL : `col IS NULL AND id > / < :id`.
+
+    Le curseur vient du client : id et valeur de tri sont vérifiés (ValueError)
+    avant d'être liés à la requête.
+    """
+    payload = decode_cursor(cursor)
+    if payload.get("s") != col or payload.get("o") != direction or "id" not in payload:
+        raise ValueError("Curseur incompatible avec le tri demandé")
+    value = payload.get("v")
+    if (
+        not _is_json_instance(payload["id"], (int,))
+        or value is not None and not _is_json_instance(value, _CURSOR_VALUE_TYPES[col])
+    ):
+        raise ValueError("Curseur de pagination invalide")
+
+    expr = _sort_expression(col)
+    op = ">" if direction == "ASC" else "<"
+    params["cursor_id"] = payload["id"]
+    if value is None:
+        return [f"{expr} IS NULL AND id {op} :cursor_id"]
+    params["cursor_value"] = value
+    conditions = [f"({expr}, id) {op} (:cursor_value, :cursor_id)"]
+    if col in CITY_NULLABLE_SORT_COLUMNS:
+        conditions.append(f"{expr} IS NULL")
+    return conditions
 
 
 class PostgresRepository:
@@ -30,9 +146,34 @@ class PostgresRepository:
         sort_order: str = "desc",
         page: int = 1,
         page_size: int = 20,
-    ) -> tuple[list[dict], int]:
+        cursor: Optional[str] = None,
+        include_total: bool = True,
+        estimate_total: bool = False,
+        lookahead: bool = False,
+    ) -> tuple[list[dict], Optional[int]]:
         """Recherche de villes avec filtres, tri et pagination.
 
+        Deux modes de pagination :
+        - page/page_size (OFFSET/LIMIT), historique ;
+        - keyset : si `cursor` (cf. city_cursor) est fourni, la page démarre
+          juste après la ligne qu'il désigne et `page` est ignoré. Le coût
+          d'une page ne dépend alors plus de sa profondeur.
+        Le tri utilise toujours `id` comme départage stable.
+
+        La recherche par nom est insensible à la casse et aux accents
+        ("Besancon" trouve "Besançon") et s'appuie sur l'index trigramme
+        idx_cities_name_trgm. Avec sort_by="relevance", les résultats sont
+        classés par similarité avec le terme recherché.
+
+        Total et page sont lus en une seule requête (CTE). Avec
+        include_total=False le total n'est pas calculé (None) ; avec
+        estimate_total=True et sans filtre, il est lu dans les statistiques
+        du planner (pg_class.reltuples) au lieu d'un COUNT(*).
+
+        lookahead=True lit jusqu'à page_size + 1 lignes (l'OFFSET reste celui
+        de la page) : la ligne en trop, à retirer par l'appelant, indique
+        qu'une page suivante existe.
+
         TODO: Implémenter la requête SQL avec :
         - Filtre ILIKE sur le nom de ville (search)
         - Filtre exact sur region et department
@@ -47,8 +188,9 @@ class PostgresRepository:
         params: dict = {}
 
         if search:
-            conditions.append("name ILIKE :search")
-            params["search"] = f"%{search}%"
+            conditions.append(f"{NAME_SEARCH_EXPR} LIKE immutable_unaccent(lower(:search))")
+            params["search"] = f"%{_escape_like(search)}%"
+            params["search_term"] = search
         if region:
             conditions.append("region = :region")
             params["region"] = region
@@ -61,29 +203,56 @@ class PostgresRepository:
 
         where_clause = (" WHERE " + " AND ".join(conditions)) if conditions else ""
 
-        # Sécuriser le tri
-        col = sort_by if sort_by in _ALLOWED_SORT else "overall_score"
-        direction = "ASC" if sort_order == "asc" else "DESC"
-        order_clause = f" ORDER BY {col} {direction}"
+        # Sécuriser le tri (id en départage : ordre total, requis pour le keyset)
+        col, direction = _resolve_sort(sort_by, sort_order, search)
+        order_clause = _order_clause(col, direction)
+        relevance_column = f", {_RELEVANCE_EXPR} AS relevance" if col == _RELEVANCE_SORT else ""
+        select_sql = (
+            f"SELECT id, name, department, region, population, overall_score{relevance_column} "
+            "FROM cities"
+        )
 
-        # Total
-        count_sql = f"SELECT COUNT(*) FROM cities{where_clause}"
-        result = await self.session.execute(text(count_sql), params)
-        total = result.scalar_one()
+        # Pagination : seek après le curseur, sinon OFFSET
+        params["limit"] = page_size + 1 if lookahead else page_size
+        if cursor:
+            # Une branche par prédicat de seek, chacune servie par l'index et limitée
+            branches = [
+                f"{select_sql} WHERE {' AND '.join([*conditions, seek])}{order_clause} LIMIT :limit"
+                for seek in _keyset_conditions(cursor, col, direction, params)
+            ]
+            if len(branches) == 1:
+                page_sql = branches[0]
+            else:
+                union = " UNION ALL ".join(f"({branch})" for branch in branches)
+                page_sql = f"SELECT * FROM ({union}) AS seek{order_clause} LIMIT :limit"
+        else:
+            params["offset"] = (page - 1) * page_size
+            page_sql = f"{select_sql}{where_clause}{order_clause} LIMIT :limit OFFSET :offset"
+        if not include_total:
+            result = await self.session.execute(text(page_sql), params)
+            return [dict(r) for r in result.mappings().all()], None
 
-        # Données paginées
-        offset = (page - 1) * page_size
+        # Total (filtres seuls, indépendant du curseur) + page en un aller-retour.
+        # La jointure LEFT garantit une ligne portant le total même si la page est vide.
+        if estimate_total and not conditions:
+            total_sql = _ESTIMATED_TOTAL_SQL
+        else:
+            total_sql = f"SELECT COUNT(*) AS total_count FROM cities{where_clause}"
         data_sql = (
-            f"SELECT id, name, department, region, population, overall_score "
-            f"FROM cities{where_clause}{order_clause} "
-            f"LIMIT :limit OFFSET :offset"
+            f"WITH total AS ({total_sql}), page AS ({page_sql}) "
+            f"SELECT total.total_count, page.* FROM total LEFT JOIN page ON TRUE"
+            f"{_order_clause(col, direction, prefix='page.')}"
         )
-        params["limit"] = page_size
-        params["offset"] = offset
 
         result = await self.session.execute(text(data_sql), params)
-        rows = result.mappings().all()
-        return [dict(r) for r in rows], total
+        rows = [dict(r) for r in result.mappings().all()]
+        total = rows[0]["total_count"] if rows else 0
+        cities = []
+        for row in rows:
+            row.pop("total_count", None)
+            if row.get("id") is not None:
+                cities.append(row)
+        return cities, total
         # ✂️ SOLUTION END
 
     async def get_city_by_id(self, city_id: int) -> Optional[dict]:
@@ -105,6 +274,51 @@ class PostgresRepository:
         return dict(row) if row else None
         # ✂️ SOLUTION END
 
+    async def get_cities_by_ids(self, city_ids: list[int]) -> list[dict]:
+        """Récupère plusieurs villes (colonnes de résumé) en une requête.
+
+        Les villes sont retournées dans l'ordre de `city_ids` ; les ids
+        inconnus sont ignorés.
+        """
+        if not city_ids:
+            return []
+        # ✂️ SOLUTION START
+        sql = text(
+            "SELECT id, name, department, region, population, overall_score "
+            "FROM cities WHERE id = ANY(:ids)"
+        )
+        result = await self.session.execute(sql, {"ids": list(city_ids)})
+        by_id = {row["id"]: dict(row) for row in result.mappings().all()}
+        return [by_id[city_id] for city_id in city_ids if city_id in by_id]
+        # ✂️ SOLUTION END
+
+    async def get_city_with_scores(self, city_id: int) -> Optional[dict]:
+        """Ville + scores par catégorie en une seule requête.
+
+        Retourne les colonnes de get_city_by_id plus une clé "scores"
+        (liste de dicts comme get_city_scores), ou None si la ville n'existe pas.
+        """
+        # ✂️ SOLUTION START
+        sql = text(
+            "SELECT c.id, c.name, c.department, c.region, c.population, c.description, "
+            "c.latitude, c.longitude, c.overall_score, "
+            "(SELECT COALESCE(json_agg(json_build_object("
+            "'category', s.category, 'label', COALESCE(s.label, ''), 'score', s.score"
+            ") ORDER BY s.category), '[]'::json) "
+            "FROM scores s WHERE s.city_id = c.id) AS scores "
+            "FROM cities c WHERE c.id = :city_id"
+        )
+        result = await self.session.execute(sql, {"city_id": city_id})
+        row = result.mappings().first()
+        if row is None:
+            return None
+        city = dict(row)
+        # Selon le codec de connexion, le JSON peut arriver déjà décodé ou en texte
+        if isinstance(city["scores"], str):
+            city["scores"] = json.loads(city["scores"])
+        return city
+        # ✂️ SOLUTION END
+
     async def get_city_scores(self, city_id: int) -> list[dict]:
         """Récupère les scores par catégorie pour une ville.
 
@@ -121,3 +335,19 @@ class PostgresRepository:
         result = await self.session.execute(sql, {"city_id": city_id})
         return [dict(r) for r in result.mappings().all()]
         # ✂️ SOLUTION END
+
+    async def get_all_scores(self) -> list[dict]:
+        """Toutes les notes, pour recalculer les vecteurs de similarité.
+
+        Retourne une liste de dicts {city_id, category, label, score} ; le label
+        vaut la catégorie s'il est absent ou vide (nom des critères du graphe,
+        comme au seed).
+        """
+        # ✂️ SOLUTION START
+        sql = text(
+            "SELECT city_id, category, COALESCE(NULLIF(label, ''), category) AS label, score "
+            "FROM scores ORDER BY city_id, category"
+        )
+        result = await self.session.execute(sql)
+        return [dict(r) for r in result.mappings().all()]
+        # ✂️ SOLUTION END
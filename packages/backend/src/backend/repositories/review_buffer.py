@@ -0,0 +1,135 @@
+"""Tampon d'écriture des avis : regroupe les créations concurrentes.
+
+Sous forte charge, chaque `create_review` coûte un aller-retour MongoDB et
+une insertion journalisée. Le tampon met les avis en file et les écrit par
+lots (un `insert_many` non ordonné) : le premier avis d'un lot attend au
+plus `max_delay` secondes que d'autres le rejoignent.
+
+- Chaque avis reçoit son ObjectId avant la mise en file : l'appelant
+  récupère son id sans dépendre du lot.
+- La file est bornée (`max_queue`) : quand elle est pleine, `submit`
+  attend qu'une écriture libère de la place (contre-pression).
+- Une erreur d'écriture n'échoue que l'avis concerné (WriteError) ; une
+  erreur de lot (base indisponible) échoue tous les avis du lot.
+- `close()` refuse les nouveaux avis et écrit ceux en attente (arrêt de
+  l'application).
+"""
+
+from __future__ import annotations
+
+import asyncio
+import contextlib
+from collections.abc import Awaitable, Callable
+from typing import Any
+
+from bson import ObjectId
+from pymongo.errors import WriteError
+
+from backend.core.config import get_settings
+
+# Écriture d'un lot : avis -> erreurs {position: message}
+BatchWriter = Callable[[list[dict]], Awaitable[dict[int, str]]]
+
+
+class ReviewWriteBuffer:
+    def __init__(
+        self,
+        write: BatchWriter,
+        *,
+        max_batch: int = 500,
+        max_delay: float = 0.005,
+        max_queue: int = 10_000,
+    ):
+        self.max_batch = max_batch
+        self.max_delay = max_delay
+        self._write = write
+        self._queue: asyncio.Queue[tuple[dict, asyncio.Future]] = asyncio.Queue(max_queue)
+        self._worker: asyncio.Task | None = None
+        self._closed = False
+
+    async def submit(self, doc: dict) -> Any:
+        """Met un avis en file et attend son écriture ; retourne son _id.
+
+        Le document reçoit un `_id` s'il n'en a pas. Lève WriteError si
+        MongoDB refuse cet avis.
+        """
+        if self._closed:
+            raise RuntimeError("Tampon d'écriture des avis fermé")
+        if self._worker is None:
+            self._worker = asyncio.create_task(self._run())
+        doc.setdefault("_id", ObjectId())
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((doc, future))
+        await future
+        return doc["_id"]
+
+    async def close(self) -> None:
+        """Refuse les nouveaux avis, écrit ceux en file puis arrête l'écriture."""
+        self._closed = True
+        if self._worker is None:
+            return
+        await self._queue.join()
+        self._worker.cancel()
+        with contextlib.suppress(asyncio.CancelledError):
+            await self._worker
+        self._worker = None
+
+    async def _run(self) -> None:
+        while True:
+            batch = [await self._queue.get()]
+            # Laisse les créations concurrentes rejoindre le lot (sauf lot déjà plein ou arrêt)
+            if self._queue.qsize() < self.max_batch - 1 and not self._closed:
+                await asyncio.sleep(self.max_delay)
+            while len(batch) < self.max_batch and not self._queue.empty():
+                batch.append(self._queue.get_nowait())
+            await self._flush(batch)
+
+    async def _flush(self, batch: list[tuple[dict, asyncio.Future]]) -> None:
+        try:
+            errors = await self._write([doc for doc, _ in batch])
+        except Exception as exc:
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(exc)
+        else:
+            for i, (_, future) in enumerate(batch):
+                if future.done():  # appelant annulé : l'avis est tout de même écrit
+                    continue
+                if i in errors:
+                    future.set_exception(WriteError(errors[i]))
+                else:
+                    future.set_result(None)
+        finally:
+            for _ in batch:
+                self._queue.task_done()
+
+
+# ── Tampon partagé (singleton) ─────────────────────────────────
+
+_buffer: ReviewWriteBuffer | None = None
+
+
+def get_review_write_buffer() -> ReviewWriteBuffer | None:
+    """Tampon démarré avec l'application, ou None (écritures directes)."""
+    return _buffer
+
+
+def start_review_write_buffer(write: BatchWriter) -> ReviewWriteBuffer:
+    """Crée le tampon partagé (write : MongoRepository.insert_reviews)."""
+    global _buffer
+    settings = get_settings()
+    _buffer = ReviewWriteBuffer(
+        write,
+        max_batch=settings.reviews_write_buffer_max_batch,
+        max_delay=settings.reviews_write_buffer_delay_ms / 1000,
+        max_queue=settings.reviews_write_buffer_max_queue,
+    )
+    return _buffer
+
+
+async def close_review_write_buffer() -> None:
+    """Écrit les avis en attente et retire le tampon (arrêt de l'application)."""
+    global _buffer
+    if _buffer is not None:
+        buffer, _buffer = _buffer, None
+        await buffer.close()
@@ -0,0 +1,130 @@
+"""Benchmark — recherche de villes par nom : ILIKE vs index trigramme.
+
+Usage: python -m backend.scripts.bench_search [--rows 36000] [--runs 30] [--term besancon]
+
+Crée une table temporaire de communes synthétiques (les tables réelles ne
+sont pas modifiées), puis compare :
+1. l'ancien filtre `name ILIKE '%terme%'` (scan séquentiel, sensible aux accents) ;
+2. le filtre normalisé servi par l'index GIN pg_trgm + unaccent, classé par similarité.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import statistics
+import time
+
+from sqlalchemy import text
+
+from backend.db.postgres import get_engine
+from backend.db.postgres_schema import NAME_SEARCH_EXPR, SEARCH_FUNCTIONS, name_search_index
+
+BENCH_TABLE = "bench_cities"
+
+# Fragments de noms de communes (avec accents) combinés pour obtenir des noms variés
+_PREFIXES = [
+    "Besançon", "Saint-Étienne", "Orléans", "Nîmes", "Évreux", "Angoulême",
+    "Sèvres", "Montbéliard", "Besse", "Châlons", "Béziers", "Pézenas",
+    "Lyon", "Brest", "Caen", "Vénissieux", "Fréjus", "Épinal", "Mâcon",
+]
+_SUFFIXES = [
+    "", "-sur-Mer", "-les-Bains", "-en-Provence", "-sur-Loire", "-le-Château",
+    "-la-Forêt", "-de-Bretagne", "-sur-Saône", "-du-Lac", "-lès-Nancy",
+]
+
+_LEGACY_QUERY = f"""
+    SELECT id, name FROM {BENCH_TABLE}
+    WHERE name ILIKE :pattern
+    ORDER BY id LIMIT 20
+"""
+_LEGACY_COUNT = f"SELECT COUNT(*) FROM {BENCH_TABLE} WHERE name ILIKE :pattern"
+
+_TRGM_QUERY = f"""
+    SELECT id, name FROM {BENCH_TABLE}
+    WHERE {NAME_SEARCH_EXPR} LIKE immutable_unaccent(lower(:pattern))
+    ORDER BY similarity({NAME_SEARCH_EXPR}, immutable_unaccent(lower(:term))) DESC, id
+    LIMIT 20
+"""
+_TRGM_COUNT = (
+    f"SELECT COUNT(*) FROM {BENCH_TABLE} "
+    f"WHERE {NAME_SEARCH_EXPR} LIKE immutable_unaccent(lower(:pattern))"
+)
+
+
+async def _time_queries(conn, statements: list[str], params: dict, runs: int) -> list[float]:
+    """Chronomètre (en ms) l'enchaînement count + page, comme GET /cities."""
+    timings = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        for sql in statements:
+            await conn.execute(text(sql), params)
+        timings.append((time.perf_counter() - start) * 1000)
+    return timings
+
+
+def _report(label: str, timings: list[float], matches: int) -> None:
+    p95 = statistics.quantiles(timings, n=20)[-1] if len(timings) > 1 else timings[0]
+    print(
+        f"[bench] {label:<22} médiane {statistics.median(timings):8.2f} ms"
+        f" | p95 {p95:8.2f} ms | {matches} résultat(s)"
+    )
+
+
+async def run(rows: int, runs: int, term: str) -> None:
+    params = {"pattern": f"%{term}%", "term": term}
+    engine = get_engine()
+    async with engine.connect() as conn:
+        for statement in SEARCH_FUNCTIONS:
+            await conn.execute(text(statement))
+        await conn.execute(text(f"""
+            CREATE TEMP TABLE {BENCH_TABLE} (id INTEGER PRIMARY KEY, name TEXT NOT NULL)
+        """))
+        await conn.execute(
+            text(f"""
+                INSERT INTO {BENCH_TABLE} (id, name)
+                SELECT i, (CAST(:prefixes AS text[]))[1 + i % :n_prefixes]
+                          || (CAST(:suffixes AS text[]))[1 + (i / :n_prefixes) % :n_suffixes]
+                          || ' ' || i
+                FROM generate_series(1, :rows) AS i
+            """),
+            {
+                "prefixes": _PREFIXES,
+                "n_prefixes": len(_PREFIXES),
+                "suffixes": _SUFFIXES,
+                "n_suffixes": len(_SUFFIXES),
+                "rows": rows,
+            },
+        )
+        await conn.execute(text(f"ANALYZE {BENCH_TABLE}"))
+        print(f"[bench] {rows} communes synthétiques, terme '{term}', {runs} exécutions")
+
+        legacy_matches = (await conn.execute(text(_LEGACY_COUNT), params)).scalar_one()
+        legacy_timings = await _time_queries(conn, [_LEGACY_COUNT, _LEGACY_QUERY], params, runs)
+        _report("ILIKE (seq scan)", legacy_timings, legacy_matches)
+
+        await conn.execute(text(name_search_index(BENCH_TABLE)))
+        await conn.execute(text(f"ANALYZE {BENCH_TABLE}"))
+        trgm_matches = (await conn.execute(text(_TRGM_COUNT), params)).scalar_one()
+        trgm_timings = await _time_queries(conn, [_TRGM_COUNT, _TRGM_QUERY], params, runs)
+        _report("trigramme + unaccent", trgm_timings, trgm_matches)
+
+        plan = await conn.execute(text(f"EXPLAIN {_TRGM_QUERY}"), params)
+        print("[bench] Plan (trigramme) :")
+        for (line,) in plan:
+            print(f"    {line}")
+        await conn.rollback()
+    await engine.dispose()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=36000, help="Nombre de communes générées")
+    parser.add_argument("--runs", type=int, default=30, help="Exécutions par variante")
+    parser.add_argument("--term", default="besancon", help="Terme recherché")
+    args = parser.parse_args()
+    asyncio.run(run(args.rows, args.runs, args.term))
+
+
+if __name__ == "__main__":
+    main()
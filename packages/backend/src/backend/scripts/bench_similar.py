@@ -0,0 +1,144 @@
+"""Benchmark — stockage SIMILAR_TO : paires en miroir vs relation unique non orientée.
+
+Usage: python -m backend.scripts.bench_similar [--cities 5000] [--k 20] [--queries 200]
+
+Construit successivement deux graphes synthétiques sur le label :BenchCity
+(le graphe réel :City n'est pas modifié), avec le même top-K par ville :
+1. l'ancien stockage : (a)-[:SIMILAR_TO]->(b) et (b)-[:SIMILAR_TO]->(a) ;
+2. le nouveau : une relation par paire, parcourue sans orientation.
+
+Pour chacun : nombre de relations, taille estimée du store de relations,
+durée d'écriture et latence de la requête de recommandation (médiane, p95).
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import random
+import statistics
+import time
+
+import numpy as np
+
+from backend.db.neo4j import close_neo4j, get_neo4j_driver
+from backend.graph.similarity import to_undirected, top_k_similar
+
+BENCH_LABEL = "BenchCity"
+BATCH_SIZE = 5000
+
+# Taille d'un enregistrement relation (format record) + son bloc de propriétés
+_RELATIONSHIP_RECORD_BYTES = 34
+_PROPERTY_RECORD_BYTES = 41
+
+_NODES_QUERY = f"""
+UNWIND $rows AS city_id
+CREATE (:{BENCH_LABEL} {{city_id: city_id}})
+"""
+
+_EDGES_QUERY = f"""
+UNWIND $rows AS row
+MATCH (a:{BENCH_LABEL} {{city_id: row.source}})
+MATCH (b:{BENCH_LABEL} {{city_id: row.target}})
+CREATE (a)-[:SIMILAR_TO {{score: row.score}}]->(b)
+"""
+
+_LAYOUTS = {
+    "miroir (->)": f"""
+        MATCH (s:{BENCH_LABEL} {{city_id: $city_id}})-[r:SIMILAR_TO]->(t:{BENCH_LABEL})
+        RETURN t.city_id AS city_id, r.score AS score
+        ORDER BY score DESC LIMIT $k
+    """,
+    "non orienté (-)": f"""
+        MATCH (s:{BENCH_LABEL} {{city_id: $city_id}})-[r:SIMILAR_TO]-(t:{BENCH_LABEL})
+        RETURN t.city_id AS city_id, r.score AS score
+        ORDER BY score DESC LIMIT $k
+    """,
+}
+
+
+def _synthetic_edges(cities: int, k: int, seed: int = 7) -> list[dict]:
+    """Top-K orienté sur des critères forts aléatoires (8 critères, ~40 % forts)."""
+    rng = np.random.default_rng(seed)
+    strengths = rng.random((cities, 8)) < 0.4
+    return top_k_similar(list(range(1, cities + 1)), strengths, k=k)
+
+
+async def _run(tx, query: str, rows: list) -> None:
+    result = await tx.run(query, rows=rows)
+    await result.consume()
+
+
+async def _write(session, query: str, rows: list) -> None:
+    for i in range(0, len(rows), BATCH_SIZE):
+        await session.execute_write(_run, query, rows[i : i + BATCH_SIZE])
+
+
+async def _cleanup(session) -> None:
+    result = await session.run(
+        f"MATCH (n:{BENCH_LABEL}) CALL {{ WITH n DETACH DELETE n }} IN TRANSACTIONS OF 5000 ROWS"
+    )
+    await result.consume()
+
+
+def _report(label: str, relationships: int, write_s: float, timings: list[float]) -> None:
+    store_mb = relationships * (_RELATIONSHIP_RECORD_BYTES + _PROPERTY_RECORD_BYTES) / 1e6
+    p95 = statistics.quantiles(timings, n=20)[-1] if len(timings) > 1 else timings[0]
+    print(
+        f"[bench] {label:<16} {relationships:>9} relations (~{store_mb:6.1f} Mo)"
+        f" | écriture {write_s:6.2f} s"
+        f" | requête médiane {statistics.median(timings):6.2f} ms, p95 {p95:6.2f} ms"
+    )
+
+
+async def run(cities: int, k: int, queries: int) -> None:
+    pairs = to_undirected(_synthetic_edges(cities, k))
+    layouts = {
+        "miroir (->)": [
+            *pairs,
+            *({**e, "source": e["target"], "target": e["source"]} for e in pairs),
+        ],
+        "non orienté (-)": pairs,
+    }
+    sources = random.Random(7).choices(range(1, cities + 1), k=queries)
+    print(f"[bench] {cities} villes synthétiques, top-{k}, {queries} requêtes par variante")
+
+    driver = get_neo4j_driver()
+    async with driver.session() as session:
+        await _cleanup(session)
+        result = await session.run(
+            f"CREATE INDEX bench_city_id IF NOT EXISTS FOR (c:{BENCH_LABEL}) ON (c.city_id)"
+        )
+        await result.consume()
+        for label, rows in layouts.items():
+            await _write(session, _NODES_QUERY, list(range(1, cities + 1)))
+            await (await session.run("CALL db.awaitIndexes(60)")).consume()
+
+            start = time.perf_counter()
+            await _write(session, _EDGES_QUERY, rows)
+            write_s = time.perf_counter() - start
+
+            timings = []
+            for city_id in sources:
+                start = time.perf_counter()
+                result = await session.run(_LAYOUTS[label], city_id=city_id, k=k)
+                await result.data()
+                timings.append((time.perf_counter() - start) * 1000)
+
+            _report(label, len(rows), write_s, timings)
+            await _cleanup(session)
+        await (await session.run("DROP INDEX bench_city_id IF EXISTS")).consume()
+    await close_neo4j()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--cities", type=int, default=5000, help="Nombre de villes générées")
+    parser.add_argument("--k", type=int, default=20, help="Voisins SIMILAR_TO par ville")
+    parser.add_argument("--queries", type=int, default=200, help="Requêtes par variante")
+    args = parser.parse_args()
+    asyncio.run(run(args.cities, args.k, args.queries))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,31 @@
+"""Recalcul complet des statistiques d'avis par ville.
+
+Usage: python -m backend.scripts.rebuild_review_stats
+
+Relit la collection reviews et réécrit city_review_stats (nombre d'avis,
+somme des notes, histogramme 1–5, tags). À lancer après un import d'avis
+hors application ou si les compteurs incrémentaux ont divergé, écritures
+d'avis arrêtées : un avis créé pendant le recalcul n'y est pas compté.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import time
+
+from backend.db.mongo import get_mongo_db
+from backend.repositories.mongo_repo import MongoRepository
+
+
+async def run() -> None:
+    start = time.perf_counter()
+    cities = await MongoRepository(get_mongo_db()).rebuild_review_stats()
+    print(f"[stats] city_review_stats : {cities} villes | {time.perf_counter() - start:.2f} s")
+
+
+def main() -> None:
+    asyncio.run(run())
+
+
+if __name__ == "__main__":
+    main()
@@ -12,19 +12,132 @@ from __future__ import annotations
 
 import asyncio
 import csv
+import itertools
 import json
+import time
+from collections.abc import Iterable, Iterator, Mapping
 from datetime import datetime, timezone
 from pathlib import Path
 
 from sqlalchemy import text
 
+from backend.core.config import get_settings
 from backend.db.mongo import get_mongo_db
+from backend.db.mongo_schema import apply_mongo_schema
 from backend.db.postgres import get_session_factory
+from backend.db.postgres_schema import apply_schema
 from backend.db.neo4j import get_neo4j_driver
+from backend.db.neo4j_schema import apply_graph_schema, verify_graph_schema
+from backend.graph.updater import (
+    CITY_NODES_QUERY,
+    CRITERION_NODES_QUERY,
+    DELETE_SIMILAR_TO_QUERY,
+    GRAPH_VERSION_QUERY,
+    PRUNE_CITIES_QUERY,
+    PRUNE_STRONG_IN_QUERY,
+    SIMILAR_TOP_K,
+    STRONG_IN_QUERY,
+    UPSERT_SIMILAR_TO_QUERY,
+    city_node,
+    load_similar_edges,
+    new_graph_version,
+    plan_similarity_update,
+    similarity_inputs,
+    strong_labels,
+)
+from backend.repositories.mongo_repo import MongoRepository
 
 DATASETS_DIR = Path(__file__).resolve().parents[5] / "datasets"
 
 
+CITY_COLUMNS = (
+    "id",
+    "name",
+    "department",
+    "region",
+    "population",
+    "description",
+    "latitude",
+    "longitude",
+    "overall_score",
+)
+SCORE_COLUMNS = ("city_id", "category", "label", "score")
+
+# Lignes envoyées par lot (COPY ou executemany) : mémoire constante quel que soit le fichier
+COPY_BATCH_SIZE = 5000
+
+
+def _city_record(row: dict) -> tuple:
+    lat = row.get("latitude")
+    lon = row.get("longitude")
+    osc = row.get("overall_score")
+    return (
+        int(row["id"]),
+        row["name"],
+        row["department"],
+        row["region"],
+        int(row["population"]),
+        row.get("description") or "",
+        float(lat) if lat else None,
+        float(lon) if lon else None,
+        float(osc) if osc else 0.0,
+    )
+
+
+def _score_record(row: dict) -> tuple:
+    return (
+        int(row["city_id"]),
+        row["category"],
+        row.get("label") or "",
+        float(row["score"]),
+    )
+
+
+def _read_csv(path: Path, convert) -> Iterator[tuple]:
+    """Lit un CSV ligne à ligne et convertit chaque ligne en tuple typé."""
+    with open(path, newline="", encoding="utf-8") as f:
+        for row in csv.DictReader(f):
+            yield convert(row)
+
+
+async def copy_records(
+    session,
+    table: str,
+    columns: tuple[str, ...],
+    records: Iterable[tuple],
+    *,
+    batch_size: int = COPY_BATCH_SIZE,
+) -> int:
+    """Charge `records` dans `table` par lots, dans la transaction de la session.
+
+    Utilise le protocole COPY d'asyncpg ; avec un autre driver, se replie
+    sur un executemany par lot. Retourne le nombre de lignes chargées.
+    """
+    conn = await session.connection()
+    raw = await conn.get_raw_connection()
+    driver_conn = raw.driver_connection
+    use_copy = hasattr(driver_conn, "copy_records_to_table")
+    insert_sql = text(
+        f"INSERT INTO {table} ({', '.join(columns)}) "
+        f"VALUES ({', '.join(':' + c for c in columns)})"
+    )
+
+    total = 0
+    iterator = iter(records)
+    while batch := list(itertools.islice(iterator, batch_size)):
+        if use_copy:
+            await driver_conn.copy_records_to_table(table, records=batch, columns=list(columns))
+        else:
+            await session.execute(insert_sql, [dict(zip(columns, r)) for r in batch])
+        total += len(batch)
+    return total
+
+
+def _report(label: str, rows: int, elapsed: float) -> None:
+    rate = rows / elapsed if elapsed > 0 else float("inf")
+    print(f"[seed] {label} : {rows} lignes en {elapsed:.2f}s ({rate:,.0f} lignes/s)")
+
+
 async def seed_postgres():
     """Charge cities.csv et scores.csv dans PostgreSQL."""
     # TODO: Utiliser get_session_factory(), créer tables cities/scores, charger cities.csv et scores.csv
@@ -32,77 +145,21 @@ async def seed_postgres():
     # ✂️ SOLUTION START
     factory = get_session_factory()
     async with factory() as session:
-        # Créer les tables si nécessaire
-        await session.execute(text("""
-            CREATE TABLE IF NOT EXISTS cities (
-                id INTEGER PRIMARY KEY,
-                name TEXT NOT NULL,
-                department TEXT,
-                region TEXT,
-                population INTEGER DEFAULT 0,
-                description TEXT,
-                latitude DOUBLE PRECISION,
-                longitude DOUBLE PRECISION,
-                overall_score DOUBLE PRECISION DEFAULT 0
-            )
-        """))
-        await session.execute(text("""
-            CREATE TABLE IF NOT EXISTS scores (
-                city_id INTEGER NOT NULL,
-                category TEXT NOT NULL,
-                label TEXT,
-                score DOUBLE PRECISION NOT NULL
-            )
-        """))
+        # Créer tables, clés et index si nécessaire (cf. backend.db.postgres_schema)
+        await apply_schema(await session.connection())
         await session.commit()
 
-        # Vidage puis chargement cities
+        # Vidage puis chargement en une transaction (COPY par lots)
         await session.execute(text("DELETE FROM scores"))
         await session.execute(text("DELETE FROM cities"))
-        await session.commit()
-
-        cities_path = DATASETS_DIR / "cities.csv"
-        with open(cities_path, newline="", encoding="utf-8") as f:
-            reader = csv.DictReader(f)
-            for row in reader:
-                lat = row.get("latitude")
-                lon = row.get("longitude")
-                osc = row.get("overall_score")
-                await session.execute(
-                    text("""
-                        INSERT INTO cities (id, name, department, region, population, description, latitude, longitude, overall_score)
-                        VALUES (:id, :name, :department, :region, :population, :description, :latitude, :longitude, :overall_score)
-                    """),
-                    {
-                        "id": int(row["id"]),
-                        "name": row["name"],
-                        "department": row["department"],
-                        "region": row["region"],
-                        "population": int(row["population"]),
-                        "description": row.get("description") or "",
-                        "latitude": float(lat) if lat else None,
-                        "longitude": float(lon) if lon else None,
-                        "overall_score": float(osc) if osc else 0.0,
-                    },
-                )
-        await session.commit()
 
-        scores_path = DATASETS_DIR / "scores.csv"
-        with open(scores_path, newline="", encoding="utf-8") as f:
-            reader = csv.DictReader(f)
-            for row in reader:
-                await session.execute(
-                    text("""
-                        INSERT INTO scores (city_id, category, label, score)
-                        VALUES (:city_id, :category, :label, :score)
-                    """),
-                    {
-                        "city_id": int(row["city_id"]),
-                        "category": row["category"],
-                        "label": row.get("label") or "",
-                        "score": float(row["score"]),
-                    },
-                )
+        for table, columns, path, convert in (
+            ("cities", CITY_COLUMNS, DATASETS_DIR / "cities.csv", _city_record),
+            ("scores", SCORE_COLUMNS, DATASETS_DIR / "scores.csv", _score_record),
+        ):
+            start = time.perf_counter()
+            rows = await copy_records(session, table, columns, _read_csv(path, convert))
+            _report(table, rows, time.perf_counter() - start)
         await session.commit()
     # ✂️ SOLUTION END
     print("[seed] PostgreSQL — OK")
@@ -132,76 +189,107 @@ async def seed_mongo():
             docs.append(doc)
     if docs:
         await collection.insert_many(docs)
+    # Index (city_id, created_at, _id) : construit une fois les avis chargés
+    await apply_mongo_schema(db)
+    cities = await MongoRepository(db).rebuild_review_stats()
+    print(f"[seed] MongoDB city_review_stats : {cities} villes")
     # ✂️ SOLUTION END
     print("[seed] MongoDB — OK")
 
 
-async def seed_neo4j():
-    """Crée le graphe de villes, critères et relations dans Neo4j."""
+async def _write_rows(tx, query: str, rows: list) -> None:
+    result = await tx.run(query, rows=rows)
+    await result.consume()
+
+
+async def write_batched(session, query: str, rows: list, *, batch_size: int) -> int:
+    """Exécute `query` (UNWIND $rows) par lots, un lot par transaction d'écriture."""
+    for i in range(0, len(rows), batch_size):
+        await session.execute_write(_write_rows, query, rows[i : i + batch_size])
+    return len(rows)
+
+
+async def seed_neo4j(
+    batch_size: int | None = None,
+    similar_k: int = SIMILAR_TOP_K,
+    weights: Mapping[str, float] | None = None,
+):
+    """Crée ou met à jour le graphe de villes, critères et relations dans Neo4j.
+
+    batch_size : lignes par transaction (UNWIND $rows), NEO4J_SEED_BATCH_SIZE par défaut.
+    """
     # TODO: Utiliser get_neo4j_driver(), créer nœuds Criterion/City, relations STRONG_IN et SIMILAR_TO
     driver = get_neo4j_driver()
     # ✂️ SOLUTION START
+    batch_size = batch_size or get_settings().neo4j_seed_batch_size
+    cities_rows = [city_node(row) for row in _read_csv(DATASETS_DIR / "cities.csv", dict)]
+    scores_rows = [
+        {**row, "label": row.get("label") or row["category"]}
+        for row in _read_csv(DATASETS_DIR / "scores.csv", dict)
+    ]
+    city_ids = [row["city_id"] for row in cities_rows]
+    categories, vectors, strengths = similarity_inputs(city_ids, scores_rows, weights=weights)
+    strong = strong_labels(city_ids, scores_rows)
+    strong_rows = [
+        {"city_id": city_id, "label": label}
+        for city_id, labels in strong.items()
+        for label in labels
+    ]
+
+    # Contraintes d'unicité (index des MERGE / MATCH par clé), cf. backend.db.neo4j_schema
+    await apply_graph_schema(driver)
+
+    # Le graphe existant n'est pas vidé : les écritures sont idempotentes (MERGE) et
+    # seules les différences sont écrites, le graphe reste servi pendant le seed.
     async with driver.session() as session:
-        # Nettoyer le graphe (optionnel : supprimer nos nœuds)
-        await session.run("MATCH (n) DETACH DELETE n")
-
-        # 1) Créer les nœuds Criterion à partir des catégories distinctes des scores
-        categories_query = """
-        UNWIND $categories AS cat
-        MERGE (c:Criterion {name: cat})
-        """
-        # Lire les catégories depuis scores.csv
-        categories = set()
-        scores_path = DATASETS_DIR / "scores.csv"
-        with open(scores_path, newline="", encoding="utf-8") as f:
-            reader = csv.DictReader(f)
-            for row in reader:
-                categories.add(row.get("label") or row["category"])
-        await session.run(categories_query, categories=list(categories))
-
-        # 2) Créer les nœuds City depuis cities.csv
-        cities_path = DATASETS_DIR / "cities.csv"
-        cities_rows = []
-        with open(cities_path, newline="", encoding="utf-8") as f:
-            reader = csv.DictReader(f)
-            for row in reader:
-                cities_rows.append({
-                    "city_id": int(row["id"]),
-                    "name": row["name"],
-                    "department": row["department"],
-                    "region": row["region"],
-                    "population": int(row["population"]),
-                    "overall_score": float(row.get("overall_score") or 0),
-                })
-        for city in cities_rows:
-            await session.run("""
-                MERGE (c:City {city_id: $city_id})
-                SET c.name = $name, c.department = $department, c.region = $region,
-                    c.population = $population, c.overall_score = $overall_score
-            """, **city)
-
-        # 3) STRONG_IN : ville -> critère quand score >= 7
-        scores_path = DATASETS_DIR / "scores.csv"
-        with open(scores_path, newline="", encoding="utf-8") as f:
-            reader = csv.DictReader(f)
-            for row in reader:
-                if float(row["score"]) >= 7:
-                    label = row.get("label") or row["category"]
-                    await session.run("""
-                        MATCH (city:City {city_id: $city_id})
-                        MATCH (cr:Criterion {name: $label})
-                        MERGE (city)-[:STRONG_IN]->(cr)
-                    """, city_id=int(row["city_id"]), label=label)
-
-        # 4) SIMILAR_TO : paires de villes avec critères forts en commun (score in [0, 1], capped at 1)
-        await session.run("""
-            MATCH (a:City)-[:STRONG_IN]->(c:Criterion)<-[:STRONG_IN]-(b:City)
-            WHERE a.city_id < b.city_id
-            WITH a, b, count(c) AS common,
-                 CASE WHEN (0.5 + 0.1 * count(c)) > 1.0 THEN 1.0 ELSE 0.5 + 0.1 * count(c) END AS simScore
-            CREATE (a)-[:SIMILAR_TO {score: simScore}]->(b)
-            CREATE (b)-[:SIMILAR_TO {score: simScore}]->(a)
-        """)
+        result = await session.run(PRUNE_CITIES_QUERY, city_ids=city_ids)
+        await result.consume()
+
+        # 1) Criterion, 2) City, 3) STRONG_IN (ville -> critère quand score >= 7) : par lots UNWIND,
+        #    les STRONG_IN qui ne sont plus justifiés étant d'abord supprimés
+        for label, query, rows in (
+            ("Criterion", CRITERION_NODES_QUERY, categories),
+            ("City", CITY_NODES_QUERY, cities_rows),
+            (
+                "STRONG_IN (obsolètes)",
+                PRUNE_STRONG_IN_QUERY,
+                [{"city_id": c, "labels": labels} for c, labels in strong.items()],
+            ),
+            ("STRONG_IN", STRONG_IN_QUERY, strong_rows),
+        ):
+            start = time.perf_counter()
+            count = await write_batched(session, query, rows, batch_size=batch_size)
+            _report(f"Neo4j {label}", count, time.perf_counter() - start)
+
+        # 4) SIMILAR_TO : top-K voisins par ville selon le cosinus pondéré des notes par
+        #    catégorie, calculé en mémoire (cf. backend.graph.similarity), puis comparé aux
+        #    relations existantes (cf. backend.graph.updater). Une relation par paire (lue
+        #    sans orientation) ; les critères communs sont stockés sur la relation.
+        start = time.perf_counter()
+        upserts, deletes = plan_similarity_update(
+            city_ids,
+            vectors,
+            strengths,
+            categories,
+            await load_similar_edges(driver),
+            city_ids,
+            k=similar_k,
+        )
+        await write_batched(session, DELETE_SIMILAR_TO_QUERY, deletes, batch_size=batch_size)
+        count = await write_batched(
+            session, UPSERT_SIMILAR_TO_QUERY, upserts, batch_size=batch_size
+        )
+        _report(
+            f"Neo4j SIMILAR_TO ({len(deletes)} supprimées)", count, time.perf_counter() - start
+        )
+
+        version = new_graph_version()
+        result = await session.run(GRAPH_VERSION_QUERY, version=version)
+        await result.consume()
+        print(f"[seed] Neo4j version du graphe : {version}")
+
+    if missing := await verify_graph_schema(driver):
+        print(f"[seed] ATTENTION — recherches Neo4j sans index seek : {', '.join(missing)}")
     # ✂️ SOLUTION END
     print("[seed] Neo4j — OK")
 
@@ -0,0 +1,49 @@
+"""Mise à jour incrémentale du graphe après modification de notes.
+
+Usage: python -m backend.scripts.update_graph CITY_ID [CITY_ID ...]
+
+Relit dans PostgreSQL les notes et fiches des villes indiquées, recalcule
+leurs relations STRONG_IN et les voisinages SIMILAR_TO concernés, puis
+applique le diff dans Neo4j en une transaction (cf. backend.graph.updater).
+Le graphe n'est ni vidé ni réécrit : l'API continue de le servir. Si
+l'API sert les recommandations depuis l'instantané mémoire
+(reco_snapshot_enabled), appeler ensuite POST /recommendations/snapshot/reload.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import time
+
+from backend.db.neo4j import close_neo4j, get_neo4j_driver
+from backend.db.postgres import get_engine, get_session_factory
+from backend.graph.updater import SIMILAR_TOP_K, update_graph
+from backend.repositories.postgres_repo import PostgresRepository
+
+
+async def run(city_ids: list[int], k: int) -> None:
+    start = time.perf_counter()
+    async with get_session_factory()() as session:
+        summary = await update_graph(get_neo4j_driver(), PostgresRepository(session), city_ids, k=k)
+    print(
+        f"[update] {summary['cities']} villes mises à jour, {summary['removed']} retirées"
+        f" | SIMILAR_TO : {summary['upserts']} écrites, {summary['deletes']} supprimées"
+        f" | {time.perf_counter() - start:.2f} s"
+    )
+    print(f"[update] Neo4j version du graphe : {summary['version']}")
+    print("[update] Instantané mémoire de l'API : POST /recommendations/snapshot/reload")
+    await close_neo4j()
+    await get_engine().dispose()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("city_ids", type=int, nargs="+", help="Villes dont les notes ont changé")
+    parser.add_argument("--k", type=int, default=SIMILAR_TOP_K, help="Voisins SIMILAR_TO par ville")
+    args = parser.parse_args()
+    asyncio.run(run(args.city_ids, args.k))
+
+
+if __name__ == "__main__":
+    main()
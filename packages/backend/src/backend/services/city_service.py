@@ -9,12 +9,14 @@ from __future__ import annotations
 from typing import Optional
 
 from backend.models import City, CityDetail, CityListResponse, CityScores, ScoreCategory
-from backend.repositories.postgres_repo import PostgresRepository
+from backend.repositories.mongo_repo import MongoRepository
+from backend.repositories.postgres_repo import PostgresRepository, city_cursor
 
 
 class CityService:
-    def __init__(self, repo: PostgresRepository):
+    def __init__(self, repo: PostgresRepository, review_repo: Optional[MongoRepository] = None):
         self.repo = repo
+        self.review_repo = review_repo
 
     async def search_cities(
         self,
@@ -27,9 +29,21 @@ class CityService:
         sort_order: str = "desc",
         page: int = 1,
         page_size: int = 20,
+        cursor: Optional[str] = None,
+        include_total: bool = True,
+        estimate_total: bool = False,
+        include_ratings: bool = False,
     ) -> CityListResponse:
         """Recherche de villes avec filtres.
 
+        Si `cursor` est fourni, pagination keyset (page ignorée). Une ligne
+        de plus que page_size est lue : si elle existe, `next_cursor` permet
+        d'enchaîner en mode keyset. include_total=False évite le comptage
+        (total à None) : la présence de `next_cursor` suffit alors à savoir
+        s'il existe une page suivante.
+        include_ratings=True renseigne avg_rating pour toute la page en un
+        seul appel au repository des avis (si le service en a un).
+
         TODO: Appeler self.repo.get_cities(...) et convertir en CityListResponse.
         """
         # TODO: Appeler self.repo.get_cities(...) et convertir en CityListResponse.
@@ -43,39 +57,54 @@ class CityService:
             sort_order=sort_order,
             page=page,
             page_size=page_size,
+            cursor=cursor,
+            include_total=include_total,
+            estimate_total=estimate_total,
+            lookahead=True,
         )
         # ✂️ SOLUTION END
-        cities = [City(**row) for row in rows]
-        return CityListResponse(cities=cities, total=total, page=page, page_size=page_size)
+        has_next = len(rows) > page_size
+        rows = rows[:page_size]
+        ratings: dict[int, float] = {}
+        if include_ratings and self.review_repo is not None and rows:
+            ratings = await self.review_repo.get_average_ratings([row["id"] for row in rows])
+        cities = [City(**row, avg_rating=ratings.get(row["id"])) for row in rows]
+        next_cursor = None
+        if has_next:
+            next_cursor = city_cursor(
+                rows[-1], sort_by=sort_by, sort_order=sort_order, search=search
+            )
+        return CityListResponse(
+            cities=cities,
+            total=total,
+            page=page,
+            page_size=page_size,
+            next_cursor=next_cursor,
+        )
 
     async def get_city_detail(self, city_id: int) -> Optional[CityDetail]:
         """Détails complets d'une ville (infos + scores).
 
-        TODO:
-        1. Appeler self.repo.get_city_by_id(city_id)
-        2. Appeler self.repo.get_city_scores(city_id)
-        3. Combiner dans un CityDetail
+        Une seule requête : self.repo.get_city_with_scores(city_id).
         """
-        row = await self.repo.get_city_by_id(city_id)
+        row = await self.repo.get_city_with_scores(city_id)
         if row is None:
             return None
 
-        score_rows = await self.repo.get_city_scores(city_id)
-        scores = [ScoreCategory(**s) for s in score_rows]
+        scores = [ScoreCategory(**s) for s in row.pop("scores", [])]
 
         return CityDetail(**row, scores=scores)
 
     async def get_city_scores(self, city_id: int) -> Optional[CityScores]:
         """Scores d'une ville.
 
-        TODO: Appeler self.repo.get_city_scores(city_id) et convertir en CityScores.
+        Une seule requête : self.repo.get_city_with_scores(city_id).
         """
-        row = await self.repo.get_city_by_id(city_id)
+        row = await self.repo.get_city_with_scores(city_id)
         if row is None:
             return None
 
-        score_rows = await self.repo.get_city_scores(city_id)
-        scores = [ScoreCategory(**s) for s in score_rows]
+        scores = [ScoreCategory(**s) for s in row.get("scores", [])]
 
         overall = row.get("overall_score", 0.0)
         return CityScores(city_id=city_id, scores=scores, overall=overall)
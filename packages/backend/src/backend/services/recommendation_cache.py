@@ -0,0 +1,114 @@
+"""Cache des recommandations, invalidé par la version du graphe.
+
+Les recommandations ne dépendent que de (city_id, k) et du contenu du
+graphe, qui ne change qu'au seed (version stampée sur le nœud :GraphMeta).
+Une entrée est stockée par (city_id, mode, version) avec le plus grand k calculé :
+une demande avec un k plus petit est servie par le préfixe de ce résultat.
+
+Bornes : TTL par entrée et taille maximale (éviction LRU). La version du
+graphe est elle-même relue au plus une fois par `version_ttl` secondes.
+"""
+
+from __future__ import annotations
+
+import time
+from collections import OrderedDict
+from collections.abc import Awaitable, Callable
+from typing import Optional
+
+from backend.core.config import get_settings
+from backend.models import RecommendationsResponse
+
+
+class RecommendationCache:
+    def __init__(
+        self,
+        *,
+        maxsize: int = 1024,
+        ttl: float = 300.0,
+        version_ttl: float = 30.0,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.version_ttl = version_ttl
+        self._clock = clock
+        # (city_id, mode, version) -> (k, expiration, réponse) ; ordre = récence d'utilisation
+        self._entries: OrderedDict[
+            tuple[int, str, Optional[str]], tuple[int, float, RecommendationsResponse]
+        ] = OrderedDict()
+        self._version: Optional[str] = None
+        self._version_expires = float("-inf")
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    async def graph_version(self, fetch: Callable[[], Awaitable[Optional[str]]]) -> Optional[str]:
+        """Version du graphe, relue via `fetch` au plus une fois par version_ttl."""
+        now = self._clock()
+        if now >= self._version_expires:
+            self._version = await fetch()
+            self._version_expires = now + self.version_ttl
+        return self._version
+
+    def get(
+        self, city_id: int, k: int, version: Optional[str], *, mode: str = "similar"
+    ) -> Optional[RecommendationsResponse]:
+        """Réponse en cache pour (city_id, k, version) dans ce mode, ou None."""
+        key = (city_id, mode, version)
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        cached_k, expires, response = entry
+        if self._clock() >= expires:
+            del self._entries[key]
+            return None
+        if cached_k < k:
+            return None
+        self._entries.move_to_end(key)
+        if cached_k == k:
+            return response
+        return response.model_copy(update={"recommendations": response.recommendations[:k]})
+
+    def put(
+        self,
+        city_id: int,
+        k: int,
+        version: Optional[str],
+        response: RecommendationsResponse,
+        *,
+        mode: str = "similar",
+    ) -> None:
+        """Stocke une réponse ; une entrée valide avec un k plus grand est conservée."""
+        key = (city_id, mode, version)
+        now = self._clock()
+        entry = self._entries.get(key)
+        if entry is not None and entry[0] > k and now < entry[1]:
+            self._entries.move_to_end(key)
+            return
+        self._entries[key] = (k, now + self.ttl, response)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        self._entries.clear()
+        self._version_expires = float("-inf")
+
+
+_cache: RecommendationCache | None = None
+
+
+def get_recommendation_cache() -> RecommendationCache | None:
+    """Cache partagé entre les requêtes (None si désactivé dans la configuration)."""
+    global _cache
+    settings = get_settings()
+    if not settings.reco_cache_enabled:
+        return None
+    if _cache is None:
+        _cache = RecommendationCache(
+            maxsize=settings.reco_cache_size,
+            ttl=settings.reco_cache_ttl,
+            version_ttl=settings.reco_graph_version_ttl,
+        )
+    return _cache
@@ -5,65 +5,209 @@ TODO (étudiants) : Implémenter la logique d'orchestration.
 
 from __future__ import annotations
 
+import asyncio
+import contextlib
 from typing import Optional
 
-from backend.models import City, RecommendationItem, RecommendationsResponse
-from backend.repositories.neo4j_repo import Neo4jRepository
+from backend.graph.snapshot import GraphSnapshot
+from backend.models import (
+    City,
+    CityRecommendations,
+    RecommendationItem,
+    RecommendationsBatchResponse,
+    RecommendationsResponse,
+)
+from backend.repositories.neo4j_repo import (
+    DISCOVERY_FAN_OUT,
+    DISCOVERY_TIMEOUT,
+    Neo4jRepository,
+)
 from backend.repositories.postgres_repo import PostgresRepository
+from backend.services.recommendation_cache import RecommendationCache
+
+
+async def _cancel(task: asyncio.Task) -> None:
+    """Annule une tâche devenue inutile et attend sa fin (sans propager son erreur)."""
+    task.cancel()
+    with contextlib.suppress(asyncio.CancelledError, Exception):
+        await task
 
 
 class RecommendationService:
-    def __init__(self, neo4j_repo: Neo4jRepository, postgres_repo: PostgresRepository):
+    def __init__(
+        self,
+        neo4j_repo: Neo4jRepository,
+        postgres_repo: PostgresRepository,
+        snapshot: Optional[GraphSnapshot] = None,
+        cache: Optional[RecommendationCache] = None,
+        explore_fan_out: int = DISCOVERY_FAN_OUT,
+        explore_timeout: float = DISCOVERY_TIMEOUT,
+    ):
         self.neo4j_repo = neo4j_repo
         self.postgres_repo = postgres_repo
+        self.snapshot = snapshot
+        self.cache = cache
+        # Instantané mémoire du graphe : s'il est fourni, il remplace Neo4j pour les lectures
+        self.graph = snapshot if snapshot is not None else neo4j_repo
+        self.explore_fan_out = explore_fan_out
+        self.explore_timeout = explore_timeout
+
+    async def _graph_version(self, mode: str = "similar") -> Optional[str]:
+        """Version du graphe qui sert ce mode : explore interroge toujours Neo4j."""
+        if self.snapshot is not None and mode != "explore":
+            return self.snapshot.version
+        return await self.cache.graph_version(self.neo4j_repo.get_graph_version)
 
     async def get_recommendations(
         self,
         city_id: int,
         k: int = 5,
+        mode: str = "similar",
+    ) -> Optional[RecommendationsResponse]:
+        """Recommandations de villes similaires, servies depuis le cache si possible.
+
+        mode="similar" : voisins directs (SIMILAR_TO) ; mode="explore" :
+        découverte à deux sauts, toujours calculée par Neo4j.
+        Le cache est indexé par (city_id, mode, k, version du graphe) : un
+        nouveau seed change la version et invalide toutes les entrées. En
+        mode explore, la version est celle de Neo4j même avec un instantané.
+        """
+        if self.cache is None:
+            return await self._compute_recommendations(city_id, k, mode)
+        version = await self._graph_version(mode)
+        cached = self.cache.get(city_id, k, version, mode=mode)
+        if cached is not None:
+            return cached
+        response = await self._compute_recommendations(city_id, k, mode)
+        if response is not None:
+            self.cache.put(city_id, k, version, response, mode=mode)
+        return response
+
+    def _graph_query(self, city_id: int, k: int, mode: str):
+        if mode == "explore":
+            return self.neo4j_repo.get_discovery_cities(
+                city_id, k=k, fan_out=self.explore_fan_out, timeout=self.explore_timeout
+            )
+        return self.graph.get_similar_cities(city_id, k=k)
+
+    async def _compute_recommendations(
+        self,
+        city_id: int,
+        k: int = 5,
+        mode: str = "similar",
     ) -> Optional[RecommendationsResponse]:
         """Recommandations de villes similaires.
 
         TODO:
         1. Vérifier que la ville source existe (postgres_repo.get_city_by_id)
         2. Appeler neo4j_repo.get_similar_cities(city_id, k)
-        3. Pour chaque résultat, enrichir avec les infos Postgres si besoin
+        3. Enrichir tous les résultats avec les infos Postgres
+           (une seule requête : postgres_repo.get_cities_by_ids)
         4. Construire et retourner un RecommendationsResponse
+
+        Les étapes 1 et 2 sont indépendantes : la requête Neo4j est lancée
+        en tâche de fond pendant la vérification Postgres, et annulée si la
+        ville source n'existe pas. La latence vaut max(pg, neo4j) au lieu
+        de leur somme.
         """
-        source = await self.postgres_repo.get_city_by_id(city_id)
-        if source is None:
-            return None
         # TODO: Appeler neo4j_repo.get_similar_cities(city_id, k)
         # ✂️ SOLUTION START     
-        neo4j_results = await self.neo4j_repo.get_similar_cities(city_id, k=k)
+        neo4j_task = asyncio.create_task(self._graph_query(city_id, k, mode))
         # ✂️ SOLUTION END 
+        try:
+            source = await self.postgres_repo.get_city_by_id(city_id)
+        except BaseException:
+            await _cancel(neo4j_task)
+            raise
+        if source is None:
+            await _cancel(neo4j_task)
+            return None
+        neo4j_results = await neo4j_task
 
-        items = []
-        for rec in neo4j_results:
-            city_data = rec["city"]
-            # Enrichir avec les données Postgres si le graphe n'a pas tout
-            target_id = city_data.get("city_id")
-            if target_id:
-                pg_data = await self.postgres_repo.get_city_by_id(target_id)
-                if pg_data:
-                    city_data = pg_data
-
-            items.append(
-                RecommendationItem(
-                    city=City(
-                        id=city_data.get("id", city_data.get("city_id", 0)),
-                        name=city_data.get("name", ""),
-                        department=city_data.get("department", ""),
-                        region=city_data.get("region", ""),
-                        population=city_data.get("population", 0),
-                        overall_score=city_data.get("overall_score", 0.0),
-                    ),
-                    similarity_score=rec["similarity_score"],
-                    common_strengths=rec["common_strengths"],
-                )
-            )
+        # Enrichir avec les données Postgres si le graphe n'a pas tout (un seul aller-retour)
+        target_ids = _target_ids(neo4j_results)
+        pg_rows = await self.postgres_repo.get_cities_by_ids(target_ids) if target_ids else []
+        pg_by_id = {row["id"]: row for row in pg_rows}
 
         return RecommendationsResponse(
             source_city=source["name"],
-            recommendations=items,
+            recommendations=_build_items(neo4j_results, pg_by_id),
+        )
+
+    async def get_recommendations_batch(
+        self,
+        city_ids: list[int],
+        k: int = 5,
+    ) -> RecommendationsBatchResponse:
+        """Recommandations pour plusieurs villes sources.
+
+        Même orchestration que get_recommendations, mais groupée : une requête
+        graphe (UNWIND) lancée pendant la vérification des sources, puis un
+        seul get_cities_by_ids pour enrichir toutes les recommandations.
+        Les villes sources inexistantes sont listées dans not_found.
+        """
+        city_ids = list(dict.fromkeys(city_ids))
+        graph_task = asyncio.create_task(self.graph.get_similar_cities_batch(city_ids, k=k))
+        try:
+            sources = await self.postgres_repo.get_cities_by_ids(city_ids)
+        except BaseException:
+            await _cancel(graph_task)
+            raise
+        if not sources:
+            await _cancel(graph_task)
+            return RecommendationsBatchResponse(not_found=city_ids)
+        graph_results = await graph_task
+
+        pg_by_id = {row["id"]: row for row in sources}
+        source_ids = [city_id for city_id in city_ids if city_id in pg_by_id]
+        not_found = [city_id for city_id in city_ids if city_id not in pg_by_id]
+        target_ids = [
+            target_id
+            for city_id in source_ids
+            for target_id in _target_ids(graph_results.get(city_id, []))
+            if target_id not in pg_by_id
+        ]
+        if target_ids:
+            pg_rows = await self.postgres_repo.get_cities_by_ids(list(dict.fromkeys(target_ids)))
+            pg_by_id.update((row["id"], row) for row in pg_rows)
+
+        results = [
+            CityRecommendations(
+                city_id=city_id,
+                source_city=pg_by_id[city_id]["name"],
+                recommendations=_build_items(graph_results.get(city_id, []), pg_by_id),
+            )
+            for city_id in source_ids
+        ]
+        return RecommendationsBatchResponse(
+            results=results,
+            not_found=not_found,
+        )
+
+
+def _target_ids(neo4j_results: list[dict]) -> list[int]:
+    return [rec["city"]["city_id"] for rec in neo4j_results if rec["city"].get("city_id")]
+
+
+def _build_items(neo4j_results: list[dict], pg_by_id: dict[int, dict]) -> list[RecommendationItem]:
+    """Construit les RecommendationItem, en préférant les données Postgres."""
+    items = []
+    for rec in neo4j_results:
+        city_data = rec["city"]
+        city_data = pg_by_id.get(city_data.get("city_id"), city_data)
+
+        items.append(
+            RecommendationItem(
+                city=City(
+                    id=city_data.get("id", city_data.get("city_id", 0)),
+                    name=city_data.get("name", ""),
+                    department=city_data.get("department", ""),
+                    region=city_data.get("region", ""),
+                    population=city_data.get("population", 0),
+                    overall_score=city_data.get("overall_score", 0.0),
+                ),
+                similarity_score=rec["similarity_score"],
+                common_strengths=rec["common_strengths"],
+            )
         )
+    return items
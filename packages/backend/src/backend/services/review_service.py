@@ -5,8 +5,27 @@ TODO (étudiants) : Implémenter la logique d'orchestration.
 
 from __future__ import annotations
 
-from backend.models import Review, ReviewCreate, ReviewsResponse
-from backend.repositories.mongo_repo import MongoRepository
+from collections.abc import Callable, Iterable
+from typing import Any, Optional
+
+from pydantic import ValidationError
+
+from backend.models import (
+    Review,
+    ReviewCreate,
+    ReviewImport,
+    ReviewImportError,
+    ReviewImportResponse,
+    ReviewsResponse,
+)
+from backend.repositories.mongo_repo import MongoRepository, review_cursor
+
+
+def _validation_message(exc: ValidationError) -> str:
+    return "; ".join(
+        f"{'.'.join(map(str, err['loc']))}: {err['msg']}" if err["loc"] else err["msg"]
+        for err in exc.errors()
+    )
 
 
 class ReviewService:
@@ -19,17 +38,33 @@ class ReviewService:
         *,
         page: int = 1,
         page_size: int = 10,
+        cursor: Optional[str] = None,
+        include_total: bool = True,
     ) -> ReviewsResponse:
         """Récupère les avis d'une ville.
 
+        Si `cursor` est fourni, pagination keyset (page ignorée). Un avis de
+        plus que page_size est lu : s'il existe, `next_cursor` permet
+        d'enchaîner en mode keyset (seul indicateur avec include_total=False).
+
         TODO: Appeler self.repo.get_reviews(...) et convertir en ReviewsResponse.
         """
         # TODO: Appeler self.repo.get_reviews(...) et convertir en ReviewsResponse.
         # ✂️ SOLUTION START
-        docs, total = await self.repo.get_reviews(city_id, page=page, page_size=page_size)
+        docs, total = await self.repo.get_reviews(
+            city_id,
+            page=page,
+            page_size=page_size,
+            cursor=cursor,
+            include_total=include_total,
+            lookahead=True,
+        )
+        has_next = len(docs) > page_size
+        docs = docs[:page_size]
         reviews = [Review(city_id=city_id, **doc) for doc in docs]
         # ✂️ SOLUTION END
-        return ReviewsResponse(reviews=reviews, total=total)
+        next_cursor = review_cursor(docs[-1]) if has_next else None
+        return ReviewsResponse(reviews=reviews, total=total, next_cursor=next_cursor)
 
     async def create_review(self, city_id: int, review: ReviewCreate) -> Review:
         """Crée un nouvel avis.
@@ -43,3 +78,42 @@ class ReviewService:
         doc = await self.repo.create_review(city_id, data)
         return Review(city_id=city_id, **doc)
 
+    async def import_reviews(self, items: Iterable[Any]) -> ReviewImportResponse:
+        """Importe des avis de plusieurs villes (éléments JSON déjà décodés).
+
+        Chaque avis est validé par ReviewImport ; les avis invalides ou
+        refusés à l'écriture sont rapportés par position, les autres insérés.
+        """
+        return await self._import(items, ReviewImport.model_validate)
+
+    async def import_reviews_ndjson(self, lines: Iterable[bytes]) -> ReviewImportResponse:
+        """Comme import_reviews, à partir des lignes NDJSON non vides.
+
+        Une ligne qui n'est pas du JSON valide est une erreur de son seul avis.
+        """
+        return await self._import(lines, ReviewImport.model_validate_json)
+
+    async def _import(
+        self, items: Iterable[Any], validate: Callable[[Any], ReviewImport]
+    ) -> ReviewImportResponse:
+        errors: dict[int, str] = {}
+        positions: list[int] = []
+        docs: list[dict] = []
+        received = 0
+        for index, item in enumerate(items):
+            received += 1
+            try:
+                docs.append(validate(item).model_dump())
+                positions.append(index)
+            except ValidationError as exc:
+                errors[index] = _validation_message(exc)
+
+        if docs:
+            write_errors = await self.repo.insert_reviews(docs)
+            errors.update((positions[i], message) for i, message in write_errors.items())
+
+        return ReviewImportResponse(
+            received=received,
+            inserted=received - len(errors),
+            errors=[ReviewImportError(index=i, error=errors[i]) for i in sorted(errors)],
+        )
@@ -40,6 +40,7 @@ def search_cities(
     sort_order: str = "desc",
     page: int = 1,
     page_size: int = 20,
+    include_ratings: bool = False,
 ) -> dict:
     params: dict[str, Any] = {
         "sort_by": sort_by,
@@ -47,6 +48,8 @@ def search_cities(
         "page": page,
         "page_size": page_size,
     }
+    if include_ratings:
+        params["include_ratings"] = True
     if search:
         params["search"] = search
     if region:
@@ -96,3 +99,8 @@ def create_review(city_id: int, author: str, rating: int, comment: str, tags: li
 def get_recommendations(city_id: int, k: int = 5) -> dict:
     resp = _client.get("/recommendations", params={"city_id": city_id, "k": k})
     return _handle_response(resp)
+
+
+def get_recommendations_batch(city_ids: list[int], k: int = 5) -> dict:
+    resp = _client.post("/recommendations/batch", json={"city_ids": city_ids, "k": k})
+    return _handle_response(resp)
@@ -32,6 +32,7 @@ try:
         sort_order=filters["sort_order"],
         page=page,
         page_size=page_size,
+        include_ratings=True,
     )
 except Exception as e:
     st.error(f"Erreur lors de l'appel API : {e}")
@@ -50,12 +51,16 @@ st.markdown(f"**{total} ville(s) trouvée(s)** — Page {page}")
 # Tableau de résultats
 df = pd.DataFrame(cities)
 if not df.empty:
-    display_cols = ["name", "department", "region", "population", "overall_score"]
+    display_cols = {
+        "name": "Ville",
+        "department": "Département",
+        "region": "Région",
+        "population": "Population",
+        "overall_score": "Score global",
+        "avg_rating": "Note moyenne",
+    }
     available_cols = [c for c in display_cols if c in df.columns]
-    df_display = df[available_cols].copy()
-    df_display.columns = ["Ville", "Département", "Région", "Population", "Score global"][
-        : len(available_cols)
-    ]
+    df_display = df[available_cols].rename(columns=display_cols)
 
     st.dataframe(
         df_display,
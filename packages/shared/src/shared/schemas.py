@@ -37,6 +37,9 @@ class City(BaseModel):
     region: str = Field("", examples=["Auvergne-Rhône-Alpes"])
     population: int = Field(0, examples=[516092])
     overall_score: float = Field(0.0, ge=0, le=10)
+    avg_rating: Optional[float] = Field(
+        None, ge=1, le=5, description="Note moyenne des avis (GET /cities?include_ratings=true)"
+    )
 
 
 class CityDetail(City):
@@ -50,9 +53,13 @@ class CityDetail(City):
 
 class CityListResponse(BaseModel):
     cities: list[City] = []
-    total: int = 0
+    total: Optional[int] = Field(0, description="Nombre total de résultats (None si non demandé)")
     page: int = 1
     page_size: int = 20
+    next_cursor: Optional[str] = Field(
+        None,
+        description="Curseur opaque de la page suivante (pagination keyset)",
+    )
 
 
 # ── Reviews ────────────────────────────────────────────────────
@@ -73,9 +80,33 @@ class ReviewCreate(BaseModel):
     tags: list[str] = Field(default_factory=list)
 
 
+class ReviewImport(ReviewCreate):
+    """Avis d'un import en masse (ville précisée par avis)."""
+
+    city_id: int
+
+
+class ReviewImportError(BaseModel):
+    index: int = Field(..., description="Position de l'avis dans le lot (à partir de 0)")
+    error: str
+
+
+class ReviewImportResponse(BaseModel):
+    received: int = 0
+    inserted: int = 0
+    errors: list[ReviewImportError] = Field(
+        default_factory=list,
+        description="Avis rejetés (validation ou écriture) ; les autres sont insérés",
+    )
+
+
 class ReviewsResponse(BaseModel):
     reviews: list[Review] = []
-    total: int = 0
+    total: Optional[int] = Field(0, description="Nombre total d'avis (None si non demandé)")
+    next_cursor: Optional[str] = Field(
+        None,
+        description="Curseur opaque de la page suivante (pagination keyset)",
+    )
 
 
 # ── Recommendations ───────────────────────────────────────────
@@ -92,3 +123,20 @@ class RecommendationItem(BaseModel):
 class RecommendationsResponse(BaseModel):
     source_city: str = Field(..., examples=["Lyon"])
     recommendations: list[RecommendationItem] = []
+
+
+class RecommendationsBatchRequest(BaseModel):
+    city_ids: list[int] = Field(..., min_length=1, max_length=100, examples=[[1, 2, 3]])
+    k: int = Field(5, ge=1, le=20, description="Nombre de recommandations par ville")
+
+
+class CityRecommendations(RecommendationsResponse):
+    city_id: int
+
+
+class RecommendationsBatchResponse(BaseModel):
+    results: list[CityRecommendations] = []
+    not_found: list[int] = Field(
+        default_factory=list,
+        description="Villes sources inexistantes (ignorées)",
+    )
@@ -52,6 +52,17 @@ class TestListCities:
         resp = client.get("/cities", params={"region": "Bretagne"})
         assert resp.status_code in ACCEPT
 
+    def test_include_ratings(self, client):
+        resp = client.get("/cities", params={"include_ratings": True, "page_size": 5})
+        assert resp.status_code in ACCEPT
+        if resp.status_code == 200:
+            assert all("avg_rating" in city for city in resp.json()["cities"])
+
+    def test_invalid_cursor(self, client):
+        """Un curseur invalide doit être refusé (400) si implémenté."""
+        resp = client.get("/cities", params={"cursor": "pas-un-curseur!"})
+        assert resp.status_code in (400, 501)
+
     def test_sort_params(self, client):
         """Les paramètres de tri doivent être acceptés."""
         resp = client.get(
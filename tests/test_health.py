@@ -23,3 +23,13 @@ def test_health_response_schema(client):
     data = resp.json()
     assert isinstance(data["status"], str)
     assert isinstance(data["version"], str)
+
+
+def test_pool_stats(client):
+    """GET /health/pool doit exposer l'état du pool PostgreSQL."""
+    resp = client.get("/health/pool")
+    assert resp.status_code == 200
+
+    data = resp.json()
+    for key in ("size", "checked_in", "checked_out", "overflow", "wait_avg_ms"):
+        assert key in data
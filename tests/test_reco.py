@@ -45,3 +45,40 @@ class TestRecommendations:
                 assert "city" in reco
                 assert "similarity_score" in reco
                 assert "common_strengths" in reco
+
+
+    def test_explore_mode(self, client):
+        """mode=explore (découverte à deux sauts) doit être accepté."""
+        resp = client.get("/recommendations", params={"city_id": 1, "mode": "explore"})
+        assert resp.status_code in (*ACCEPT, 503)
+
+    def test_invalid_mode(self, client):
+        resp = client.get("/recommendations", params={"city_id": 1, "mode": "random"})
+        assert resp.status_code == 422
+
+class TestRecommendationsBatch:
+    """POST /recommendations/batch."""
+
+    def test_endpoint_exists(self, client):
+        resp = client.post("/recommendations/batch", json={"city_ids": [1, 2], "k": 3})
+        assert resp.status_code in ACCEPT
+
+    def test_requires_city_ids(self, client):
+        """city_ids est obligatoire et non vide."""
+        assert client.post("/recommendations/batch", json={"k": 3}).status_code == 422
+        assert client.post("/recommendations/batch", json={"city_ids": []}).status_code == 422
+
+    def test_k_bounds(self, client):
+        resp = client.post("/recommendations/batch", json={"city_ids": [1], "k": 21})
+        assert resp.status_code == 422
+
+    def test_response_schema_when_implemented(self, client):
+        resp = client.post("/recommendations/batch", json={"city_ids": [1, 2], "k": 3})
+        if resp.status_code == 200:
+            data = resp.json()
+            assert isinstance(data["results"], list)
+            assert isinstance(data["not_found"], list)
+            for result in data["results"]:
+                assert "city_id" in result
+                assert "source_city" in result
+                assert isinstance(result["recommendations"], list)
@@ -28,6 +28,11 @@ class TestGetReviews:
         resp = client.get("/cities/1/reviews", params={"page": 1, "page_size": 5})
         assert resp.status_code in ACCEPT
 
+    def test_invalid_cursor(self, client):
+        """Un curseur invalide doit être refusé (400) si implémenté."""
+        resp = client.get("/cities/1/reviews", params={"cursor": "pas-un-curseur!"})
+        assert resp.status_code in (400, 501)
+
 
 class TestCreateReview:
     """POST /cities/{city_id}/reviews."""
@@ -73,3 +78,30 @@ class TestCreateReview:
             assert "city_id" in data
             assert "author" in data
             assert "rating" in data
+
+
+class TestImportReviews:
+    """POST /reviews/bulk."""
+
+    def test_invalid_reviews_reported_per_item(self, client):
+        resp = client.post("/reviews/bulk", json=[{"city_id": 1, "rating": 0}, {"rating": 3}])
+        assert resp.status_code in ACCEPT
+        if resp.status_code == 200:
+            data = resp.json()
+            assert data["received"] == 2
+            assert data["inserted"] == 0
+            assert [error["index"] for error in data["errors"]] == [0, 1]
+
+    def test_ndjson_body(self, client):
+        resp = client.post(
+            "/reviews/bulk",
+            content=b'{"city_id": 1, "rating": 7}\n\nnot json\n',
+            headers={"Content-Type": "application/x-ndjson"},
+        )
+        assert resp.status_code in ACCEPT
+        if resp.status_code == 200:
+            assert [error["index"] for error in resp.json()["errors"]] == [0, 1]
+
+    def test_rejects_non_array_body(self, client):
+        resp = client.post("/reviews/bulk", json={"city_id": 1, "rating": 4})
+        assert resp.status_code in (400, 501)
@@ -120,6 +120,10 @@ def mongo_collection() -> MagicMock:
     collection.insert_one = AsyncMock(return_value=FakeInsertResult())
     collection.find = MagicMock(return_value=FakeCursor([]))
     collection.aggregate = MagicMock(return_value=FakeAggregationCursor([]))
+    collection.find_one = AsyncMock(return_value=None)
+    collection.update_one = AsyncMock()
+    collection.delete_many = AsyncMock()
+    collection.bulk_write = AsyncMock()
     return collection
 
 
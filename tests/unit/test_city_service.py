@@ -117,6 +117,74 @@ class TestSearchCities:
         assert result.page == 3
         assert result.page_size == 10
 
+    async def test_extra_row_exposes_next_cursor(self, service, mock_repo):
+        """La ligne lue en plus de la page fournit next_cursor, repassé tel quel au repo."""
+        mock_repo.get_cities.return_value = (
+            [
+                {
+                    "id": 4,
+                    "name": "Nantes",
+                    "department": "LA",
+                    "region": "PDL",
+                    "population": 300000,
+                    "overall_score": 7.8,
+                },
+                {"id": 9, "name": "Brest", "overall_score": 6.1},
+            ],
+            10,
+        )
+
+        result = await service.search_cities(page_size=1)
+        assert mock_repo.get_cities.call_args[1]["lookahead"] is True
+        assert [city.id for city in result.cities] == [4]
+        assert result.next_cursor
+
+        await service.search_cities(page_size=1, cursor=result.next_cursor)
+        kwargs = mock_repo.get_cities.call_args[1]
+        assert kwargs["cursor"] == result.next_cursor
+
+    async def test_include_ratings_single_review_call(self, mock_repo):
+        """include_ratings : une seule lecture des notes pour toute la page."""
+        review_repo = AsyncMock()
+        review_repo.get_average_ratings.return_value = {1: 4.25}
+        mock_repo.get_cities.return_value = (
+            [
+                {"id": 1, "name": "Lyon", "overall_score": 7.5},
+                {"id": 2, "name": "Brest", "overall_score": 6.1},
+            ],
+            2,
+        )
+        service = CityService(repo=mock_repo, review_repo=review_repo)
+
+        result = await service.search_cities(include_ratings=True)
+
+        review_repo.get_average_ratings.assert_awaited_once_with([1, 2])
+        assert [city.avg_rating for city in result.cities] == [4.25, None]
+
+        await service.search_cities()
+        review_repo.get_average_ratings.assert_awaited_once()
+
+    async def test_exactly_full_last_page_has_no_next_cursor(self, service, mock_repo):
+        """Dernière page pleine (pas de ligne en plus) : pas de curseur vers une page vide."""
+        mock_repo.get_cities.return_value = (
+            [{"id": 1, "name": "Lyon", "overall_score": 7.5},
+             {"id": 2, "name": "Brest", "overall_score": 6.1}],
+            None,
+        )
+
+        result = await service.search_cities(page_size=2, include_total=False)
+
+        assert len(result.cities) == 2
+        assert result.next_cursor is None
+
+    async def test_partial_page_has_no_next_cursor(self, service, mock_repo):
+        """Une page incomplète est la dernière : pas de next_cursor."""
+        mock_repo.get_cities.return_value = ([], 0)
+
+        result = await service.search_cities()
+
+        assert result.next_cursor is None
+
 
 # ── get_city_detail ─────────────────────────────────────────────
 
@@ -126,7 +194,7 @@ class TestGetCityDetail:
 
     async def test_returns_city_detail_with_scores(self, service, mock_repo):
         """Doit combiner les infos ville + scores dans un CityDetail."""
-        mock_repo.get_city_by_id.return_value = {
+        mock_repo.get_city_with_scores.return_value = {
             "id": 1,
             "name": "Lyon",
             "department": "Rhône",
@@ -136,10 +204,10 @@ class TestGetCityDetail:
             "latitude": 45.76,
             "longitude": 4.83,
             "overall_score": 7.5,
+            "scores": [
+                {"category": "environnement", "score": 8.0, "label": "Environnement"},
+            ],
         }
-        mock_repo.get_city_scores.return_value = [
-            {"category": "environnement", "score": 8.0, "label": "Environnement"},
-        ]
 
         result = await service.get_city_detail(1)
 
@@ -150,15 +218,15 @@ class TestGetCityDetail:
 
     async def test_returns_none_when_city_not_found(self, service, mock_repo):
         """Doit retourner None si la ville n'existe pas."""
-        mock_repo.get_city_by_id.return_value = None
+        mock_repo.get_city_with_scores.return_value = None
 
         result = await service.get_city_detail(99999)
 
         assert result is None
 
-    async def test_calls_both_repo_methods(self, service, mock_repo):
-        """Doit appeler get_city_by_id ET get_city_scores."""
-        mock_repo.get_city_by_id.return_value = {
+    async def test_uses_single_fused_query(self, service, mock_repo):
+        """Doit lire ville + scores via get_city_with_scores, en un appel."""
+        mock_repo.get_city_with_scores.return_value = {
             "id": 1,
             "name": "Lyon",
             "department": "Rhône",
@@ -168,17 +236,18 @@ class TestGetCityDetail:
             "latitude": 0.0,
             "longitude": 0.0,
             "overall_score": 7.0,
+            "scores": [],
         }
-        mock_repo.get_city_scores.return_value = []
 
         await service.get_city_detail(1)
 
-        mock_repo.get_city_by_id.assert_called_once_with(1)
-        mock_repo.get_city_scores.assert_called_once_with(1)
+        mock_repo.get_city_with_scores.assert_called_once_with(1)
+        mock_repo.get_city_by_id.assert_not_called()
+        mock_repo.get_city_scores.assert_not_called()
 
     async def test_handles_empty_scores(self, service, mock_repo):
         """Doit fonctionner même si la ville n'a aucun score."""
-        mock_repo.get_city_by_id.return_value = {
+        mock_repo.get_city_with_scores.return_value = {
             "id": 1,
             "name": "Lyon",
             "department": "Rhône",
@@ -188,8 +257,8 @@ class TestGetCityDetail:
             "latitude": 0.0,
             "longitude": 0.0,
             "overall_score": 7.0,
+            "scores": [],
         }
-        mock_repo.get_city_scores.return_value = []
 
         result = await service.get_city_detail(1)
 
@@ -205,18 +274,18 @@ class TestGetCityScores:
 
     async def test_returns_city_scores(self, service, mock_repo):
         """Doit retourner un CityScores avec les scores convertis."""
-        mock_repo.get_city_by_id.return_value = {
+        mock_repo.get_city_with_scores.return_value = {
             "id": 1,
             "name": "Lyon",
             "department": "Rhône",
             "region": "ARA",
             "population": 500000,
             "overall_score": 7.5,
+            "scores": [
+                {"category": "env", "score": 8.0, "label": "Environnement"},
+                {"category": "sante", "score": 7.0, "label": "Santé"},
+            ],
         }
-        mock_repo.get_city_scores.return_value = [
-            {"category": "env", "score": 8.0, "label": "Environnement"},
-            {"category": "sante", "score": 7.0, "label": "Santé"},
-        ]
 
         result = await service.get_city_scores(1)
 
@@ -224,10 +293,11 @@ class TestGetCityScores:
         assert result.city_id == 1
         assert result.overall == 7.5
         assert len(result.scores) == 2
+        mock_repo.get_city_with_scores.assert_called_once_with(1)
 
     async def test_returns_none_when_city_not_found(self, service, mock_repo):
         """Doit retourner None si la ville n'existe pas."""
-        mock_repo.get_city_by_id.return_value = None
+        mock_repo.get_city_with_scores.return_value = None
 
         result = await service.get_city_scores(99999)
 
@@ -15,7 +15,7 @@ Fichier à implémenter :
 
 from __future__ import annotations
 
-from unittest.mock import MagicMock, patch
+from unittest.mock import AsyncMock, MagicMock, patch
 
 import pytest
 
@@ -83,3 +83,48 @@ class TestGetMongoDb:
             second = mongo.get_mongo_db()
 
         assert first is second
+
+
+class TestApplyMongoSchema:
+    """mongo_schema.apply_mongo_schema() — Index gérés."""
+
+    async def test_creates_review_index(self):
+        """Doit créer l'index composé (city_id, created_at, _id) sur reviews."""
+        from backend.db.mongo_schema import apply_mongo_schema
+
+        collection = MagicMock()
+        collection.create_indexes = AsyncMock(return_value=["reviews_city_created_id"])
+        db = MagicMock()
+        db.__getitem__ = MagicMock(return_value=collection)
+
+        assert await apply_mongo_schema(db) == ["reviews_city_created_id"]
+
+        db.__getitem__.assert_called_once_with("reviews")
+        (indexes,), _ = collection.create_indexes.call_args
+        assert [index.document["key"] for index in indexes] == [
+            {"city_id": 1, "created_at": -1, "_id": -1}
+        ]
+
+
+class TestApplySchemasAtStartup:
+    """main.apply_schemas() — Étape MongoDB bornée dans le temps."""
+
+    async def test_unreachable_mongo_does_not_block_startup(self, caplog):
+        import asyncio
+
+        import backend.main as main
+
+        async def never_answers(db):
+            await asyncio.Event().wait()
+
+        with (
+            patch.object(main, "ensure_schema", AsyncMock()),
+            patch.object(main, "get_engine"),
+            patch.object(main, "get_mongo_db"),
+            patch.object(main, "apply_mongo_schema", never_answers),
+            patch.object(main, "get_neo4j_driver", side_effect=RuntimeError("off")),
+            patch.object(main.settings, "mongo_schema_timeout", 0.01),
+        ):
+            await asyncio.wait_for(main.apply_schemas(), timeout=1)
+
+        assert "Index MongoDB non appliqués" in caplog.text
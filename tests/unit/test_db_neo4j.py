@@ -15,7 +15,7 @@ Fichier à implémenter :
 
 from __future__ import annotations
 
-from unittest.mock import MagicMock, patch
+from unittest.mock import AsyncMock, MagicMock, patch
 
 import pytest
 
@@ -80,3 +80,59 @@ class TestGetNeo4jDriver:
             second = neo4j.get_neo4j_driver()
 
         assert first is second
+
+
+class TestGraphSchema:
+    """neo4j_schema — Contraintes d'unicité et vérification des plans."""
+
+    @staticmethod
+    def _driver(session):
+        driver = MagicMock()
+        ctx = AsyncMock()
+        ctx.__aenter__ = AsyncMock(return_value=session)
+        ctx.__aexit__ = AsyncMock(return_value=False)
+        driver.session = MagicMock(return_value=ctx)
+        return driver
+
+    def test_constraints_are_idempotent_and_unique(self):
+        """City.city_id et Criterion.name doivent être uniques, créés IF NOT EXISTS."""
+        from backend.db.neo4j_schema import CONSTRAINTS
+
+        ddl = " ".join(CONSTRAINTS)
+        assert all("IF NOT EXISTS" in stmt for stmt in CONSTRAINTS)
+        assert "FOR (c:City) REQUIRE c.city_id IS UNIQUE" in ddl
+        assert "FOR (c:Criterion) REQUIRE c.name IS UNIQUE" in ddl
+
+    async def test_apply_runs_constraints_then_waits_for_indexes(self):
+        """Doit exécuter chaque contrainte puis attendre les index."""
+        from backend.db.neo4j_schema import CONSTRAINTS, apply_graph_schema
+
+        session = AsyncMock()
+        await apply_graph_schema(self._driver(session))
+
+        queries = [c[0][0] for c in session.run.call_args_list]
+        assert queries[: len(CONSTRAINTS)] == CONSTRAINTS
+        assert "db.awaitIndexes" in queries[-1]
+
+    async def test_verify_reports_lookups_without_index_seek(self):
+        """Un plan sans index seek doit être signalé."""
+        from backend.db.neo4j_schema import verify_graph_schema
+
+        seek = {
+            "operatorType": "ProduceResults@neo4j",
+            "children": [{"operatorType": "NodeUniqueIndexSeek@neo4j", "children": []}],
+        }
+        scan = {
+            "operatorType": "ProduceResults@neo4j",
+            "children": [{"operatorType": "NodeByLabelScan@neo4j", "children": []}],
+        }
+        results = [AsyncMock(), AsyncMock()]
+        results[0].consume.return_value = MagicMock(plan=seek)
+        results[1].consume.return_value = MagicMock(plan=scan)
+        session = AsyncMock()
+        session.run.side_effect = results
+
+        missing = await verify_graph_schema(self._driver(session))
+
+        assert missing == ["Criterion.name"]
+        assert all(c[0][0].startswith("EXPLAIN ") for c in session.run.call_args_list)
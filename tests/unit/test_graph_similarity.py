@@ -0,0 +1,252 @@
+"""Tests unitaires — Similarité vectorisée (backend.graph.similarity).
+
+Commande :
+    uv run pytest tests/unit/test_graph_similarity.py -v
+"""
+
+from __future__ import annotations
+
+import numpy as np
+import pytest
+
+from backend.graph.similarity import (
+    linear_common_score,
+    score_vectors,
+    strength_matrix,
+    to_undirected,
+    top_k_cosine,
+    top_k_similar,
+    with_common_strengths,
+)
+
+pytestmark = pytest.mark.sprint2
+
+CRITERIA = ["Culture", "Emploi", "Santé", "Transports"]
+
+
+def _strengths(pairs):
+    return strength_matrix([1, 2, 3, 4], CRITERIA, pairs)
+
+
+class TestStrengthMatrix:
+    def test_builds_boolean_matrix(self):
+        m = _strengths([(1, "Culture"), (1, "Santé"), (3, "Emploi")])
+
+        assert m.shape == (4, 4)
+        assert m.dtype == bool
+        assert m[0].tolist() == [True, False, True, False]
+        assert m[2].tolist() == [False, True, False, False]
+        assert not m[1].any()
+
+    def test_ignores_unknown_city_or_criterion(self):
+        m = _strengths([(99, "Culture"), (1, "Inconnu")])
+
+        assert not m.any()
+
+
+class TestTopKSimilar:
+    def test_matches_cypher_formula(self):
+        """Score = 0.5 + 0.1 * critères communs, comme l'ancien motif Cypher."""
+        m = _strengths([(1, "Culture"), (1, "Santé"), (2, "Culture"), (2, "Santé"), (3, "Culture")])
+
+        edges = top_k_similar([1, 2, 3, 4], m, k=5)
+        from_1 = [e for e in edges if e["source"] == 1]
+
+        assert [(e["target"], e["common"]) for e in from_1] == [(2, 2), (3, 1)]
+        assert from_1[0]["score"] == pytest.approx(0.7)
+        assert from_1[1]["score"] == pytest.approx(0.6)
+
+    def test_excludes_self_and_pairs_without_common_strength(self):
+        m = _strengths([(1, "Culture"), (2, "Culture"), (4, "Emploi")])
+
+        edges = top_k_similar([1, 2, 3, 4], m, k=5)
+
+        assert {(e["source"], e["target"]) for e in edges} == {(1, 2), (2, 1)}
+
+    def test_keeps_only_top_k_with_deterministic_ties(self):
+        m = _strengths([(i, "Culture") for i in (1, 2, 3, 4)] + [(4, "Santé"), (1, "Santé")])
+
+        edges = top_k_similar([1, 2, 3, 4], m, k=2)
+        from_1 = [e["target"] for e in edges if e["source"] == 1]
+        from_2 = [e["target"] for e in edges if e["source"] == 2]
+
+        assert from_1 == [4, 2]
+        assert from_2 == [1, 3]
+
+    def test_score_formula_is_pluggable(self):
+        m = _strengths([(1, "Culture"), (2, "Culture")])
+
+        edges = top_k_similar([1, 2, 3, 4], m, k=1, score=lambda common: common / len(CRITERIA))
+
+        assert [e["score"] for e in edges] == [0.25, 0.25]
+
+    def test_values_are_native_python_types(self):
+        """Les paramètres Cypher ne doivent pas contenir de scalaires NumPy."""
+        m = _strengths([(1, "Culture"), (2, "Culture")])
+
+        edge = top_k_similar([1, 2, 3, 4], m, k=1)[0]
+
+        assert type(edge["source"]) is int
+        assert type(edge["score"]) is float
+
+    def test_linear_score_is_capped(self):
+        assert linear_common_score(np.array([8]))[0] == 1.0
+
+    def test_common_strengths_names_when_criteria_given(self):
+        """Les critères communs sont stockés triés sur la relation SIMILAR_TO."""
+        m = _strengths([(1, "Santé"), (1, "Culture"), (2, "Santé"), (2, "Culture"), (2, "Emploi")])
+
+        edges = top_k_similar([1, 2, 3, 4], m, k=1, criteria=CRITERIA)
+
+        assert [e["common_strengths"] for e in edges] == [["Culture", "Santé"]] * 2
+        assert "common_strengths" not in top_k_similar([1, 2, 3, 4], m, k=1)[0]
+
+    def test_blocks_and_id_order_do_not_change_result(self):
+        """Découpage en blocs et ordre des villes en entrée sans effet (égalités par city_id)."""
+        rng = np.random.default_rng(3)
+        ids = list(range(1, 41))
+        m = rng.random((40, 4)) < 0.5
+
+        expected = top_k_similar(ids, m, k=3)
+        shuffled = top_k_similar(ids[::-1], m[::-1], k=3, block_size=7)
+
+        assert shuffled == expected
+        assert [e["source"] for e in expected] == sorted(e["source"] for e in expected)
+
+
+# ── Cosinus pondéré ─────────────────────────────────────────────
+
+
+def _scores(rows):
+    """rows : {city_id: [note par catégorie de CRITERIA]}"""
+    return [
+        (city_id, name, value)
+        for city_id, values in rows.items()
+        for name, value in zip(CRITERIA, values)
+    ]
+
+
+SCORES = {
+    1: [9.0, 2.0, 8.0, 3.0],
+    2: [8.0, 3.0, 9.0, 2.0],
+    3: [2.0, 9.0, 3.0, 8.0],
+    4: [5.0, 5.0, 6.0, 5.0],
+}
+
+
+class TestScoreVectors:
+    def test_rows_are_unit_vectors(self):
+        v = score_vectors([1, 2, 3, 4], CRITERIA, _scores(SCORES))
+
+        assert v.dtype == np.float32
+        assert np.linalg.norm(v, axis=1) == pytest.approx([1.0] * 4, abs=1e-6)
+
+    def test_similar_profiles_close_opposite_profiles_negative(self):
+        """Catégories centrées : des profils opposés ont un cosinus négatif."""
+        v = score_vectors([1, 2, 3, 4], CRITERIA, _scores(SCORES))
+
+        assert v[0] @ v[1] > 0.8
+        assert v[0] @ v[2] < 0
+
+    def test_missing_score_counts_as_mean(self):
+        rows = _scores(SCORES)
+        v_full = score_vectors([1, 2, 3, 4, 5], CRITERIA, rows)
+        v_missing = score_vectors([1, 2, 3, 4, 5], CRITERIA, [*rows, (5, "Culture", 9.0)])
+
+        assert not v_full[4].any()
+        assert v_missing[4].tolist() == pytest.approx([1.0, 0.0, 0.0, 0.0])
+
+    def test_weights_change_similarity(self):
+        """Un poids nul retire la catégorie du cosinus."""
+        rows = _scores({1: [9.0, 2.0, 1.0, 5.0], 2: [9.0, 2.0, 9.0, 5.0], 3: [1.0, 8.0, 5.0, 5.0]})
+
+        v = score_vectors([1, 2, 3], CRITERIA, rows)
+        weighted = score_vectors([1, 2, 3], CRITERIA, rows, weights={"Santé": 0.0})
+
+        assert weighted[0] @ weighted[1] == pytest.approx(1.0)
+        assert v[0] @ v[1] < weighted[0] @ weighted[1]
+
+    def test_negative_weight_rejected(self):
+        with pytest.raises(ValueError):
+            score_vectors([1, 2], CRITERIA, _scores(SCORES), weights={"Culture": -1.0})
+
+
+class TestTopKCosine:
+    def test_excludes_self_and_non_positive_neighbours(self):
+        v = score_vectors([1, 2, 3, 4], CRITERIA, _scores(SCORES))
+
+        edges = top_k_cosine([1, 2, 3, 4], v, k=5)
+        from_1 = [e for e in edges if e["source"] == 1]
+
+        assert all(e["source"] != e["target"] for e in edges)
+        assert all(0 < e["score"] <= 1 for e in edges)
+        assert from_1[0]["target"] == 2
+        assert 3 not in [e["target"] for e in from_1]
+
+    def test_matches_brute_force(self):
+        """Top-K exact, quel que soit le découpage en blocs."""
+        rng = np.random.default_rng(7)
+        ids = list(range(1, 51))
+        rows = [(c, name, float(rng.uniform(0, 10))) for c in ids for name in CRITERIA]
+        v = score_vectors(ids, CRITERIA, rows)
+        full = v @ v.T
+        np.fill_diagonal(full, -np.inf)
+
+        edges = top_k_cosine(ids, v, k=4, block_size=9)
+
+        expected = []
+        for i in range(len(ids)):
+            best = [j for j in np.argsort(-full[i], kind="stable") if full[i, j] > 0][:4]
+            expected += [(ids[i], ids[j]) for j in best]
+        assert [(e["source"], e["target"]) for e in edges] == expected
+        for e in edges:
+            assert e["score"] == pytest.approx(full[e["source"] - 1, e["target"] - 1], abs=1e-6)
+
+    def test_values_are_native_python_types(self):
+        v = score_vectors([1, 2, 3, 4], CRITERIA, _scores(SCORES))
+
+        edge = top_k_cosine([1, 2, 3, 4], v, k=1)[0]
+
+        assert type(edge["target"]) is int
+        assert type(edge["score"]) is float
+        assert edge["score"] == round(edge["score"], 6)
+
+    def test_with_common_strengths(self):
+        v = score_vectors([1, 2, 3, 4], CRITERIA, _scores(SCORES))
+        m = _strengths([(1, "Culture"), (1, "Santé"), (2, "Santé"), (2, "Culture")])
+
+        edges = with_common_strengths(top_k_cosine([1, 2, 3, 4], v, k=1), [1, 2, 3, 4], m, CRITERIA)
+
+        assert edges[0]["target"] == 2
+        assert edges[0]["common_strengths"] == ["Culture", "Santé"]
+
+    def test_common_strengths_beyond_64_criteria(self):
+        """Plus de 64 critères : pas de débordement d'un masque de bits."""
+        criteria = [f"c{i:02d}" for i in range(70)]
+        m = strength_matrix(
+            [1, 2, 3],
+            criteria,
+            [(1, "c00"), (1, "c64"), (1, "c69"), (2, "c64"), (2, "c69"), (3, "c00")],
+        )
+        edges = [{"source": 1, "target": 2}, {"source": 1, "target": 3}, {"source": 2, "target": 3}]
+
+        edges = with_common_strengths(edges, [1, 2, 3], m, criteria)
+
+        assert [e["common_strengths"] for e in edges] == [["c64", "c69"], ["c00"], []]
+
+
+class TestToUndirected:
+    def test_one_edge_per_pair(self):
+        """Les paires en miroir ne sont stockées qu'une fois (source < target)."""
+        m = _strengths([(1, "Culture"), (2, "Culture"), (3, "Culture")])
+
+        edges = to_undirected(top_k_similar([1, 2, 3, 4], m, k=5))
+
+        assert [(e["source"], e["target"]) for e in edges] == [(1, 2), (1, 3), (2, 3)]
+
+    def test_keeps_pair_selected_by_one_side_only(self):
+        """Une paire dans le top-K d'une seule des deux villes est conservée."""
+        edges = to_undirected([{"source": 3, "target": 1, "score": 0.6, "common": 1}])
+
+        assert edges == [{"source": 1, "target": 3, "score": 0.6, "common": 1}]
+
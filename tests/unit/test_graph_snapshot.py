@@ -0,0 +1,130 @@
+"""Tests unitaires — Instantané mémoire du graphe (backend.graph.snapshot).
+
+Commande :
+    uv run pytest tests/unit/test_graph_snapshot.py -v
+"""
+
+from __future__ import annotations
+
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+
+import backend.graph.snapshot as snapshot_module
+from backend.graph.snapshot import GraphSnapshot, reload_graph_snapshot
+
+from .conftest import FakeNeo4jResult
+
+pytestmark = pytest.mark.sprint4
+
+CITIES = [
+    {"city_id": 1, "name": "Lyon", "department": "Rhône", "region": "ARA",
+     "population": 516092, "overall_score": 7.5},
+    {"city_id": 2, "name": "Grenoble", "department": "Isère", "region": "ARA",
+     "population": 158552, "overall_score": 7.1},
+    {"city_id": 3, "name": "Nantes", "department": "Loire-Atlantique", "region": "PDL",
+     "population": 320732, "overall_score": 7.4},
+]
+STRENGTHS = [(1, "Culture"), (1, "Transports"), (2, "Culture"), (2, "Transports"), (3, "Culture")]
+EDGES = [(1, 3, 0.6), (1, 2, 0.7), (2, 1, 0.7), (3, 1, 0.6), (1, 99, 0.9)]
+
+
+@pytest.fixture
+def snapshot():
+    return GraphSnapshot.build(version="v1", cities=CITIES, strengths=STRENGTHS, edges=EDGES)
+
+
+class TestGraphSnapshot:
+    def test_build_csr(self, snapshot):
+        """Les relations vers une ville inconnue sont ignorées."""
+        assert snapshot.city_count == 3
+        assert snapshot.edge_count == 4
+        assert snapshot.version == "v1"
+
+    async def test_similar_cities_sorted_with_common_strengths(self, snapshot):
+        results = await snapshot.get_similar_cities(1, k=5)
+
+        assert [r["city"]["city_id"] for r in results] == [2, 3]
+        assert results[0]["similarity_score"] == pytest.approx(0.7)
+        assert results[0]["common_strengths"] == ["Culture", "Transports"]
+        assert results[1]["common_strengths"] == ["Culture"]
+        assert results[0]["city"]["name"] == "Grenoble"
+
+    async def test_similar_cities_respects_k(self, snapshot):
+        results = await snapshot.get_similar_cities(1, k=1)
+
+        assert [r["city"]["city_id"] for r in results] == [2]
+
+    async def test_unknown_city_returns_empty(self, snapshot):
+        assert await snapshot.get_similar_cities(42) == []
+        assert await snapshot.get_city_strengths(42) == []
+
+    async def test_similar_cities_batch(self, snapshot):
+        results = await snapshot.get_similar_cities_batch([2, 42], k=3)
+
+        assert [r["city"]["city_id"] for r in results[2]] == [1]
+        assert results[42] == []
+
+    async def test_undirected_edge_serves_both_cities(self):
+        """Une seule relation SIMILAR_TO par paire suffit aux deux extrémités."""
+        snapshot = GraphSnapshot.build(
+            version="v1", cities=CITIES, strengths=STRENGTHS, edges=[(1, 2, 0.7)]
+        )
+
+        assert [r["city"]["city_id"] for r in await snapshot.get_similar_cities(1)] == [2]
+        assert [r["city"]["city_id"] for r in await snapshot.get_similar_cities(2)] == [1]
+
+    async def test_city_strengths(self, snapshot):
+        assert await snapshot.get_city_strengths(1) == ["Culture", "Transports"]
+        assert await snapshot.get_city_strengths(3) == ["Culture"]
+
+    async def test_results_are_independent_copies(self, snapshot):
+        results = await snapshot.get_similar_cities(1)
+        results[0]["city"]["name"] = "modifié"
+
+        assert (await snapshot.get_similar_cities(1))[0]["city"]["name"] == "Grenoble"
+
+
+class TestReloadGraphSnapshot:
+    @pytest.fixture(autouse=True)
+    def reset_snapshot(self):
+        old = snapshot_module._snapshot
+        snapshot_module._snapshot = None
+        yield
+        snapshot_module._snapshot = old
+
+    @staticmethod
+    def _driver(version):
+        session = AsyncMock()
+        session.run.return_value = FakeNeo4jResult([{"version": version}])
+        driver = MagicMock()
+        ctx = AsyncMock()
+        ctx.__aenter__ = AsyncMock(return_value=session)
+        ctx.__aexit__ = AsyncMock(return_value=False)
+        driver.session = MagicMock(return_value=ctx)
+        return driver, session
+
+    async def test_loads_when_empty(self, snapshot, monkeypatch):
+        monkeypatch.setattr(GraphSnapshot, "load", AsyncMock(return_value=snapshot))
+        driver, _ = self._driver("v1")
+
+        assert await reload_graph_snapshot(driver) is True
+        assert snapshot_module.get_graph_snapshot() is snapshot
+
+    async def test_skips_when_version_unchanged(self, snapshot, monkeypatch):
+        snapshot_module._snapshot = snapshot
+        load = AsyncMock()
+        monkeypatch.setattr(GraphSnapshot, "load", load)
+        driver, _ = self._driver("v1")
+
+        assert await reload_graph_snapshot(driver) is False
+        load.assert_not_called()
+
+    async def test_reloads_when_version_changed(self, snapshot, monkeypatch):
+        snapshot_module._snapshot = snapshot
+        fresh = GraphSnapshot.build(version="v2", cities=CITIES, strengths=[], edges=[])
+        monkeypatch.setattr(GraphSnapshot, "load", AsyncMock(return_value=fresh))
+        driver, _ = self._driver("v2")
+
+        assert await reload_graph_snapshot(driver) is True
+        assert snapshot_module.get_graph_snapshot() is fresh
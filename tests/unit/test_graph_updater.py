@@ -0,0 +1,230 @@
+"""Tests unitaires — Mise à jour incrémentale du graphe (backend.graph.updater).
+
+Commande :
+    uv run pytest tests/unit/test_graph_updater.py -v
+"""
+
+from __future__ import annotations
+
+from unittest.mock import AsyncMock, MagicMock
+
+import numpy as np
+import pytest
+
+from backend.graph.similarity import to_undirected, top_k_cosine, with_common_strengths
+from backend.graph.updater import (
+    DELETE_SIMILAR_TO_QUERY,
+    GRAPH_VERSION_QUERY,
+    REMOVE_CITIES_QUERY,
+    UPSERT_SIMILAR_TO_QUERY,
+    plan_similarity_update,
+    strong_labels,
+    update_graph,
+)
+
+from .conftest import FakeNeo4jResult
+
+pytestmark = pytest.mark.sprint4
+
+CRITERIA = ["Culture", "Emploi", "Santé", "Transports", "Éducation"]
+
+
+def _unit(rows: np.ndarray) -> np.ndarray:
+    return (rows / np.linalg.norm(rows, axis=1, keepdims=True)).astype(np.float32)
+
+
+def _graph(city_ids, vectors, strengths, k):
+    """Graphe SIMILAR_TO complet, tel qu'écrit par un seed."""
+    edges = top_k_cosine(city_ids, vectors, k=k)
+    return to_undirected(with_common_strengths(edges, city_ids, strengths, CRITERIA))
+
+
+def _apply(stored, upserts, deletes):
+    edges = {(e["source"], e["target"]): e for e in stored}
+    for edge in deletes:
+        del edges[(edge["source"], edge["target"])]
+    for edge in upserts:
+        edges[(edge["source"], edge["target"])] = edge
+    return [edges[pair] for pair in sorted(edges)]
+
+
+def _apply_undirected(stored, upserts, deletes):
+    """Comme Neo4j : DELETE sans orientation (les deux sens), puis MERGE sans orientation."""
+    gone = {(e["source"], e["target"]) for e in deletes}
+    edges: dict[tuple[int, int], list[dict]] = {}
+    for edge in stored:
+        pair = tuple(sorted((edge["source"], edge["target"])))
+        if pair not in gone:
+            edges.setdefault(pair, []).append(edge)
+    for edge in upserts:
+        pair = (edge["source"], edge["target"])
+        edges[pair] = [{**e, **edge} for e in edges.get(pair, [edge])]
+    return edges
+
+
+@pytest.fixture
+def world():
+    rng = np.random.default_rng(11)
+    city_ids = list(range(1, 61))
+    vectors = _unit(rng.standard_normal((60, len(CRITERIA))))
+    strengths = rng.random((60, len(CRITERIA))) < 0.4
+    return rng, city_ids, vectors, strengths
+
+
+class TestPlanSimilarityUpdate:
+    def test_empty_graph_creates_full_graph(self, world):
+        _, city_ids, vectors, strengths = world
+
+        upserts, deletes = plan_similarity_update(
+            city_ids, vectors, strengths, CRITERIA, [], city_ids, k=4
+        )
+
+        assert upserts == _graph(city_ids, vectors, strengths, k=4)
+        assert deletes == []
+
+    def test_diff_matches_full_rebuild(self, world):
+        """Le graphe stocké + diff est identique à un recalcul complet."""
+        rng, city_ids, vectors, strengths = world
+        stored = _graph(city_ids, vectors, strengths, k=4)
+        changed = [3, 17, 42]
+        vectors = vectors.copy()
+        strengths = strengths.copy()
+        for city_id in changed:
+            vectors[city_id - 1] = _unit(rng.standard_normal((1, len(CRITERIA))))[0]
+            strengths[city_id - 1] = rng.random(len(CRITERIA)) < 0.4
+
+        upserts, deletes = plan_similarity_update(
+            city_ids, vectors, strengths, CRITERIA, stored, changed, k=4, block_size=5
+        )
+
+        assert _apply(stored, upserts, deletes) == _graph(city_ids, vectors, strengths, k=4)
+        # Seules des paires touchant le voisinage des villes modifiées sont écrites
+        assert len(upserts) + len(deletes) < len(stored) / 2
+
+    def test_no_change_writes_nothing(self, world):
+        _, city_ids, vectors, strengths = world
+        stored = _graph(city_ids, vectors, strengths, k=4)
+
+        assert plan_similarity_update(
+            city_ids, vectors, strengths, CRITERIA, stored, [5, 6], k=4
+        ) == ([], [])
+
+    def test_removed_city_loses_its_relations(self, world):
+        _, city_ids, vectors, strengths = world
+        stored = _graph(city_ids, vectors, strengths, k=4)
+
+        upserts, deletes = plan_similarity_update(
+            city_ids[1:], vectors[1:], strengths[1:], CRITERIA, stored, [1], k=4
+        )
+
+        graph = _apply(stored, upserts, deletes)
+        assert graph == _graph(city_ids[1:], vectors[1:], strengths[1:], k=4)
+        assert {e["source"] for e in deletes} == {1}
+
+    @pytest.mark.parametrize("changed", [[], [3, 17], "all"])
+    def test_mirrored_legacy_edges_deduplicated(self, world, changed):
+        """Ancien format (A->B et B->A) : une seule relation par paire après le diff."""
+        _, city_ids, vectors, strengths = world
+        graph = _graph(city_ids, vectors, strengths, k=4)
+        mirrored = graph + [{**e, "source": e["target"], "target": e["source"]} for e in graph]
+        changed = city_ids if changed == "all" else changed
+
+        upserts, deletes = plan_similarity_update(
+            city_ids, vectors, strengths, CRITERIA, mirrored, changed, k=4
+        )
+
+        edges = _apply_undirected(mirrored, upserts, deletes)
+        assert all(len(rels) == 1 for rels in edges.values())
+        assert [rels[0] for _, rels in sorted(edges.items())] == graph
+
+        # Une fois dédoublonné, un nouveau passage n'écrit plus rien
+        deduplicated = [rels[0] for _, rels in sorted(edges.items())]
+        assert plan_similarity_update(
+            city_ids, vectors, strengths, CRITERIA, deduplicated, changed, k=4
+        ) == ([], [])
+
+    def test_common_strengths_change_is_written(self, world):
+        """Un changement de STRONG_IN seul réécrit les relations de la ville."""
+        _, city_ids, vectors, strengths = world
+        stored = _graph(city_ids, vectors, strengths, k=4)
+        strengths = strengths.copy()
+        strengths[9] = ~strengths[9]
+
+        upserts, deletes = plan_similarity_update(
+            city_ids, vectors, strengths, CRITERIA, stored, [10], k=4
+        )
+
+        assert deletes == []
+        assert upserts
+        assert all(10 in (e["source"], e["target"]) for e in upserts)
+
+
+def test_strong_labels_uses_threshold():
+    rows = [
+        {"city_id": 1, "label": "Culture", "score": 7.0},
+        {"city_id": 1, "label": "Emploi", "score": 6.9},
+        {"city_id": 2, "label": "Santé", "score": 9.0},
+    ]
+
+    assert strong_labels([1, 3], rows) == {1: ["Culture"], 3: []}
+
+
+# ── update_graph ────────────────────────────────────────────────
+
+
+class TestUpdateGraph:
+    @pytest.fixture
+    def tx(self, neo4j_session):
+        tx = MagicMock()
+        tx.run = AsyncMock(return_value=MagicMock(consume=AsyncMock()))
+
+        async def execute_write(work):
+            return await work(tx)
+
+        neo4j_session.execute_write = AsyncMock(side_effect=execute_write)
+        neo4j_session.run.return_value = FakeNeo4jResult([])
+        return tx
+
+    @pytest.fixture
+    def postgres_repo(self):
+        repo = AsyncMock()
+        repo.get_cities_by_ids.return_value = [
+            {"id": 1, "name": "Lyon", "department": "Rhône", "region": "ARA",
+             "population": 516092, "overall_score": 7.5},
+        ]
+        repo.get_all_scores.return_value = [
+            {"city_id": 1, "label": "Culture", "score": 8.0},
+            {"city_id": 1, "label": "Emploi", "score": 3.0},
+            {"city_id": 2, "label": "Culture", "score": 7.5},
+            {"city_id": 2, "label": "Emploi", "score": 2.0},
+            {"city_id": 3, "label": "Culture", "score": 2.0},
+            {"city_id": 3, "label": "Emploi", "score": 9.0},
+        ]
+        return repo
+
+    async def test_applies_diff_in_one_transaction(self, neo4j_driver, neo4j_session, tx,
+                                                   postgres_repo):
+        summary = await update_graph(neo4j_driver, postgres_repo, [1, 4], k=2, version="v2")
+
+        neo4j_session.execute_write.assert_awaited_once()
+        postgres_repo.get_cities_by_ids.assert_awaited_once_with([1, 4])
+        queries = {call.args[0]: call.kwargs for call in tx.run.call_args_list}
+        assert queries[REMOVE_CITIES_QUERY] == {"rows": [4]}
+        assert queries[GRAPH_VERSION_QUERY] == {"version": "v2"}
+        assert [(e["source"], e["target"]) for e in queries[UPSERT_SIMILAR_TO_QUERY]["rows"]] == [
+            (1, 2)
+        ]
+        assert DELETE_SIMILAR_TO_QUERY not in queries
+        assert summary == {"version": "v2", "cities": 1, "removed": 1, "upserts": 1, "deletes": 0}
+
+    async def test_stale_relations_deleted(self, neo4j_driver, neo4j_session, tx, postgres_repo):
+        """Une relation qui ne fait plus partie d'aucun top-K est supprimée."""
+        neo4j_session.run.return_value = FakeNeo4jResult(
+            [{"source": 1, "target": 3, "score": 0.9, "common_strengths": []}]
+        )
+
+        summary = await update_graph(neo4j_driver, postgres_repo, [1], k=2)
+
+        queries = {call.args[0]: call.kwargs for call in tx.run.call_args_list}
+        assert queries[DELETE_SIMILAR_TO_QUERY] == {"rows": [{"source": 1, "target": 3}]}
+        assert summary["deletes"] == 1
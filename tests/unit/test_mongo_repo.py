@@ -11,7 +11,8 @@ Fichier à implémenter :
 Méthodes à implémenter :
     1. get_reviews(city_id, page, page_size) -> tuple[list[dict], int]
     2. create_review(city_id, review_data) -> dict
-    3. get_average_rating(city_id) -> float | None
+    3. get_average_rating(city_id) -> float | None (get_average_ratings : plusieurs villes)
+    4. get_review_stats(city_id) / rebuild_review_stats() — statistiques par ville
 """
 
 from __future__ import annotations
@@ -20,8 +21,14 @@ from datetime import datetime
 from unittest.mock import AsyncMock, MagicMock
 
 import pytest
+from pymongo.errors import BulkWriteError
 
-from backend.repositories.mongo_repo import MongoRepository
+from backend.core.cursor import encode_cursor
+from backend.repositories.mongo_repo import (
+    MongoRepository,
+    review_cursor,
+    review_stats_increments,
+)
 
 from .conftest import FakeAggregationCursor, FakeCursor, FakeInsertResult
 
@@ -40,9 +47,31 @@ def collection():
 
 
 @pytest.fixture
-def mongo_db(collection):
+def stats():
+    """Mock de la collection Motor 'city_review_stats' (vide par défaut en lecture)."""
+    coll = MagicMock()
+    coll.find = MagicMock(return_value=FakeCursor([]))
+    coll.find_one = AsyncMock(return_value=None)
+    coll.update_one = AsyncMock(return_value=MagicMock(matched_count=1))
+    coll.bulk_write = AsyncMock()
+    return coll
+
+
+@pytest.fixture
+def rebuild():
+    """Mock de la collection Motor 'city_review_stats_rebuild' (recalcul)."""
+    coll = MagicMock()
+    coll.drop = AsyncMock()
+    coll.bulk_write = AsyncMock()
+    coll.rename = AsyncMock()
+    return coll
+
+
+@pytest.fixture
+def mongo_db(collection, stats, rebuild):
     db = MagicMock()
-    db.__getitem__ = MagicMock(return_value=collection)
+    collections = {"city_review_stats": stats, "city_review_stats_rebuild": rebuild}
+    db.__getitem__ = MagicMock(side_effect=lambda name: collections.get(name, collection))
     return db
 
 
@@ -123,6 +152,64 @@ class TestGetReviews:
         assert result_docs[1]["author"] == "Bob"
 
 
+class TestGetReviewsCursor:
+    """MongoRepository.get_reviews() — Tri stable et pagination keyset."""
+
+    async def test_sorts_by_created_at_then_id(self, repo, collection):
+        """Le tri (created_at, _id) décroissant correspond à l'index composé."""
+        find = MagicMock()
+        find.sort.return_value = find
+        find.skip.return_value = find
+        find.limit.return_value = FakeCursor([])
+        collection.find.return_value = find
+
+        await repo.get_reviews(city_id=1, page=3, page_size=5)
+
+        find.sort.assert_called_once_with([("created_at", -1), ("_id", -1)])
+        find.skip.assert_called_once_with(10)
+        find.limit.assert_called_once_with(5)
+
+    async def test_lookahead_reads_one_extra_review(self, repo, collection):
+        find = MagicMock()
+        find.sort.return_value = find
+        find.skip.return_value = find
+        find.limit.return_value = FakeCursor([])
+        collection.find.return_value = find
+
+        await repo.get_reviews(city_id=1, page=3, page_size=5, lookahead=True)
+
+        find.skip.assert_called_once_with(10)
+        find.limit.assert_called_once_with(6)
+
+    async def test_cursor_seeks_after_last_review(self, repo, collection):
+        """Avec un curseur : filtre (created_at, _id) < curseur, sans skip."""
+        created_at = datetime(2024, 5, 1, 12, 0, 0)
+        cursor = review_cursor({"id": "507f1f77bcf86cd799439011", "created_at": created_at})
+
+        await repo.get_reviews(city_id=1, cursor=cursor)
+
+        query = collection.find.call_args[0][0]
+        assert query["city_id"] == 1
+        branches = query["$or"]
+        assert branches[0] == {"created_at": {"$lt": created_at}}
+        assert branches[1]["created_at"] == created_at
+        assert str(branches[1]["_id"]["$lt"]) == "507f1f77bcf86cd799439011"
+
+    async def test_invalid_cursor_raises_before_querying(self, repo, collection):
+        with pytest.raises(ValueError):
+            await repo.get_reviews(city_id=1, cursor="pas-un-curseur!")
+        with pytest.raises(ValueError):
+            await repo.get_reviews(city_id=1, cursor=encode_cursor({"s": "name", "id": 3}))
+
+        collection.count_documents.assert_not_called()
+
+    async def test_total_not_counted_when_not_requested(self, repo, collection):
+        _, total = await repo.get_reviews(city_id=1, include_total=False)
+
+        assert total is None
+        collection.count_documents.assert_not_called()
+
+
 # ── create_review ───────────────────────────────────────────────
 
 
@@ -178,6 +265,128 @@ class TestCreateReview:
         assert result["rating"] == 3
         assert result["comment"] == "Moyen"
 
+    async def test_increments_city_stats(self, repo, stats):
+        """Doit mettre à jour les statistiques existantes par un $inc atomique, sans upsert."""
+        await repo.create_review(4, {"author": "Léa", "rating": 3, "tags": ["bruit", "v1.2"]})
+
+        stats.update_one.assert_awaited_once_with(
+            {"_id": 4},
+            {
+                "$inc": {
+                    "count": 1,
+                    "rating_sum": 3,
+                    "ratings.3": 1,
+                    "tags.bruit": 1,
+                    "tags.v1\uff0e2": 1,
+                }
+            },
+        )
+        stats.bulk_write.assert_not_called()
+
+    async def test_builds_stats_when_reviews_predate_them(self, repo, collection, stats):
+        """Ville sans statistiques mais avec des avis antérieurs : construction complète."""
+        stats.update_one.return_value = MagicMock(matched_count=0)
+        # 5 avis existants + l'avis créé, tous comptés par l'agrégation
+        collection.aggregate.side_effect = [
+            FakeAggregationCursor(
+                [
+                    {"_id": {"city_id": 4, "rating": 4}, "n": 5},
+                    {"_id": {"city_id": 4, "rating": 3}, "n": 1},
+                ]
+            ),
+            FakeAggregationCursor([]),
+        ]
+
+        await repo.create_review(4, {"author": "Léa", "rating": 3})
+
+        assert collection.aggregate.call_args_list[0].args[0][0] == {
+            "$match": {"city_id": {"$in": [4]}}
+        }
+        (requests,), _ = stats.bulk_write.call_args
+        assert [(r._filter, r._doc, r._upsert) for r in requests] == [
+            (
+                {"_id": 4},
+                {"$setOnInsert": {"count": 6, "rating_sum": 23, "ratings.4": 5, "ratings.3": 1}},
+                True,
+            )
+        ]
+
+
+# ── insert_reviews ──────────────────────────────────────────────
+
+
+class TestInsertReviews:
+    """MongoRepository.insert_reviews() — Import en masse."""
+
+    async def test_unordered_chunks(self, repo, collection):
+        collection.insert_many = AsyncMock()
+        reviews = [{"city_id": i % 2, "rating": 4} for i in range(5)]
+
+        assert await repo.insert_reviews(reviews, chunk_size=2) == {}
+
+        assert collection.insert_many.await_count == 3
+        for call in collection.insert_many.await_args_list:
+            assert call.kwargs == {"ordered": False}
+            assert all(isinstance(doc["created_at"], datetime) for doc in call.args[0])
+
+    async def test_keeps_provided_id_and_created_at(self, repo, collection):
+        """Avis du tampon d'écriture : _id et created_at déjà attribués."""
+        collection.insert_many = AsyncMock()
+        created_at = datetime(2024, 5, 1, 12, 0, 0)
+
+        await repo.insert_reviews([{"_id": "abc", "city_id": 1, "rating": 4,
+                                    "created_at": created_at}])
+
+        (doc,) = collection.insert_many.await_args.args[0]
+        assert doc["_id"] == "abc"
+        assert doc["created_at"] == created_at
+
+    async def test_write_errors_keep_other_reviews(self, repo, collection, stats):
+        """Les erreurs d'un lot sont rapportées par position ; seuls les avis écrits comptent."""
+        collection.insert_many = AsyncMock(
+            side_effect=[
+                None,
+                BulkWriteError({"writeErrors": [{"index": 1, "errmsg": "E11000 duplicate"}]}),
+            ]
+        )
+        stats.find.side_effect = lambda *args: FakeCursor([{"_id": 1}, {"_id": 2}])
+        reviews = [{"city_id": 1, "rating": 5}, {"city_id": 1, "rating": 3},
+                   {"city_id": 2, "rating": 2}, {"city_id": 2, "rating": 4}]
+
+        errors = await repo.insert_reviews(reviews, chunk_size=2)
+
+        assert errors == {3: "E11000 duplicate"}
+        written = [
+            (r._filter["_id"], r._doc["$inc"])
+            for call in stats.bulk_write.await_args_list
+            for r in call.args[0]
+        ]
+        assert written == [
+            (1, {"count": 2, "rating_sum": 8, "ratings.5": 1, "ratings.3": 1}),
+            (2, {"count": 1, "rating_sum": 2, "ratings.2": 1}),
+        ]
+
+    async def test_builds_stats_only_for_cities_without_them(self, repo, collection, stats):
+        """Les villes sans statistiques sont reconstruites depuis leurs avis, pas incrémentées."""
+        collection.insert_many = AsyncMock()
+        stats.find.return_value = FakeCursor([{"_id": 1}])
+        collection.aggregate.side_effect = [
+            FakeAggregationCursor([{"_id": {"city_id": 2, "rating": 2}, "n": 3}]),
+            FakeAggregationCursor([]),
+        ]
+
+        await repo.insert_reviews([{"city_id": 1, "rating": 5}, {"city_id": 2, "rating": 2}])
+
+        assert stats.find.call_args.args == ({"_id": {"$in": [1, 2]}}, {"_id": 1})
+        assert collection.aggregate.call_args_list[0].args[0][0] == {
+            "$match": {"city_id": {"$in": [2]}}
+        }
+        written = [r._doc for call in stats.bulk_write.await_args_list for r in call.args[0]]
+        assert written == [
+            {"$inc": {"count": 1, "rating_sum": 5, "ratings.5": 1}},
+            {"$setOnInsert": {"count": 3, "rating_sum": 6, "ratings.2": 3}},
+        ]
+
 
 # ── get_average_rating ──────────────────────────────────────────
 
@@ -211,3 +420,150 @@ class TestGetAverageRating:
         await repo.get_average_rating(city_id=1)
 
         collection.aggregate.assert_called_once()
+
+
+class TestGetAverageRatings:
+    """MongoRepository.get_average_ratings() — Plusieurs villes en une requête."""
+
+    async def test_reads_stats_then_aggregates_missing_cities(self, repo, collection, stats):
+        stats.find.return_value = FakeCursor(
+            [{"_id": 1, "count": 4, "rating_sum": 14}, {"_id": 2, "count": 0, "rating_sum": 0}]
+        )
+        collection.aggregate.return_value = FakeAggregationCursor(
+            [{"_id": 3, "avg_rating": 4.333333}]
+        )
+
+        result = await repo.get_average_ratings([1, 2, 3, 1, 4])
+
+        assert result == {1: 3.5, 3: 4.33}
+        assert stats.find.call_args[0][0] == {"_id": {"$in": [1, 2, 3, 4]}}
+        pipeline = collection.aggregate.call_args[0][0]
+        assert pipeline[0] == {"$match": {"city_id": {"$in": [3, 4]}}}
+        assert pipeline[1]["$group"]["_id"] == "$city_id"
+
+    async def test_all_cities_in_stats_skip_aggregation(self, repo, collection, stats):
+        stats.find.return_value = FakeCursor([{"_id": 7, "count": 2, "rating_sum": 9}])
+
+        assert await repo.get_average_ratings([7]) == {7: 4.5}
+
+        collection.aggregate.assert_not_called()
+
+    async def test_no_cities_no_query(self, repo, collection, stats):
+        assert await repo.get_average_ratings([]) == {}
+
+        stats.find.assert_not_called()
+        collection.aggregate.assert_not_called()
+
+
+class TestReviewStats:
+    """city_review_stats — Lecture ponctuelle et recalcul."""
+
+    STATS = {
+        "_id": 1,
+        "count": 4,
+        "rating_sum": 14,
+        "ratings": {"3": 2, "4": 1, "5": 1},
+        "tags": {"culture": 3, "v1\uff0e2": 1},
+    }
+
+    async def test_average_read_from_stats(self, repo, collection, stats):
+        """Avec des statistiques, pas d'agrégation sur les avis."""
+        stats.find_one.return_value = self.STATS
+
+        assert await repo.get_average_rating(city_id=1) == 3.5
+
+        stats.find_one.assert_awaited_once_with({"_id": 1})
+        collection.aggregate.assert_not_called()
+
+    async def test_total_read_from_stats(self, repo, collection, stats):
+        stats.find_one.return_value = {"_id": 1, "count": 42}
+
+        _, total = await repo.get_reviews(city_id=1)
+
+        assert total == 42
+        collection.count_documents.assert_not_called()
+
+    async def test_get_review_stats_decodes_document(self, repo, stats):
+        stats.find_one.return_value = self.STATS
+
+        result = await repo.get_review_stats(1)
+
+        assert result == {
+            "count": 4,
+            "rating_sum": 14,
+            "ratings": {1: 0, 2: 0, 3: 2, 4: 1, 5: 1},
+            "tags": {"culture": 3, "v1.2": 1},
+        }
+
+    async def test_missing_stats_return_none(self, repo):
+        assert await repo.get_review_stats(999) is None
+
+    async def test_rebuild_rewrites_every_city(self, repo, collection, stats, rebuild):
+        """Le recalcul agrège notes et tags par ville dans une collection renommée ensuite."""
+        collection.aggregate.side_effect = [
+            FakeAggregationCursor(
+                [
+                    {"_id": {"city_id": 1, "rating": 4}, "n": 2},
+                    {"_id": {"city_id": 1, "rating": 5}, "n": 1},
+                    {"_id": {"city_id": 2, "rating": 1}, "n": 1},
+                ]
+            ),
+            FakeAggregationCursor([{"_id": {"city_id": 1, "tag": "culture"}, "n": 2}]),
+        ]
+
+        assert await repo.rebuild_review_stats() == 2
+
+        rebuild.drop.assert_awaited_once()
+        stats.bulk_write.assert_not_called()
+        (requests,), kwargs = rebuild.bulk_write.call_args
+        assert kwargs == {"ordered": False}
+        assert [(r._filter, r._doc) for r in requests] == [
+            (
+                {"_id": 1},
+                {"$set": {"count": 3, "rating_sum": 13, "ratings.4": 2, "ratings.5": 1,
+                          "tags.culture": 2}},
+            ),
+            ({"_id": 2}, {"$set": {"count": 1, "rating_sum": 1, "ratings.1": 1}}),
+        ]
+        rebuild.rename.assert_awaited_once_with("city_review_stats", dropTarget=True)
+
+    async def test_rebuild_skips_empty_tags(self, repo, collection, rebuild):
+        """Avis stockés avec un tag vide : pas de chemin `tags.` dans le recalcul."""
+        collection.aggregate.side_effect = [
+            FakeAggregationCursor([{"_id": {"city_id": 1, "rating": 4}, "n": 1}]),
+            FakeAggregationCursor([{"_id": {"city_id": 1, "tag": ""}, "n": 1}]),
+        ]
+
+        await repo.rebuild_review_stats()
+
+        (requests,), _ = rebuild.bulk_write.call_args
+        assert requests[0]._doc == {"$set": {"count": 1, "rating_sum": 4, "ratings.4": 1}}
+
+    async def test_rebuild_without_reviews_empties_stats(self, repo, stats, rebuild):
+        stats.drop = AsyncMock()
+
+        assert await repo.rebuild_review_stats() == 0
+
+        stats.drop.assert_awaited_once()
+        rebuild.rename.assert_not_called()
+
+    def test_increments_add_up(self):
+        """Les incréments d'avis successifs s'additionnent."""
+        reviews = [{"rating": 4, "tags": ["culture"]}, {"rating": 2}]
+
+        assert review_stats_increments(reviews) == {
+            "count": 2,
+            "rating_sum": 6,
+            "ratings.4": 1,
+            "ratings.2": 1,
+            "tags.culture": 1,
+        }
+
+    def test_increments_skip_empty_tags(self):
+        """Un tag vide donnerait le chemin `tags.`, refusé par MongoDB."""
+        assert review_stats_increments([{"rating": 3, "tags": ["", "calme"]}]) == {
+            "count": 1,
+            "rating_sum": 3,
+            "ratings.3": 1,
+            "tags.calme": 1,
+        }
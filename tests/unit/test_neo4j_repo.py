@@ -125,6 +125,127 @@ class TestGetSimilarCities:
 
         assert len(result) == 3
 
+    async def test_reads_precomputed_common_strengths(self, neo4j_driver, neo4j_session):
+        """Les critères communs viennent de la relation SIMILAR_TO, pas d'un OPTIONAL MATCH."""
+        neo4j_session.run.return_value = FakeNeo4jResult([])
+
+        repo = Neo4jRepository(neo4j_driver)
+        await repo.get_similar_cities(city_id=1, k=5)
+
+        query = neo4j_session.run.call_args[0][0]
+        assert "r.common_strengths" in query
+        assert "OPTIONAL MATCH" not in query
+
+    async def test_traverses_similar_to_undirected(self, neo4j_driver, neo4j_session):
+        """SIMILAR_TO est stocké une fois par paire : le parcours ne doit pas être orienté."""
+        neo4j_session.run.return_value = FakeNeo4jResult([])
+
+        repo = Neo4jRepository(neo4j_driver)
+        await repo.get_similar_cities(city_id=1, k=5)
+
+        query = neo4j_session.run.call_args[0][0]
+        assert "-[r:SIMILAR_TO]-(target:City)" in query
+
+
+# ── get_similar_cities_batch ────────────────────────────────────
+
+
+class TestGetSimilarCitiesBatch:
+    """Neo4jRepository.get_similar_cities_batch() — Plusieurs sources en une requête."""
+
+    async def test_single_unwind_query(self, neo4j_driver, neo4j_session):
+        """Doit exécuter une seule requête UNWIND $city_ids."""
+        neo4j_session.run.return_value = FakeNeo4jResult([])
+
+        repo = Neo4jRepository(neo4j_driver)
+        await repo.get_similar_cities_batch([1, 2, 3], k=4)
+
+        neo4j_session.run.assert_called_once()
+        query = neo4j_session.run.call_args[0][0]
+        assert "UNWIND $city_ids" in query
+        assert neo4j_session.run.call_args[1] == {"city_ids": [1, 2, 3], "k": 4}
+
+    async def test_groups_results_by_source(self, neo4j_driver, neo4j_session):
+        """Les résultats sont regroupés par ville source, [] si aucun voisin."""
+        neo4j_session.run.return_value = FakeNeo4jResult(
+            [
+                {
+                    "source_id": 1,
+                    "city": {"city_id": 2, "name": "Marseille"},
+                    "similarity_score": 0.9,
+                    "common_strengths": ["transport"],
+                },
+                {
+                    "source_id": 1,
+                    "city": {"city_id": 3, "name": "Toulouse"},
+                    "similarity_score": 0.8,
+                    "common_strengths": [],
+                },
+            ]
+        )
+
+        repo = Neo4jRepository(neo4j_driver)
+        result = await repo.get_similar_cities_batch([1, 5], k=2)
+
+        assert list(result) == [1, 5]
+        assert [r["city"]["city_id"] for r in result[1]] == [2, 3]
+        assert result[1][0]["common_strengths"] == ["transport"]
+        assert result[5] == []
+
+
+# ── get_discovery_cities ────────────────────────────────────────
+
+
+class TestGetDiscoveryCities:
+    """Neo4jRepository.get_discovery_cities() — Découverte à deux sauts."""
+
+    async def test_bounded_two_hop_query_with_timeout(self, neo4j_driver, neo4j_session):
+        """La requête borne chaque saut (fan_out) et porte un délai maximal."""
+        neo4j_session.run.return_value = FakeNeo4jResult([])
+
+        repo = Neo4jRepository(neo4j_driver)
+        await repo.get_discovery_cities(city_id=1, k=5, fan_out=7, timeout=1.5)
+
+        query = neo4j_session.run.call_args[0][0]
+        assert query.timeout == 1.5
+        assert query.text.count("LIMIT $fan_out") == 2
+        assert "NOT (source)-[:SIMILAR_TO]-(target)" in query.text
+        assert neo4j_session.run.call_args[1] == {"city_id": 1, "k": 5, "fan_out": 7}
+
+    async def test_returns_scored_cities(self, neo4j_driver, neo4j_session):
+        neo4j_session.run.return_value = FakeNeo4jResult(
+            [
+                {
+                    "city": {"city_id": 9, "name": "Annecy"},
+                    "similarity_score": 0.58,
+                    "common_strengths": ["Santé", "Culture"],
+                }
+            ]
+        )
+
+        repo = Neo4jRepository(neo4j_driver)
+        result = await repo.get_discovery_cities(city_id=1, k=5)
+
+        assert result == [
+            {
+                "city": {"city_id": 9, "name": "Annecy"},
+                "similarity_score": 0.58,
+                "common_strengths": ["Culture", "Santé"],
+            }
+        ]
+
+    async def test_timeout_raises_timeout_error(self, neo4j_driver, neo4j_session):
+        """Le dépassement du délai Neo4j est converti en TimeoutError."""
+        from neo4j.exceptions import ClientError
+
+        class TimedOut(ClientError):
+            code = "Neo.ClientError.Transaction.TransactionTimedOutClientConfiguration"
+
+        neo4j_session.run.side_effect = TimedOut("timed out")
+
+        repo = Neo4jRepository(neo4j_driver)
+        with pytest.raises(TimeoutError):
+            await repo.get_discovery_cities(city_id=1)
 
 # ── get_city_strengths ──────────────────────────────────────────
 
@@ -18,13 +18,21 @@ from __future__ import annotations
 
 import pytest
 
-from backend.repositories.postgres_repo import PostgresRepository
+from backend.core.cursor import encode_cursor
+from backend.repositories.postgres_repo import PostgresRepository, city_cursor
 
 from .conftest import FakeResult
 
 pytestmark = pytest.mark.sprint3
 
 
+def _page_result(cities: list[dict], *, total: int) -> FakeResult:
+    """Résultat de la requête total + page (LEFT JOIN : une ligne vide si page vide)."""
+    if not cities:
+        return FakeResult(rows=[{"total_count": total, "id": None}])
+    return FakeResult(rows=[{"total_count": total, **c} for c in cities])
+
+
 # ── get_city_by_id ──────────────────────────────────────────────
 
 
@@ -140,6 +148,109 @@ class TestGetCityScores:
         assert result == []
 
 
+class TestGetAllScores:
+    """PostgresRepository.get_all_scores() — Notes de toutes les villes."""
+
+    async def test_returns_rows_with_label(self, pg_session):
+        pg_session.execute.return_value = FakeResult(
+            rows=[{"city_id": 1, "category": "sante", "label": "Santé", "score": 7.5}]
+        )
+
+        repo = PostgresRepository(pg_session)
+        result = await repo.get_all_scores()
+
+        assert result == [{"city_id": 1, "category": "sante", "label": "Santé", "score": 7.5}]
+        sql = str(pg_session.execute.call_args[0][0])
+        # Les labels vides (lignes historiques) retombent aussi sur la catégorie
+        assert "COALESCE(NULLIF(label, ''), category)" in sql
+
+
+# ── get_cities_by_ids ───────────────────────────────────────────
+
+
+class TestGetCitiesByIds:
+    """PostgresRepository.get_cities_by_ids() — Lecture groupée."""
+
+    async def test_preserves_requested_order(self, pg_session):
+        """Doit retourner les villes dans l'ordre des ids demandés."""
+        pg_session.execute.return_value = FakeResult(
+            rows=[{"id": 1, "name": "Paris"}, {"id": 3, "name": "Lyon"}, {"id": 2, "name": "Nice"}]
+        )
+
+        repo = PostgresRepository(pg_session)
+        result = await repo.get_cities_by_ids([3, 1, 2])
+
+        assert [r["id"] for r in result] == [3, 1, 2]
+        assert pg_session.execute.call_count == 1
+        assert "ANY(:ids)" in str(pg_session.execute.call_args[0][0])
+
+    async def test_skips_unknown_ids(self, pg_session):
+        """Les ids inconnus sont ignorés."""
+        pg_session.execute.return_value = FakeResult(rows=[{"id": 1, "name": "Paris"}])
+
+        repo = PostgresRepository(pg_session)
+        result = await repo.get_cities_by_ids([42, 1])
+
+        assert [r["id"] for r in result] == [1]
+
+    async def test_empty_ids_skips_query(self, pg_session):
+        """Liste vide : pas de requête."""
+        repo = PostgresRepository(pg_session)
+
+        assert await repo.get_cities_by_ids([]) == []
+        pg_session.execute.assert_not_called()
+
+
+# ── get_city_with_scores ────────────────────────────────────────
+
+
+class TestGetCityWithScores:
+    """PostgresRepository.get_city_with_scores() — Ville + scores en une requête."""
+
+    async def test_returns_city_with_scores(self, pg_session):
+        """Doit retourner la ville et ses scores agrégés, en un seul execute."""
+        row = {
+            "id": 1,
+            "name": "Lyon",
+            "department": "Rhône",
+            "region": "Auvergne-Rhône-Alpes",
+            "population": 516092,
+            "description": "",
+            "latitude": 45.76,
+            "longitude": 4.83,
+            "overall_score": 7.5,
+            "scores": [{"category": "sante", "label": "Santé", "score": 7.5}],
+        }
+        pg_session.execute.return_value = FakeResult(rows=[row])
+
+        repo = PostgresRepository(pg_session)
+        result = await repo.get_city_with_scores(1)
+
+        assert result["name"] == "Lyon"
+        assert result["scores"] == [{"category": "sante", "label": "Santé", "score": 7.5}]
+        assert pg_session.execute.call_count == 1
+        assert "json_agg" in str(pg_session.execute.call_args[0][0])
+
+    async def test_decodes_json_text(self, pg_session):
+        """Doit décoder les scores reçus sous forme de texte JSON."""
+        row = {"id": 1, "name": "Lyon", "scores": '[{"category": "env", "label": "", "score": 6}]'}
+        pg_session.execute.return_value = FakeResult(rows=[row])
+
+        repo = PostgresRepository(pg_session)
+        result = await repo.get_city_with_scores(1)
+
+        assert result["scores"] == [{"category": "env", "label": "", "score": 6}]
+
+    async def test_returns_none_when_not_found(self, pg_session):
+        """Doit retourner None si la ville n'existe pas."""
+        pg_session.execute.return_value = FakeResult(rows=[])
+
+        repo = PostgresRepository(pg_session)
+        result = await repo.get_city_with_scores(99999)
+
+        assert result is None
+
+
 # ── get_cities ──────────────────────────────────────────────────
 
 
@@ -158,10 +269,7 @@ class TestGetCities:
                 "overall_score": 7.5,
             },
         ]
-        pg_session.execute.side_effect = [
-            FakeResult(scalar=1),  # COUNT(*)
-            FakeResult(rows=cities),  # SELECT ... LIMIT/OFFSET
-        ]
+        pg_session.execute.return_value = _page_result(cities, total=1)
 
         repo = PostgresRepository(pg_session)
         rows, total = await repo.get_cities()
@@ -181,10 +289,7 @@ class TestGetCities:
             "population": 870000,
             "overall_score": 6.5,
         }
-        pg_session.execute.side_effect = [
-            FakeResult(scalar=1),
-            FakeResult(rows=[city]),
-        ]
+        pg_session.execute.return_value = _page_result([city], total=1)
 
         repo = PostgresRepository(pg_session)
         rows, _ = await repo.get_cities()
@@ -194,10 +299,7 @@ class TestGetCities:
 
     async def test_empty_results(self, pg_session):
         """Doit retourner ([], 0) quand aucun résultat."""
-        pg_session.execute.side_effect = [
-            FakeResult(scalar=0),
-            FakeResult(rows=[]),
-        ]
+        pg_session.execute.return_value = _page_result([], total=0)
 
         repo = PostgresRepository(pg_session)
         rows, total = await repo.get_cities(search="VilleInexistante")
@@ -205,24 +307,18 @@ class TestGetCities:
         assert total == 0
         assert rows == []
 
-    async def test_calls_execute_twice(self, pg_session):
-        """Doit appeler session.execute au moins 2 fois (count + data)."""
-        pg_session.execute.side_effect = [
-            FakeResult(scalar=0),
-            FakeResult(rows=[]),
-        ]
+    async def test_single_round_trip(self, pg_session):
+        """Total et page doivent être lus en un seul session.execute."""
+        pg_session.execute.return_value = _page_result([], total=0)
 
         repo = PostgresRepository(pg_session)
         await repo.get_cities()
 
-        assert pg_session.execute.call_count == 2
+        assert pg_session.execute.call_count == 1
 
     async def test_accepts_search_parameter(self, pg_session):
         """Doit accepter le paramètre search sans erreur."""
-        pg_session.execute.side_effect = [
-            FakeResult(scalar=0),
-            FakeResult(rows=[]),
-        ]
+        pg_session.execute.return_value = _page_result([], total=0)
 
         repo = PostgresRepository(pg_session)
         rows, total = await repo.get_cities(search="Lyon")
@@ -232,10 +328,7 @@ class TestGetCities:
 
     async def test_accepts_region_filter(self, pg_session):
         """Doit accepter le filtre region sans erreur."""
-        pg_session.execute.side_effect = [
-            FakeResult(scalar=0),
-            FakeResult(rows=[]),
-        ]
+        pg_session.execute.return_value = _page_result([], total=0)
 
         repo = PostgresRepository(pg_session)
         rows, total = await repo.get_cities(region="Bretagne")
@@ -244,10 +337,7 @@ class TestGetCities:
 
     async def test_accepts_pagination_params(self, pg_session):
         """Doit accepter page et page_size sans erreur."""
-        pg_session.execute.side_effect = [
-            FakeResult(scalar=0),
-            FakeResult(rows=[]),
-        ]
+        pg_session.execute.return_value = _page_result([], total=0)
 
         repo = PostgresRepository(pg_session)
         rows, total = await repo.get_cities(page=3, page_size=5)
@@ -256,12 +346,241 @@ class TestGetCities:
 
     async def test_accepts_sort_params(self, pg_session):
         """Doit accepter sort_by et sort_order sans erreur."""
-        pg_session.execute.side_effect = [
-            FakeResult(scalar=0),
-            FakeResult(rows=[]),
-        ]
+        pg_session.execute.return_value = _page_result([], total=0)
 
         repo = PostgresRepository(pg_session)
         rows, total = await repo.get_cities(sort_by="population", sort_order="asc")
 
         assert isinstance(rows, list)
+
+    async def test_returned_rows_exclude_total_column(self, pg_session):
+        """La colonne technique total_count ne doit pas fuiter dans les lignes."""
+        city = {
+            "id": 1,
+            "name": "Lyon",
+            "department": "Rhône",
+            "region": "ARA",
+            "population": 500000,
+            "overall_score": 7.5,
+        }
+        pg_session.execute.return_value = _page_result([city], total=12)
+
+        repo = PostgresRepository(pg_session)
+        rows, total = await repo.get_cities()
+
+        assert total == 12
+        assert rows == [city]
+
+    async def test_include_total_false_skips_count(self, pg_session):
+        """include_total=False : pas de COUNT, total à None."""
+        pg_session.execute.return_value = FakeResult(rows=[])
+
+        repo = PostgresRepository(pg_session)
+        rows, total = await repo.get_cities(include_total=False)
+
+        assert total is None
+        assert rows == []
+        assert "COUNT" not in str(pg_session.execute.call_args[0][0])
+
+    async def test_lookahead_reads_one_extra_row(self, pg_session):
+        """lookahead=True : LIMIT page_size + 1, OFFSET inchangé."""
+        pg_session.execute.return_value = FakeResult(rows=[])
+
+        repo = PostgresRepository(pg_session)
+        await repo.get_cities(page=3, page_size=5, include_total=False, lookahead=True)
+
+        params = pg_session.execute.call_args[0][1]
+        assert params["limit"] == 6
+        assert params["offset"] == 10
+
+    async def test_estimate_total_uses_planner_stats_when_unfiltered(self, pg_session):
+        """estimate_total=True sans filtre : lecture de pg_class.reltuples."""
+        pg_session.execute.return_value = _page_result([], total=35000)
+
+        repo = PostgresRepository(pg_session)
+        _, total = await repo.get_cities(estimate_total=True)
+
+        assert total == 35000
+        assert "reltuples" in str(pg_session.execute.call_args[0][0])
+
+    async def test_estimate_total_ignored_with_filters(self, pg_session):
+        """Avec un filtre actif, le total reste un COUNT exact."""
+        pg_session.execute.return_value = _page_result([], total=0)
+
+        repo = PostgresRepository(pg_session)
+        await repo.get_cities(region="Bretagne", estimate_total=True)
+
+        assert "reltuples" not in str(pg_session.execute.call_args[0][0])
+
+
+# ── get_cities : recherche par nom ──────────────────────────────
+
+
+class TestGetCitiesSearch:
+    """PostgresRepository.get_cities(search=...) — Recherche trigramme sans accents."""
+
+    async def test_search_uses_normalized_name_expression(self, pg_session):
+        """Le filtre doit porter sur l'expression indexée (unaccent + lower)."""
+        pg_session.execute.return_value = _page_result([], total=0)
+
+        repo = PostgresRepository(pg_session)
+        await repo.get_cities(search="Besancon")
+
+        sql = str(pg_session.execute.call_args[0][0])
+        params = pg_session.execute.call_args[0][1]
+        assert "immutable_unaccent(lower(name)) LIKE" in sql
+        assert "ILIKE" not in sql
+        assert params["search"] == "%Besancon%"
+
+    async def test_search_escapes_like_wildcards(self, pg_session):
+        """Les jokers % et _ saisis doivent être échappés."""
+        pg_session.execute.return_value = _page_result([], total=0)
+
+        repo = PostgresRepository(pg_session)
+        await repo.get_cities(search="50%_off")
+
+        params = pg_session.execute.call_args[0][1]
+        assert params["search"] == "%50\\%\\_off%"
+
+    async def test_relevance_sort_ranks_by_similarity(self, pg_session):
+        """sort_by=relevance avec search : tri par similarité trigramme."""
+        pg_session.execute.return_value = _page_result([], total=0)
+
+        repo = PostgresRepository(pg_session)
+        await repo.get_cities(search="Lyon", sort_by="relevance")
+
+        sql = str(pg_session.execute.call_args[0][0])
+        assert "ORDER BY similarity(" in sql
+
+    async def test_relevance_sort_without_search_falls_back(self, pg_session):
+        """Sans search, relevance retombe sur overall_score."""
+        pg_session.execute.return_value = _page_result([], total=0)
+
+        repo = PostgresRepository(pg_session)
+        await repo.get_cities(sort_by="relevance")
+
+        sql = str(pg_session.execute.call_args[0][0])
+        assert "similarity(" not in sql
+        assert "ORDER BY overall_score DESC" in sql
+
+
+# ── get_cities : pagination keyset ──────────────────────────────
+
+
+class TestGetCitiesKeyset:
+    """PostgresRepository.get_cities(cursor=...) — Pagination par curseur."""
+
+    async def test_cursor_mode_seeks_instead_of_offset(self, pg_session):
+        """Avec un curseur, la requête de données doit utiliser un seek, pas OFFSET."""
+        pg_session.execute.return_value = _page_result([], total=0)
+        cursor = city_cursor({"id": 7, "population": 1000}, sort_by="population", sort_order="asc")
+
+        repo = PostgresRepository(pg_session)
+        await repo.get_cities(sort_by="population", sort_order="asc", cursor=cursor)
+
+        data_sql = str(pg_session.execute.call_args[0][0])
+        params = pg_session.execute.call_args[0][1]
+        assert "OFFSET" not in data_sql
+        assert "(population, id) > (:cursor_value, :cursor_id)" in data_sql
+        assert params["cursor_value"] == 1000
+        assert params["cursor_id"] == 7
+
+    async def test_offset_mode_orders_with_id_tiebreaker(self, pg_session):
+        """Le tri doit toujours se départager sur id."""
+        pg_session.execute.return_value = _page_result([], total=0)
+
+        repo = PostgresRepository(pg_session)
+        await repo.get_cities(sort_by="name", sort_order="desc")
+
+        data_sql = str(pg_session.execute.call_args[0][0])
+        # name est NOT NULL : pas de NULLS LAST, l'index (name, id) sert les deux sens
+        assert "ORDER BY name DESC, id DESC" in data_sql
+        assert "NULLS" not in data_sql
+
+    async def test_nullable_sort_column_nulls_last(self, pg_session):
+        pg_session.execute.return_value = _page_result([], total=0)
+
+        repo = PostgresRepository(pg_session)
+        await repo.get_cities(sort_by="overall_score", sort_order="desc")
+
+        data_sql = str(pg_session.execute.call_args[0][0])
+        assert "ORDER BY overall_score DESC NULLS LAST, id DESC" in data_sql
+
+    async def test_nullable_seek_has_no_or_is_null(self, pg_session):
+        """Colonne nullable : seek indexable + branche NULL en UNION ALL, sans OR."""
+        pg_session.execute.return_value = _page_result([], total=0)
+        cursor = city_cursor({"id": 7, "overall_score": 6.5})
+
+        repo = PostgresRepository(pg_session)
+        await repo.get_cities(region="Bretagne", cursor=cursor)
+
+        data_sql = str(pg_session.execute.call_args[0][0])
+        assert " OR " not in data_sql
+        seek, tail = data_sql.split(" UNION ALL ")
+        assert "region = :region AND (overall_score, id) < (:cursor_value, :cursor_id)" in seek
+        assert "IS NULL" not in seek
+        assert "region = :region AND overall_score IS NULL" in tail
+        assert "LIMIT :limit" in seek and "LIMIT :limit" in tail
+
+    async def test_not_null_seek_single_branch(self, pg_session):
+        pg_session.execute.return_value = _page_result([], total=0)
+        cursor = city_cursor({"id": 3, "name": "Lyon"}, sort_by="name", sort_order="asc")
+
+        repo = PostgresRepository(pg_session)
+        await repo.get_cities(sort_by="name", sort_order="asc", cursor=cursor)
+
+        data_sql = str(pg_session.execute.call_args[0][0])
+        assert "WHERE (name, id) > (:cursor_value, :cursor_id)" in data_sql
+        assert "UNION ALL" not in data_sql
+        assert "IS NULL" not in data_sql
+
+    async def test_cursor_in_null_tail(self, pg_session):
+        """Curseur déjà parmi les NULL : une seule branche sur id."""
+        pg_session.execute.return_value = _page_result([], total=0)
+        cursor = city_cursor({"id": 40, "population": None}, sort_by="population")
+
+        repo = PostgresRepository(pg_session)
+        await repo.get_cities(sort_by="population", cursor=cursor)
+
+        data_sql = str(pg_session.execute.call_args[0][0])
+        assert "WHERE population IS NULL AND id < :cursor_id" in data_sql
+        assert "UNION ALL" not in data_sql
+
+    async def test_invalid_cursor_raises_value_error(self, pg_session):
+        """Un curseur illisible doit lever ValueError sans interroger la base."""
+        repo = PostgresRepository(pg_session)
+
+        with pytest.raises(ValueError):
+            await repo.get_cities(cursor="pas-un-curseur!")
+
+        pg_session.execute.assert_not_called()
+
+    @pytest.mark.parametrize(
+        ("sort_by", "value", "city_id"),
+        [
+            ("population", "abc", 1),
+            ("population", 12.5, 1),
+            ("overall_score", "7.5", 1),
+            ("name", 42, 1),
+            ("population", 1000, "x"),
+            ("population", 1000, True),
+            ("population", None, 1.5),
+        ],
+    )
+    async def test_cursor_with_mistyped_values_rejected(self, pg_session, sort_by, value, city_id):
+        """id et valeur de tri d'un curseur forgé sont vérifiés avant la requête."""
+        cursor = encode_cursor({"s": sort_by, "o": "DESC", "v": value, "id": city_id})
+
+        repo = PostgresRepository(pg_session)
+        with pytest.raises(ValueError):
+            await repo.get_cities(sort_by=sort_by, cursor=cursor)
+
+        pg_session.execute.assert_not_called()
+
+    async def test_cursor_from_other_sort_rejected(self, pg_session):
+        """Un curseur émis pour un autre tri doit être refusé."""
+        cursor = city_cursor({"id": 1, "name": "Lyon"}, sort_by="name", sort_order="asc")
+
+        repo = PostgresRepository(pg_session)
+        with pytest.raises(ValueError):
+            await repo.get_cities(sort_by="population", cursor=cursor)
@@ -8,11 +8,13 @@ Commande :
 
 from __future__ import annotations
 
-from unittest.mock import AsyncMock
+import asyncio
+from unittest.mock import AsyncMock, MagicMock
 
 import pytest
 
 from backend.models import RecommendationsResponse
+from backend.services.recommendation_cache import RecommendationCache
 from backend.services.recommendation_service import RecommendationService
 
 pytestmark = pytest.mark.sprint4
@@ -53,17 +55,17 @@ class TestGetRecommendations:
         self, service, mock_neo4j_repo, mock_postgres_repo
     ):
         """Doit retourner un RecommendationsResponse quand tout fonctionne."""
-        mock_postgres_repo.get_city_by_id.side_effect = [
-            # Premier appel : ville source
-            {
-                "id": 1,
-                "name": "Lyon",
-                "department": "Rhône",
-                "region": "ARA",
-                "population": 500000,
-                "overall_score": 7.5,
-            },
-            # Deuxième appel : enrichissement de la recommandation
+        # Ville source
+        mock_postgres_repo.get_city_by_id.return_value = {
+            "id": 1,
+            "name": "Lyon",
+            "department": "Rhône",
+            "region": "ARA",
+            "population": 500000,
+            "overall_score": 7.5,
+        }
+        # Enrichissement des recommandations (requête groupée)
+        mock_postgres_repo.get_cities_by_ids.return_value = [
             {
                 "id": 2,
                 "name": "Marseille",
@@ -119,15 +121,15 @@ class TestGetRecommendations:
         self, service, mock_neo4j_repo, mock_postgres_repo
     ):
         """Chaque recommendation doit contenir city, similarity_score, common_strengths."""
-        mock_postgres_repo.get_city_by_id.side_effect = [
-            {
-                "id": 1,
-                "name": "Lyon",
-                "department": "Rhône",
-                "region": "ARA",
-                "population": 500000,
-                "overall_score": 7.5,
-            },
+        mock_postgres_repo.get_city_by_id.return_value = {
+            "id": 1,
+            "name": "Lyon",
+            "department": "Rhône",
+            "region": "ARA",
+            "population": 500000,
+            "overall_score": 7.5,
+        }
+        mock_postgres_repo.get_cities_by_ids.return_value = [
             {
                 "id": 5,
                 "name": "Nantes",
@@ -152,6 +154,71 @@ class TestGetRecommendations:
         assert reco.similarity_score == 0.92
         assert "environnement" in reco.common_strengths
 
+    async def test_enriches_all_results_in_one_query(
+        self, service, mock_neo4j_repo, mock_postgres_repo
+    ):
+        """L'enrichissement Postgres doit être groupé (pas de N+1)."""
+        mock_postgres_repo.get_city_by_id.return_value = {
+            "id": 1,
+            "name": "Lyon",
+            "department": "Rhône",
+            "region": "ARA",
+            "population": 500000,
+            "overall_score": 7.5,
+        }
+        mock_postgres_repo.get_cities_by_ids.return_value = [
+            {"id": 3, "name": "Toulouse", "population": 480000, "overall_score": 7.0},
+            {"id": 2, "name": "Marseille", "population": 870000, "overall_score": 6.5},
+        ]
+        mock_neo4j_repo.get_similar_cities.return_value = [
+            {
+                "city": {"city_id": 2, "name": "Marseille"},
+                "similarity_score": 0.9,
+                "common_strengths": [],
+            },
+            {
+                "city": {"city_id": 3, "name": "Toulouse"},
+                "similarity_score": 0.8,
+                "common_strengths": [],
+            },
+        ]
+
+        result = await service.get_recommendations(city_id=1, k=2)
+
+        mock_postgres_repo.get_city_by_id.assert_called_once_with(1)
+        mock_postgres_repo.get_cities_by_ids.assert_called_once_with([2, 3])
+        assert [r.city.name for r in result.recommendations] == ["Marseille", "Toulouse"]
+        assert result.recommendations[0].city.population == 870000
+
+    async def test_runs_source_check_and_graph_query_concurrently(
+        self, service, mock_neo4j_repo, mock_postgres_repo
+    ):
+        """La requête Neo4j doit démarrer sans attendre la vérification Postgres,
+        puis être annulée si la ville source est introuvable."""
+        neo4j_started = asyncio.Event()
+        neo4j_cancelled = asyncio.Event()
+
+        async def slow_similar_cities(*args, **kwargs):
+            neo4j_started.set()
+            try:
+                await asyncio.sleep(10)
+            except asyncio.CancelledError:
+                neo4j_cancelled.set()
+                raise
+
+        async def source_lookup(city_id):
+            # Ne répond qu'une fois la requête Neo4j en vol : prouve le parallélisme
+            await asyncio.wait_for(neo4j_started.wait(), timeout=1)
+            return None
+
+        mock_neo4j_repo.get_similar_cities.side_effect = slow_similar_cities
+        mock_postgres_repo.get_city_by_id.side_effect = source_lookup
+
+        result = await asyncio.wait_for(service.get_recommendations(city_id=1), timeout=2)
+
+        assert result is None
+        assert neo4j_cancelled.is_set()
+
     async def test_empty_recommendations(
         self, service, mock_neo4j_repo, mock_postgres_repo
     ):
@@ -171,3 +238,176 @@ class TestGetRecommendations:
         assert isinstance(result, RecommendationsResponse)
         assert result.source_city == "Lyon"
         assert result.recommendations == []
+
+
+class TestGetRecommendationsBatch:
+    """RecommendationService.get_recommendations_batch() — Plusieurs villes sources."""
+
+    async def test_one_graph_query_and_one_enrichment(
+        self, service, mock_neo4j_repo, mock_postgres_repo
+    ):
+        """Une requête graphe groupée, les sources puis un seul enrichissement des cibles."""
+        mock_postgres_repo.get_cities_by_ids.side_effect = [
+            [{"id": 1, "name": "Lyon"}, {"id": 2, "name": "Marseille"}],
+            [{"id": 3, "name": "Toulouse", "population": 480000}],
+        ]
+        mock_neo4j_repo.get_similar_cities_batch.return_value = {
+            1: [
+                {"city": {"city_id": 2, "name": "Marseille"}, "similarity_score": 0.9,
+                 "common_strengths": []},
+                {"city": {"city_id": 3, "name": "Toulouse"}, "similarity_score": 0.8,
+                 "common_strengths": ["culture"]},
+            ],
+            2: [
+                {"city": {"city_id": 3, "name": "Toulouse"}, "similarity_score": 0.7,
+                 "common_strengths": []},
+            ],
+            99: [],
+        }
+
+        result = await service.get_recommendations_batch([1, 2, 99, 1], k=2)
+
+        mock_neo4j_repo.get_similar_cities_batch.assert_awaited_once_with([1, 2, 99], k=2)
+        mock_neo4j_repo.get_similar_cities.assert_not_called()
+        assert mock_postgres_repo.get_cities_by_ids.call_args_list[1][0][0] == [3]
+        assert [r.city_id for r in result.results] == [1, 2]
+        assert result.results[0].source_city == "Lyon"
+        assert [i.city.name for i in result.results[0].recommendations] == [
+            "Marseille",
+            "Toulouse",
+        ]
+        assert result.results[1].recommendations[0].city.population == 480000
+        assert result.not_found == [99]
+
+    async def test_no_existing_source(self, service, mock_neo4j_repo, mock_postgres_repo):
+        """Aucune ville source connue : pas d'enrichissement, tout en not_found."""
+        mock_postgres_repo.get_cities_by_ids.return_value = []
+        mock_neo4j_repo.get_similar_cities_batch.return_value = {}
+
+        result = await service.get_recommendations_batch([98, 99])
+
+        assert result.results == []
+        assert result.not_found == [98, 99]
+        mock_postgres_repo.get_cities_by_ids.assert_called_once_with([98, 99])
+
+class TestGetRecommendationsExplore:
+    """mode="explore" — découverte à deux sauts servie par Neo4jRepository."""
+
+    async def test_explore_uses_discovery_query(self, mock_neo4j_repo, mock_postgres_repo):
+        """Même avec un instantané mémoire, l'exploration passe par Neo4j."""
+        mock_postgres_repo.get_city_by_id.return_value = {"id": 1, "name": "Lyon"}
+        mock_postgres_repo.get_cities_by_ids.return_value = []
+        mock_neo4j_repo.get_discovery_cities.return_value = [
+            {
+                "city": {"city_id": 9, "name": "Annecy"},
+                "similarity_score": 0.58,
+                "common_strengths": [],
+            }
+        ]
+        snapshot = AsyncMock()
+        service = RecommendationService(
+            neo4j_repo=mock_neo4j_repo,
+            postgres_repo=mock_postgres_repo,
+            snapshot=snapshot,
+            explore_fan_out=4,
+            explore_timeout=0.5,
+        )
+
+        result = await service.get_recommendations(city_id=1, k=3, mode="explore")
+
+        mock_neo4j_repo.get_discovery_cities.assert_awaited_once_with(
+            1, k=3, fan_out=4, timeout=0.5
+        )
+        snapshot.get_similar_cities.assert_not_called()
+        assert result.recommendations[0].city.name == "Annecy"
+
+class TestGetRecommendationsFromSnapshot:
+    """Avec un instantané mémoire, le graphe n'est plus lu dans Neo4j."""
+
+    async def test_uses_snapshot_instead_of_neo4j(self, mock_neo4j_repo, mock_postgres_repo):
+        snapshot = AsyncMock()
+        snapshot.get_similar_cities.return_value = [
+            {
+                "city": {"city_id": 2, "name": "Grenoble"},
+                "similarity_score": 0.7,
+                "common_strengths": ["Culture"],
+            }
+        ]
+        mock_postgres_repo.get_city_by_id.return_value = {"id": 1, "name": "Lyon"}
+        mock_postgres_repo.get_cities_by_ids.return_value = []
+        service = RecommendationService(
+            neo4j_repo=mock_neo4j_repo,
+            postgres_repo=mock_postgres_repo,
+            snapshot=snapshot,
+        )
+
+        result = await service.get_recommendations(city_id=1, k=3)
+
+        snapshot.get_similar_cities.assert_awaited_once_with(1, k=3)
+        mock_neo4j_repo.get_similar_cities.assert_not_called()
+        assert result.recommendations[0].city.name == "Grenoble"
+
+
+class TestGetRecommendationsCached:
+    """Avec un cache, les villes déjà servies ne touchent ni Neo4j ni Postgres."""
+
+    @pytest.fixture
+    def cached_service(self, mock_neo4j_repo, mock_postgres_repo):
+        mock_neo4j_repo.get_graph_version.return_value = "v1"
+        mock_postgres_repo.get_city_by_id.return_value = {"id": 1, "name": "Lyon"}
+        mock_postgres_repo.get_cities_by_ids.return_value = []
+        mock_neo4j_repo.get_similar_cities.return_value = [
+            {
+                "city": {"city_id": i, "name": f"Ville {i}"},
+                "similarity_score": 0.5,
+                "common_strengths": [],
+            }
+            for i in range(2, 7)
+        ]
+        return RecommendationService(
+            neo4j_repo=mock_neo4j_repo,
+            postgres_repo=mock_postgres_repo,
+            cache=RecommendationCache(),
+        )
+
+    async def test_second_call_hits_cache(
+        self, cached_service, mock_neo4j_repo, mock_postgres_repo
+    ):
+        first = await cached_service.get_recommendations(city_id=1, k=5)
+        second = await cached_service.get_recommendations(city_id=1, k=3)
+
+        mock_neo4j_repo.get_similar_cities.assert_awaited_once()
+        mock_postgres_repo.get_city_by_id.assert_awaited_once()
+        mock_neo4j_repo.get_graph_version.assert_awaited_once()
+        assert second.recommendations == first.recommendations[:3]
+
+    async def test_explore_keyed_on_neo4j_version_with_snapshot(
+        self, mock_neo4j_repo, mock_postgres_repo
+    ):
+        """Avec un instantané, explore (servi par Neo4j) suit la version de Neo4j."""
+        mock_postgres_repo.get_city_by_id.return_value = {"id": 1, "name": "Lyon"}
+        mock_postgres_repo.get_cities_by_ids.return_value = []
+        mock_neo4j_repo.get_discovery_cities.return_value = []
+        mock_neo4j_repo.get_graph_version.side_effect = ["v1", "v2"]
+        service = RecommendationService(
+            neo4j_repo=mock_neo4j_repo,
+            postgres_repo=mock_postgres_repo,
+            snapshot=MagicMock(version="v1"),
+            cache=RecommendationCache(version_ttl=0),
+        )
+
+        await service.get_recommendations(city_id=1, mode="explore")
+        await service.get_recommendations(city_id=1, mode="explore")
+
+        # update_graph a changé la version Neo4j : l'instantané (v1) ne masque pas l'invalidation
+        assert mock_neo4j_repo.get_discovery_cities.await_count == 2
+
+    async def test_missing_city_is_not_cached(
+        self, cached_service, mock_neo4j_repo, mock_postgres_repo
+    ):
+        mock_postgres_repo.get_city_by_id.return_value = None
+
+        assert await cached_service.get_recommendations(city_id=99) is None
+        assert await cached_service.get_recommendations(city_id=99) is None
+        assert mock_postgres_repo.get_city_by_id.await_count == 2
+
@@ -0,0 +1,99 @@
+"""Tests unitaires — Cache des recommandations (version du graphe, TTL, LRU).
+
+Commande :
+    uv run pytest tests/unit/test_recommendation_cache.py -v
+"""
+
+from __future__ import annotations
+
+from unittest.mock import AsyncMock
+
+import pytest
+
+from backend.models import City, RecommendationItem, RecommendationsResponse
+from backend.services.recommendation_cache import RecommendationCache
+
+pytestmark = pytest.mark.sprint4
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def _response(n: int) -> RecommendationsResponse:
+    return RecommendationsResponse(
+        source_city="Lyon",
+        recommendations=[
+            RecommendationItem(city=City(id=i, name=f"Ville {i}"), similarity_score=0.5)
+            for i in range(2, 2 + n)
+        ],
+    )
+
+
+@pytest.fixture
+def clock():
+    return FakeClock()
+
+
+@pytest.fixture
+def cache(clock):
+    return RecommendationCache(maxsize=2, ttl=60, version_ttl=10, clock=clock)
+
+
+class TestRecommendationCache:
+    def test_miss_then_hit(self, cache):
+        assert cache.get(1, 5, "v1") is None
+
+        cache.put(1, 5, "v1", _response(5))
+
+        assert len(cache.get(1, 5, "v1").recommendations) == 5
+
+    def test_smaller_k_served_as_prefix(self, cache):
+        cache.put(1, 10, "v1", _response(10))
+
+        result = cache.get(1, 3, "v1")
+
+        assert [r.city.id for r in result.recommendations] == [2, 3, 4]
+        assert cache.get(1, 11, "v1") is None
+
+    def test_smaller_k_does_not_replace_larger(self, cache):
+        cache.put(1, 10, "v1", _response(10))
+        cache.put(1, 3, "v1", _response(3))
+
+        assert len(cache.get(1, 10, "v1").recommendations) == 10
+
+    def test_new_graph_version_misses(self, cache):
+        cache.put(1, 5, "v1", _response(5))
+
+        assert cache.get(1, 5, "v2") is None
+
+    def test_entries_expire_after_ttl(self, cache, clock):
+        cache.put(1, 5, "v1", _response(5))
+        clock.now = 61
+
+        assert cache.get(1, 5, "v1") is None
+        assert len(cache) == 0
+
+    def test_lru_eviction(self, cache):
+        cache.put(1, 5, "v1", _response(5))
+        cache.put(2, 5, "v1", _response(5))
+        cache.get(1, 5, "v1")  # 1 devient la plus récente
+        cache.put(3, 5, "v1", _response(5))
+
+        assert cache.get(2, 5, "v1") is None
+        assert cache.get(1, 5, "v1") is not None
+        assert cache.get(3, 5, "v1") is not None
+
+    async def test_graph_version_refreshed_at_most_once_per_interval(self, cache, clock):
+        fetch = AsyncMock(side_effect=["v1", "v2"])
+
+        assert await cache.graph_version(fetch) == "v1"
+        clock.now = 5
+        assert await cache.graph_version(fetch) == "v1"
+        clock.now = 10
+        assert await cache.graph_version(fetch) == "v2"
+        assert fetch.await_count == 2
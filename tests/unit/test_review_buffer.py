@@ -0,0 +1,127 @@
+"""Tests unitaires — Tampon d'écriture des avis (backend.repositories.review_buffer).
+
+Commande :
+    uv run pytest tests/unit/test_review_buffer.py -v
+"""
+
+from __future__ import annotations
+
+import asyncio
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+from bson import ObjectId
+from pymongo.errors import WriteError
+
+from backend.repositories.mongo_repo import MongoRepository
+from backend.repositories.review_buffer import ReviewWriteBuffer
+
+pytestmark = pytest.mark.sprint4
+
+
+@pytest.fixture
+def write():
+    return AsyncMock(return_value={})
+
+
+class TestReviewWriteBuffer:
+    async def test_concurrent_submits_written_in_one_batch(self, write):
+        buffer = ReviewWriteBuffer(write, max_delay=0.01)
+
+        ids = await asyncio.gather(*(buffer.submit({"rating": r}) for r in range(1, 6)))
+
+        write.assert_awaited_once()
+        docs = write.await_args.args[0]
+        assert [doc["rating"] for doc in docs] == [1, 2, 3, 4, 5]
+        assert ids == [doc["_id"] for doc in docs]
+        assert len(set(ids)) == 5 and all(isinstance(i, ObjectId) for i in ids)
+        await buffer.close()
+
+    async def test_batches_capped_at_max_batch(self, write):
+        buffer = ReviewWriteBuffer(write, max_batch=2, max_delay=0.01)
+
+        await asyncio.gather(*(buffer.submit({"rating": 3}) for _ in range(5)))
+
+        assert [len(call.args[0]) for call in write.await_args_list] == [2, 2, 1]
+        await buffer.close()
+
+    async def test_write_error_fails_only_its_review(self, write):
+        write.return_value = {1: "E11000 duplicate key"}
+        buffer = ReviewWriteBuffer(write, max_delay=0.01)
+
+        results = await asyncio.gather(
+            *(buffer.submit({"rating": 4}) for _ in range(3)), return_exceptions=True
+        )
+
+        assert isinstance(results[1], WriteError)
+        assert isinstance(results[0], ObjectId) and isinstance(results[2], ObjectId)
+        await buffer.close()
+
+    async def test_batch_failure_fails_every_review(self, write):
+        write.side_effect = ConnectionError("MongoDB indisponible")
+        buffer = ReviewWriteBuffer(write, max_delay=0.01)
+
+        results = await asyncio.gather(
+            *(buffer.submit({"rating": 2}) for _ in range(2)), return_exceptions=True
+        )
+
+        assert all(isinstance(r, ConnectionError) for r in results)
+        # Le tampon reste utilisable après l'échec d'un lot
+        write.side_effect = None
+        assert isinstance(await buffer.submit({"rating": 2}), ObjectId)
+        await buffer.close()
+
+    async def test_full_queue_applies_backpressure(self, write):
+        """File pleine : les créations suivantes attendent une écriture."""
+        gate = asyncio.Event()
+
+        async def slow_write(docs):
+            await gate.wait()
+            return {}
+
+        write.side_effect = slow_write
+        buffer = ReviewWriteBuffer(write, max_batch=1, max_delay=0, max_queue=1)
+
+        tasks = [asyncio.create_task(buffer.submit({"rating": 5})) for _ in range(3)]
+        await asyncio.sleep(0.01)
+
+        assert write.await_count == 1
+        assert buffer._queue.full()
+        assert not any(task.done() for task in tasks)
+
+        gate.set()
+        await asyncio.gather(*tasks)
+        assert write.await_count == 3
+        await buffer.close()
+
+    async def test_close_flushes_pending_reviews(self, write):
+        buffer = ReviewWriteBuffer(write, max_delay=1.0)
+        tasks = [asyncio.create_task(buffer.submit({"rating": 1})) for _ in range(3)]
+        await asyncio.sleep(0)
+
+        await buffer.close()
+
+        assert all(task.done() and not task.exception() for task in tasks)
+        assert sum(len(call.args[0]) for call in write.await_args_list) == 3
+        with pytest.raises(RuntimeError):
+            await buffer.submit({"rating": 1})
+
+
+async def test_repository_create_review_uses_buffer():
+    """Avec un tampon, create_review ne fait pas d'insert_one et retourne l'id pré-attribué."""
+    collection = MagicMock()
+    collection.insert_one = AsyncMock()
+    db = MagicMock()
+    db.__getitem__ = MagicMock(return_value=collection)
+    buffer = MagicMock()
+    buffer.submit = AsyncMock(return_value=ObjectId("507f1f77bcf86cd799439011"))
+
+    result = await MongoRepository(db, write_buffer=buffer).create_review(
+        3, {"author": "Léa", "rating": 4}
+    )
+
+    collection.insert_one.assert_not_called()
+    submitted = buffer.submit.await_args.args[0]
+    assert submitted["city_id"] == 3 and "created_at" in submitted
+    assert result["id"] == "507f1f77bcf86cd799439011"
+    assert "_id" not in result
@@ -13,6 +13,7 @@ from unittest.mock import AsyncMock
 
 import pytest
 
+from backend.core.cursor import decode_cursor
 from backend.models import Review, ReviewCreate, ReviewsResponse
 from backend.services.review_service import ReviewService
 
@@ -87,7 +88,46 @@ class TestGetReviews:
 
         await service.get_reviews(city_id=1, page=3, page_size=5)
 
-        mock_repo.get_reviews.assert_called_once_with(1, page=3, page_size=5)
+        mock_repo.get_reviews.assert_called_once_with(
+            1, page=3, page_size=5, cursor=None, include_total=True, lookahead=True
+        )
+
+    async def test_next_cursor_when_extra_review_read(self, service, mock_repo):
+        """L'avis lu en plus de la page expose next_cursor, pointant après le dernier avis."""
+        created_at = datetime(2024, 5, 1, 12, 0, 0)
+        mock_repo.get_reviews.return_value = (
+            [
+                {"id": "a1", "author": "A", "rating": 4, "created_at": created_at},
+                {"id": "a2", "author": "B", "rating": 3, "created_at": created_at},
+                {"id": "a3", "author": "C", "rating": 5, "created_at": created_at},
+            ],
+            None,
+        )
+
+        result = await service.get_reviews(city_id=1, page_size=2, include_total=False)
+
+        assert result.total is None
+        assert [review.id for review in result.reviews] == ["a1", "a2"]
+        assert decode_cursor(result.next_cursor) == {"c": created_at.isoformat(), "id": "a2"}
+
+    async def test_exactly_full_last_page_has_no_next_cursor(self, service, mock_repo):
+        mock_repo.get_reviews.return_value = (
+            [{"id": "a1", "author": "A", "rating": 4}, {"id": "a2", "author": "B", "rating": 3}],
+            None,
+        )
+
+        result = await service.get_reviews(city_id=1, page_size=2, include_total=False)
+
+        assert len(result.reviews) == 2
+        assert result.next_cursor is None
+
+    async def test_no_next_cursor_on_last_page(self, service, mock_repo):
+        mock_repo.get_reviews.return_value = ([{"id": "a1", "author": "A", "rating": 4}], 1)
+
+        result = await service.get_reviews(city_id=1, page_size=2, cursor="abc")
+
+        assert result.next_cursor is None
+        assert mock_repo.get_reviews.call_args.kwargs["cursor"] == "abc"
 
     async def test_empty_reviews(self, service, mock_repo):
         """Doit gérer correctement l'absence d'avis."""
@@ -160,3 +200,62 @@ class TestCreateReview:
         assert isinstance(data, dict)
         assert data["author"] == "Emma"
         assert data["rating"] == 3
+
+
+# ── import_reviews ──────────────────────────────────────────────
+
+
+class TestImportReviews:
+    """ReviewService.import_reviews() — Import en masse avec erreurs par avis."""
+
+    async def test_invalid_items_reported_valid_ones_inserted(self, service, mock_repo):
+        mock_repo.insert_reviews.return_value = {}
+
+        result = await service.import_reviews(
+            [
+                {"city_id": 1, "author": "Ana", "rating": 4},
+                {"city_id": 2, "rating": 9},
+                "pas un avis",
+                {"city_id": 3, "rating": 2, "tags": ["bruit"]},
+            ]
+        )
+
+        docs = mock_repo.insert_reviews.call_args[0][0]
+        assert [doc["city_id"] for doc in docs] == [1, 3]
+        assert docs[1]["tags"] == ["bruit"]
+        assert result.received == 4
+        assert result.inserted == 2
+        assert [error.index for error in result.errors] == [1, 2]
+        assert result.errors[0].error.startswith("rating:")
+
+    async def test_write_errors_mapped_to_item_positions(self, service, mock_repo):
+        """Les positions d'erreur du repo (avis valides seuls) sont ramenées au lot."""
+        mock_repo.insert_reviews.return_value = {1: "E11000 duplicate key"}
+
+        result = await service.import_reviews(
+            [
+                {"city_id": 1, "rating": 0},
+                {"city_id": 1, "rating": 3},
+                {"city_id": 2, "rating": 5},
+            ]
+        )
+
+        assert result.inserted == 1
+        assert [(e.index, e.error) for e in result.errors][1] == (2, "E11000 duplicate key")
+
+    async def test_ndjson_bad_line_is_item_error(self, service, mock_repo):
+        mock_repo.insert_reviews.return_value = {}
+
+        result = await service.import_reviews_ndjson(
+            [b'{"city_id": 5, "rating": 4}', b'{"city_id": 5,', b'{"city_id": 6, "rating": 1}']
+        )
+
+        assert result.inserted == 2
+        assert [error.index for error in result.errors] == [1]
+
+    async def test_nothing_valid_skips_repo(self, service, mock_repo):
+        result = await service.import_reviews([{"rating": 3}])
+
+        mock_repo.insert_reviews.assert_not_called()
+        assert result.inserted == 0
+        assert result.errors[0].error == "city_id: Field required"
@@ -9,6 +9,8 @@ Commande :
 
 from __future__ import annotations
 
+from unittest.mock import AsyncMock, MagicMock
+
 import pytest
 
 pytestmark = pytest.mark.sprint2
@@ -39,3 +41,133 @@ def test_main_exists():
 
     assert hasattr(seed_module, "main")
     assert callable(seed_module.main)
+
+
+# ── Chargement PostgreSQL par lots ──────────────────────────────
+
+
+class _FakeAsyncpgConnection:
+    """Connexion asyncpg minimale : enregistre les appels COPY."""
+
+    def __init__(self):
+        self.copies: list[tuple[str, list, list]] = []
+
+    async def copy_records_to_table(self, table, *, records, columns):
+        self.copies.append((table, list(records), columns))
+
+
+def _session_with_driver(driver_conn) -> AsyncMock:
+    raw = MagicMock(driver_connection=driver_conn)
+    conn = MagicMock()
+    conn.get_raw_connection = AsyncMock(return_value=raw)
+    session = AsyncMock()
+    session.connection = AsyncMock(return_value=conn)
+    return session
+
+
+async def test_copy_records_streams_in_batches():
+    """copy_records doit envoyer des lots COPY de taille bornée."""
+    from backend.scripts.seed_all import SCORE_COLUMNS, copy_records
+
+    driver = _FakeAsyncpgConnection()
+    session = _session_with_driver(driver)
+    records = ((i, "sante", "Santé", 5.0) for i in range(7))
+
+    total = await copy_records(session, "scores", SCORE_COLUMNS, records, batch_size=3)
+
+    assert total == 7
+    assert [len(batch) for _, batch, _ in driver.copies] == [3, 3, 1]
+    assert driver.copies[0][2] == list(SCORE_COLUMNS)
+    session.execute.assert_not_called()
+
+
+async def test_copy_records_falls_back_to_executemany():
+    """Sans COPY (driver non asyncpg), repli sur un executemany par lot."""
+    from backend.scripts.seed_all import SCORE_COLUMNS, copy_records
+
+    session = _session_with_driver(object())
+    records = [(1, "sante", "Santé", 5.0), (2, "sante", "Santé", 6.0)]
+
+    total = await copy_records(session, "scores", SCORE_COLUMNS, records, batch_size=10)
+
+    assert total == 2
+    session.execute.assert_called_once()
+    params = session.execute.call_args[0][1]
+    assert params[1] == {"city_id": 2, "category": "sante", "label": "Santé", "score": 6.0}
+
+
+def test_city_record_types():
+    """Les lignes CSV doivent être converties en tuples typés (ordre CITY_COLUMNS)."""
+    from backend.scripts.seed_all import CITY_COLUMNS, _city_record
+
+    record = _city_record(
+        {
+            "id": "2",
+            "name": "Lyon",
+            "department": "Rhône",
+            "region": "ARA",
+            "population": "516092",
+            "description": "",
+            "latitude": "45.76",
+            "longitude": "",
+            "overall_score": "7.5",
+        }
+    )
+
+    assert len(record) == len(CITY_COLUMNS)
+    assert record[0] == 2
+    assert record[4] == 516092
+    assert record[6] == 45.76
+    assert record[7] is None
+
+
+# ── Chargement Neo4j par lots UNWIND ────────────────────────────
+
+
+class _FakeNeo4jTx:
+    def __init__(self, calls: list):
+        self._calls = calls
+
+    async def run(self, query, **params):
+        self._calls.append((query, params))
+        return AsyncMock()
+
+
+class _FakeNeo4jSession:
+    """Session Neo4j minimale : une transaction d'écriture par execute_write."""
+
+    def __init__(self):
+        self.transactions: list[list] = []
+
+    async def execute_write(self, work, *args):
+        calls: list = []
+        self.transactions.append(calls)
+        return await work(_FakeNeo4jTx(calls), *args)
+
+
+async def test_write_batched_sends_unwind_batches():
+    """write_batched doit envoyer un lot $rows par transaction d'écriture."""
+    from backend.scripts.seed_all import CITY_NODES_QUERY, write_batched
+
+    session = _FakeNeo4jSession()
+    rows = [{"city_id": i} for i in range(5)]
+
+    count = await write_batched(session, CITY_NODES_QUERY, rows, batch_size=2)
+
+    assert count == 5
+    assert len(session.transactions) == 3
+    batches = [tx[0][1]["rows"] for tx in session.transactions]
+    assert [len(b) for b in batches] == [2, 2, 1]
+    assert all(tx[0][0] == CITY_NODES_QUERY for tx in session.transactions)
+
+
+def test_neo4j_queries_use_unwind():
+    """Les requêtes de seed Neo4j doivent itérer sur $rows via UNWIND."""
+    from backend.scripts import seed_all
+
+    for query in (
+        seed_all.CRITERION_NODES_QUERY,
+        seed_all.CITY_NODES_QUERY,
+        seed_all.STRONG_IN_QUERY,
+    ):
+        assert "UNWIND $rows" in query